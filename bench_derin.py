@@ -0,0 +1,233 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import derin
+from data_quality import validate_prices
+from indicators import StreamingIndicators, add_technical_indicators_panel
+
+# ================== BENCHMARK AYARLARI ==================
+# Ağ gerekmez: tüm veri sentetik OHLCV.
+#   python bench_derin.py                           -> hızlı profil
+#   python bench_derin.py --tickers 1,10,100,1000,10000 --bars daily,minute
+#   python bench_derin.py --save-baseline bench_baseline.json
+#   python bench_derin.py --compare bench_baseline.json   (regresyonda exit code 1)
+# =========================================================
+
+BARS = {
+    "daily": 2520,         # ~10 yıl günlük
+    "minute": 390 * 20,    # ~20 işlem günü 1m
+}
+FREQ = {"daily": "B", "minute": "min"}
+
+DEFAULT_TICKERS = [1, 10, 100]
+DEFAULT_REPEAT = 3
+REGRESSION_TOLERANCE = 1.25   # baseline'dan %25+ yavaş -> regresyon
+STREAM_MAX_BARS = 20_000      # streaming ölçümü bar başına; toplamı sınırlı tut
+
+
+def make_synthetic_ohlcv(
+    n_tickers: int,
+    n_bars: int,
+    kind: str = "daily",
+    seed: int = 0,
+) -> dict[str, pd.DataFrame]:
+    """
+    {ticker: RAW_COLS df} — geometrik rastgele yürüyüş, fetch_one_ticker çıktısıyla aynı format.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-02 09:30", periods=n_bars, freq=FREQ[kind])
+    sigma = 0.02 if kind == "daily" else 0.001
+
+    frames = {}
+    for i in range(n_tickers):
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0, sigma, n_bars)))
+        spread = np.abs(rng.normal(0, sigma / 2, n_bars))
+        open_ = close * (1 + rng.normal(0, sigma / 4, n_bars))
+        frames[f"T{i:05d}"] = pd.DataFrame({
+            "datetime": dates,
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + spread),
+            "low": np.minimum(open_, close) * (1 - spread),
+            "close": close,
+            "volume": rng.integers(10_000, 5_000_000, n_bars).astype("float64"),
+        })
+    return frames
+
+
+def measure(fn, repeat: int = DEFAULT_REPEAT):
+    """
+    (en iyi süre sn, tepe bellek byte) — süre tracemalloc kapalıyken ölçülür.
+    """
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def _quiet(fn):
+    def _run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return _run
+
+
+def bench_case(n_tickers: int, kind: str, repeat: int, tmp_dir: str) -> dict:
+    n_bars = BARS[kind]
+    frames = make_synthetic_ohlcv(n_tickers, n_bars, kind)
+    names = {t: t for t in frames}
+    rows = n_tickers * n_bars
+
+    full = derin._finalize_frame([
+        derin.add_technical_indicators(df, t, t) for t, df in frames.items()
+    ])
+
+    long_raw = pd.concat([df.assign(ticker=t) for t, df in frames.items()], ignore_index=True)
+
+    stages = {
+        "add_technical_indicators": lambda: [
+            derin.add_technical_indicators(df, t, t) for t, df in frames.items()
+        ],
+        "panel_engine": lambda: add_technical_indicators_panel(frames, names),
+        "compute_rsi_sma": lambda: [derin.compute_rsi_sma(df["close"]) for df in frames.values()],
+        "validate_prices": lambda: validate_prices(long_raw),
+        "save_csv": _quiet(lambda: derin.save_prices(full, os.path.join(tmp_dir, "bench.csv"))),
+    }
+
+    try:
+        import pyarrow  # noqa: F401
+        stages["save_parquet"] = lambda: derin.save_prices_dataset(full, os.path.join(tmp_dir, "bench_ds"))
+    except ImportError:
+        pass
+
+    # streaming: bar başına maliyet (toplam bar sayısı sınırlı)
+    first = next(iter(frames.values()))
+    stream_df = first.iloc[:min(len(first), STREAM_MAX_BARS)]
+
+    def _stream():
+        st = StreamingIndicators("T", "T")
+        for r in stream_df.to_dict("records"):
+            st.update(r)
+
+    stages["streaming_update"] = _stream
+
+    out = {"n_tickers": n_tickers, "kind": kind, "n_bars": n_bars, "rows": rows, "stages": {}}
+    for name, fn in stages.items():
+        sec, peak = measure(fn, repeat)
+        per = len(stream_df) if name == "streaming_update" else rows
+        out["stages"][name] = {
+            "seconds": round(sec, 6),
+            "peak_mb": round(peak / 1024**2, 3),
+            "us_per_row": round(sec / max(per, 1) * 1e6, 4),
+        }
+        print(f"  {kind:6s} tickers={n_tickers:<6d} {name:26s} "
+              f"{sec * 1e3:10.2f} ms  peak={peak / 1024**2:9.2f} MB")
+    return out
+
+
+def run(tickers: list[int], kinds: list[str], repeat: int) -> dict:
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "created": pd.Timestamp.now("UTC").isoformat(),
+        },
+        "cases": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_derin_") as tmp_dir:
+        for kind in kinds:
+            for n in tickers:
+                results["cases"].append(bench_case(n, kind, repeat, tmp_dir))
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list[str]:
+    """
+    Baseline ile aynı (kind, n_tickers, stage) ölçümlerini karşılaştırır.
+    Dönüş: regresyon mesajları (boşsa sorun yok).
+    """
+    base = {
+        (c["kind"], c["n_tickers"], stage): v["seconds"]
+        for c in baseline.get("cases", [])
+        for stage, v in c["stages"].items()
+    }
+    problems = []
+    for c in results["cases"]:
+        for stage, v in c["stages"].items():
+            ref = base.get((c["kind"], c["n_tickers"], stage))
+            if not ref:
+                continue
+            ratio = v["seconds"] / ref
+            if ratio > tolerance:
+                problems.append(
+                    f"{c['kind']} tickers={c['n_tickers']} {stage}: "
+                    f"{v['seconds'] * 1e3:.2f} ms (baseline {ref * 1e3:.2f} ms, x{ratio:.2f})"
+                )
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="derin.py gösterge/ingest benchmark'ı (sentetik veri)")
+    ap.add_argument("--tickers", default=",".join(map(str, DEFAULT_TICKERS)),
+                    help="virgüllü ticker sayıları, örn. 1,10,100,1000,10000")
+    ap.add_argument("--bars", default="daily", help="daily,minute")
+    ap.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    ap.add_argument("--out", default=None, help="sonuç JSON yolu")
+    ap.add_argument("--save-baseline", default=None, help="sonucu baseline olarak yaz")
+    ap.add_argument("--compare", default=None, help="baseline JSON ile karşılaştır")
+    ap.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = ap.parse_args(argv)
+
+    tickers = [int(x) for x in args.tickers.split(",") if x.strip()]
+    kinds = [k.strip() for k in args.bars.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in BARS]
+    if unknown:
+        ap.error(f"bilinmeyen bar türü: {unknown} (seçenekler: {list(BARS)})")
+
+    results = run(tickers, kinds, args.repeat)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"[OK] Kaydedildi: {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.tolerance)
+        if problems:
+            print("\n⚠️ Regresyon:")
+            for p in problems:
+                print("  " + p)
+            return 1
+        print("\n✅ Baseline'a göre regresyon yok.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
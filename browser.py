@@ -0,0 +1,526 @@
+import heapq
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psutil  # RSS ölçümü + süreç ağacı temizliği; yoksa sabit aralıklı yenileme
+except ImportError:
+    psutil = None
+
+# ================== TARAYICI HAVUZU ==================
+# N adet uzun ömürlü driver açılır; sayfa işleri ortak kuyruktan dağıtılır
+# (yavaş sayfaya takılan worker diğerlerini bekletmez). Sonuçlar iş sırasına
+# göre birleştirilir -> CSV'ye yazım sırası seri taramayla aynı kalır.
+#
+# Driver açma/kapama fonksiyonları dışarıdan verilir (yorumCekme.open_driver,
+# news.open_driver ...). Testlerde yerel HTTP sunucusuna giden sahte driver verilebilir.
+#
+# Yenileme neredeyse bedava: havuz `spares` kadar yedek driver'ı arka planda önceden açar;
+# replace() hazır yedeğe anında geçer, eskisi arka planda kapatılır. Yenileme sabit sayfa
+# sayısıyla değil, driver süreç ağacının ölçülen RSS'iyle tetiklenir (psutil yoksa sabit aralık).
+# Kapatırken chromedriver + tarayıcı süreç ağacı (Linux'ta süreç grubu) temizlenir.
+# =====================================================
+
+HEALTH_CHECK_EVERY = 10   # worker, her N sayfada bir driver'ı yoklar (hata sonrası hemen)
+RSS_CHECK_EVERY = 5       # her N sayfada bir süreç ağacının RSS'i ölçülür
+RSS_GROWTH = 2.5          # ilk ölçümün bu katına çıkınca yenile
+SPARE_WAIT_SEC = 60       # açılmakta olan yedek için en fazla bekleme (sonra senkron açılır)
+QUIT_GRACE_SEC = 3        # quit sonrası kalan süreçlere SIGTERM -> SIGKILL arası
+
+
+class LazyDriver:
+    """
+    Gerçek driver'ı ilk kullanımda açar (HTTP-önce taramada tarayıcı çoğu zaman hiç açılmaz).
+    Açılmamışken sağlıklı sayılır, quit() hiçbir şey yapmaz.
+    """
+
+    def __init__(self, open_fn, quit_fn=None):
+        self._open_fn = open_fn
+        self._quit_fn = quit_fn
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._driver is not None
+
+    def _real(self):
+        with self._lock:
+            if self._driver is None:
+                self._driver = self._open_fn()
+            return self._driver
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            # getattr(d, "_temp_ud", None) gibi yoklamalar driver'ı açmasın
+            raise AttributeError(name)
+        return getattr(self._real(), name)
+
+    def quit(self):
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is None:
+            return
+        if self._quit_fn is not None:
+            self._quit_fn(driver)
+        else:
+            driver.quit()
+
+
+def _unwrap(driver):
+    if isinstance(driver, LazyDriver):
+        return driver._driver
+    return driver
+
+
+def driver_processes(driver) -> list:
+    """chromedriver + tarayıcı ve tüm alt süreçleri (psutil.Process listesi; psutil yoksa [])."""
+    driver = _unwrap(driver)
+    if psutil is None or driver is None:
+        return []
+    service = getattr(driver, "service", None)
+    roots = [getattr(getattr(service, "process", None), "pid", None), getattr(driver, "browser_pid", None)]
+    procs = {}
+    for pid in roots:
+        if not pid:
+            continue
+        try:
+            root = psutil.Process(pid)
+            procs[root.pid] = root
+            for child in root.children(recursive=True):
+                procs[child.pid] = child
+        except psutil.Error:
+            pass
+    return list(procs.values())
+
+
+def driver_rss_mb(driver) -> float | None:
+    """Süreç ağacının toplam RSS'i (MB); ölçülemezse None."""
+    total = 0
+    procs = driver_processes(driver)
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 2**20 if procs else None
+
+
+def reap_processes(procs, grace: float = QUIT_GRACE_SEC):
+    """
+    quit() sonrası hâlâ yaşayan süreçler: Linux'ta önce ayrı süreç gruplarına SIGTERM
+    (ağaçtan kopmuş torunlar dahil; kendi grubumuza asla), sonra tek tek terminate -> kill.
+    """
+    alive = [p for p in procs if p.is_running()]
+    if not alive:
+        return
+    if hasattr(os, "killpg"):
+        own = os.getpgrp()
+        groups = set()
+        for p in alive:
+            try:
+                groups.add(os.getpgid(p.pid))
+            except OSError:
+                pass
+        for g in groups - {own}:
+            try:
+                os.killpg(g, signal.SIGTERM)
+            except OSError:
+                pass
+    for p in alive:
+        try:
+            p.terminate()
+        except psutil.Error:
+            pass
+    _, alive = psutil.wait_procs(alive, timeout=grace)
+    for p in alive:
+        try:
+            p.kill()
+        except psutil.Error:
+            pass
+
+
+def quit_driver(driver, quit_fn=None):
+    """quit_fn(driver) (yoksa driver.quit()) + geride kalan chromedriver/Chrome süreçlerinin temizliği."""
+    procs = driver_processes(driver)  # quit'ten ÖNCE: sonra ağaç kopar
+    try:
+        if quit_fn is not None:
+            quit_fn(driver)
+        else:
+            driver.quit()
+    except Exception:
+        pass
+    reap_processes(procs)
+
+
+# ----- popup / modal bastırma -----
+# Sayfa başına bekleyen kapatma denemeleri (WebDriverWait x seçici) yerine tarayıcı başına bir kez
+# Page.addScriptToEvaluateOnNewDocument: her belge oluşurken CSS ile gizler, MutationObserver ile
+# çerez onayına tıklar ve overlay'leri göründükleri anda siler. OneTrust onay çerezi önceden konur.
+POPUP_HIDE_SELECTORS = [
+    "#onetrust-banner-sdk", "#onetrust-consent-sdk", ".onetrust-pc-dark-filter",
+    "[role='dialog']", ".popup", ".modal", ".overlay", ".backdrop",
+]
+POPUP_ACCEPT_SELECTORS = ["button#onetrust-accept-btn-handler", "button[aria-label='Accept']"]
+CONSENT_COOKIE_DOMAINS = [".investing.com"]
+
+POPUP_GUARD_JS = """
+(() => {
+  if (window.__popupGuard) return;
+  window.__popupGuard = true;
+  const HIDE = %(hide)s;
+  const ACCEPT = %(accept)s;
+  const CSS = HIDE.join(",") + "{display:none!important}html,body{overflow:auto!important}";
+  const addStyle = () => {
+    const root = document.head || document.documentElement;
+    if (!root || document.getElementById("__popup_guard")) return;
+    const st = document.createElement("style");
+    st.id = "__popup_guard";
+    st.textContent = CSS;
+    root.appendChild(st);
+  };
+  const sweep = () => {
+    for (const sel of ACCEPT) {
+      const btn = document.querySelector(sel);
+      if (btn && !btn.dataset.popupGuard) {
+        btn.dataset.popupGuard = "1";
+        try { btn.click(); } catch (e) {}
+      }
+    }
+    for (const sel of HIDE) document.querySelectorAll(sel).forEach(el => el.remove());
+  };
+  let queued = false;
+  const schedule = () => {
+    addStyle();
+    if (queued) return;
+    queued = true;
+    setTimeout(() => { queued = false; sweep(); }, 30);
+  };
+  addStyle();
+  new MutationObserver(schedule).observe(document, {childList: true, subtree: true});
+})();
+""" % {"hide": json.dumps(POPUP_HIDE_SELECTORS), "accept": json.dumps(POPUP_ACCEPT_SELECTORS)}
+
+
+def install_popup_guard(driver, cookie_domains=CONSENT_COOKIE_DOMAINS) -> bool:
+    """Tarayıcı başına bir kez. True -> sonraki sayfalarda popup kapatma beklemeleri atlanabilir."""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": POPUP_GUARD_JS})
+    except Exception:
+        return False
+    closed = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+    for domain in cookie_domains:
+        try:
+            driver.execute_cdp_cmd("Network.setCookie", {
+                "name": "OptanonAlertBoxClosed", "value": closed, "domain": domain, "path": "/",
+                "expires": time.time() + 365 * 86400,
+            })
+        except Exception:
+            pass
+    return True
+
+
+def driver_is_healthy(driver) -> bool:
+    if isinstance(driver, LazyDriver) and not driver.is_open:
+        return True
+    try:
+        return driver.execute_script("return 1+1;") == 2
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """
+    open_fn() -> driver, quit_fn(driver). Driver'lar paralel açılır.
+
+        with DriverPool(lambda: open_driver(cfg), lambda d: safe_quit_driver(d, cfg), size=4, spares=1) as pool:
+            run_sharded(pages, process_fn, pool, on_result)
+
+    spares    : arka planda hazır tutulan yedek driver sayısı (replace() beklemeden ona geçer)
+    max_rss_mb: driver süreç ağacı bunu (ya da ilk ölçümün RSS_GROWTH katını) aşınca recycle() yeniler
+    """
+
+    def __init__(
+        self,
+        open_fn,
+        quit_fn,
+        size: int = 1,
+        health_fn=driver_is_healthy,
+        spares: int = 0,
+        max_rss_mb: float = 0,
+    ):
+        self.open_fn = open_fn
+        self.quit_fn = lambda d: quit_driver(d, quit_fn)
+        self.size = max(1, int(size))
+        self.health_fn = health_fn
+        self.spares = max(0, int(spares))
+        self.max_rss_mb = max_rss_mb
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._all = []
+        self._spare_q = queue.Queue()
+        self._launching = 0
+        self._closed = False
+        self._usage = {}  # id(driver) -> {"pages", "rss0"}
+        self._bg = ThreadPoolExecutor(max_workers=max(2, self.spares + 1), thread_name_prefix="driver-bg")
+
+    def start(self):
+        errors = []
+
+        def _open(_):
+            try:
+                return self.open_fn()
+            except Exception as e:
+                errors.append(e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            for d in ex.map(_open, range(self.size)):
+                if d is not None:
+                    self._track(d)
+                    self._idle.put(d)
+
+        if not self._all:
+            raise RuntimeError(f"Hiç driver açılamadı. Son hata: {errors[-1] if errors else None}")
+        if errors:
+            print(f"⚠️ Havuz: {len(errors)} driver açılamadı, {len(self._all)} driver ile devam.")
+        self._fill_spares()
+        return self
+
+    # ---------- yedekler ----------
+    def _fill_spares(self):
+        with self._lock:
+            if self._closed:
+                return
+            n = self.spares - self._spare_q.qsize() - self._launching
+            self._launching += max(0, n)
+        for _ in range(n):
+            self._bg.submit(self._launch_spare)
+
+    def _launch_spare(self):
+        try:
+            driver = self.open_fn()
+        except Exception as e:
+            print(f"⚠️ Havuz: yedek driver açılamadı: {e}")
+            driver = None
+        with self._lock:
+            self._launching -= 1
+            closed = self._closed
+        if driver is None:
+            return
+        if closed:
+            self.quit_fn(driver)
+            return
+        self._spare_q.put(driver)
+
+    def _take_spare(self):
+        try:
+            return self._spare_q.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            launching = self._launching
+        if launching:
+            try:
+                return self._spare_q.get(timeout=SPARE_WAIT_SEC)
+            except queue.Empty:
+                pass
+        return None
+
+    def _track(self, driver):
+        with self._lock:
+            self._all.append(driver)
+
+    def _untrack(self, driver):
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+
+    @property
+    def alive(self) -> int:
+        with self._lock:
+            return len(self._all)
+
+    def acquire(self, timeout: float | None = None):
+        return self._idle.get(timeout=timeout)
+
+    def release(self, driver):
+        if driver is not None:
+            self._idle.put(driver)
+
+    def replace(self, driver):
+        """
+        Bozuk/yorgun driver'ı yenisiyle değiştirir (açılamazsa None).
+        Hazır yedek varsa anında ona geçilir; eski driver arka planda kapatılır.
+        """
+        if driver is not None:
+            self._untrack(driver)
+            self._usage.pop(id(driver), None)
+            self._bg.submit(self.quit_fn, driver)
+        new = self._take_spare() if self.spares else None
+        if new is None:
+            try:
+                new = self.open_fn()
+            except Exception as e:
+                print(f"⚠️ Havuz: yeni driver açılamadı: {e}")
+                new = None
+        if new is not None:
+            self._track(new)
+        if self.spares:
+            self._fill_spares()
+        return new
+
+    def recycle(self, driver, restart_every: int = 0):
+        """
+        Sayfa sonrası çağrılır; gerekirse driver'ı yeniler ve kullanılacak driver'ı döndürür.
+        RSS ölçülebiliyorsa yenileme RSS'e göre, ölçülemiyorsa her restart_every sayfada bir (0 -> hiç).
+        """
+        if driver is None:
+            return None
+        u = self._usage.setdefault(id(driver), {"pages": 0, "rss0": None})
+        u["pages"] += 1
+        reason = None
+        if u["pages"] % RSS_CHECK_EVERY == 0:
+            rss = driver_rss_mb(driver)
+            if rss is not None:
+                if u["rss0"] is None:
+                    u["rss0"] = rss
+                elif rss >= RSS_GROWTH * u["rss0"] or (self.max_rss_mb and rss >= self.max_rss_mb):
+                    reason = f"RSS {u['rss0']:.0f} -> {rss:.0f} MB"
+        if reason is None and u["rss0"] is None and restart_every > 0 and u["pages"] % restart_every == 0:
+            reason = f"{u['pages']} sayfa"
+        if reason is None:
+            return driver
+        print(f"♻️ Driver yenileniyor ({reason}){' - hazır yedeğe geçiliyor' if self._spare_q.qsize() else ''}.")
+        return self.replace(driver)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            drivers, self._all = self._all, []
+        self._bg.shutdown(wait=True)  # açılmakta olan yedekler ve arka plan kapanışları
+        while True:
+            try:
+                drivers.append(self._spare_q.get_nowait())
+            except queue.Empty:
+                break
+        for d in drivers:
+            try:
+                self.quit_fn(d)
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_sharded(
+    jobs,
+    process_fn,
+    pool: DriverPool,
+    on_result,
+    stop_fn=None,
+    restart_every: int = 0,
+    after_job_fn=None,
+):
+    """
+    jobs       : sıralı iş listesi (sayfa no, (base_url, sayfa) ...)
+    process_fn : (driver, job) -> sonuç; hata fırlatırsa on_result'a err olarak gider
+    on_result  : (job, result, err) -> çağıran thread'de, İŞ SIRASIYLA çağrılır
+    stop_fn    : (job, result) -> True ise bu işten sonraki işler bırakılır (ör. boş sayfa = son)
+    restart_every: RSS ölçülemezse worker driver'ını her N işte bir yeniler (0 -> hiç); bkz. DriverPool.recycle
+    after_job_fn : (worker_id, n_done) -> worker thread'inde iş sonrası (bekleme/mola için)
+
+    Dönüş: işlenen (on_result'a verilen) iş sayısı.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return 0
+
+    todo = queue.Queue()
+    for i, job in enumerate(jobs):
+        todo.put((i, job))
+
+    done = queue.Queue()
+    stop_at = [len(jobs)]  # bu index'ten sonraki işler dağıtılmaz
+    n_workers = min(pool.alive, len(jobs))
+
+    def worker(wid: int):
+        driver = pool.acquire()
+        n_done = 0
+        since_check = 0
+        try:
+            while True:
+                try:
+                    i, job = todo.get_nowait()
+                except queue.Empty:
+                    return
+                if i > stop_at[0]:
+                    continue
+
+                if driver is None or since_check >= HEALTH_CHECK_EVERY:
+                    since_check = 0
+                    if driver is None or not pool.health_fn(driver):
+                        print(f"🩺 Worker {wid}: driver sağlıksız, yenileniyor.")
+                        driver = pool.replace(driver)
+                        if driver is None:
+                            done.put((i, job, None, RuntimeError("driver açılamadı")))
+                            continue
+
+                try:
+                    res, err = process_fn(driver, job), None
+                except Exception as e:
+                    res, err = None, e
+                    since_check = HEALTH_CHECK_EVERY  # bir sonraki işte hemen yokla
+                done.put((i, job, res, err))
+
+                n_done += 1
+                since_check += 1
+                driver = pool.recycle(driver, restart_every)
+                if after_job_fn is not None:
+                    after_job_fn(wid, n_done)
+        finally:
+            done.put(None)  # worker bitti işareti
+            pool.release(driver)
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(n_workers)]
+    for t in threads:
+        t.start()
+
+    # sıralı birleştirme: bitmiş ama sırası gelmemiş sonuçlar heap'te bekler
+    pending = []
+    next_i = 0
+    emitted = 0
+    finished = 0
+    while finished < n_workers:
+        item = done.get()
+        if item is None:
+            finished += 1
+        else:
+            heapq.heappush(pending, (item[0], item))
+
+        while pending and pending[0][0] == next_i:
+            _, (i, job, res, err) = heapq.heappop(pending)
+            next_i += 1
+            if i > stop_at[0]:
+                continue
+            on_result(job, res, err)
+            emitted += 1
+            if err is None and stop_fn is not None and stop_fn(job, res):
+                stop_at[0] = i
+
+        # stop sonrası kalan index'ler hiç gelmeyecek; heap'te sadece stop öncesi beklenir
+        if next_i > stop_at[0]:
+            pending = []
+
+    for t in threads:
+        t.join()
+    return emitted
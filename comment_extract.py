@@ -0,0 +1,330 @@
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+
+from lxml import etree, html as lxml_html
+
+# ================== OFFLINE YORUM ÇIKARIMI ==================
+# Sayfanın HTML'i bir kez alınır (driver.page_source ya da düz HTTP) ve tüm
+# yorum kartları lxml ile ayrıştırılır. WebDriver'a yorum başına onlarca IPC
+# çağrısı yerine sayfa başına tek çağrı. Satırlar yorum scraper'larının
+# extract_comments_from_page çıktısıyla aynı alanları/kuralları taşır.
+#
+# "network" modu: yorumlar sayfanın kendi XHR/fetch JSON yanıtlarından (network_capture)
+# ve HTML'e gömülü __NEXT_DATA__'dan okunur -> tam comment_id / like / dislike, scroll yok.
+# JSON'da yorum bulunamazsa HTML kartlarına düşülür.
+# ============================================================
+
+CSV_FIELDS = [
+    "page", "index_in_page", "datetime", "username", "like", "dislike",
+    "comment_id", "comment", "hash", "source_url"
+]
+
+CARD_MAX_DEPTH = 7
+
+# derlenmiş seçiciler (CSS eşdeğerleri yanda)
+_X_CONTAINER = etree.XPath('//*[@id="comments_new"]')                                   # #comments_new
+_X_COMMENTS = etree.XPath(
+    './/div[contains(concat(" ", normalize-space(@class), " "), " break-words ")'
+    ' and contains(concat(" ", normalize-space(@class), " "), " leading-5 ")]'           # div.break-words.leading-5
+)
+_X_MEMBER = etree.XPath('.//a[starts-with(@href, "/members/")]')                         # a[href^="/members/"]
+_X_DATE = etree.XPath('.//span[@data-test="comment-date"]')                             # span[data-test="comment-date"]
+_X_ARIA = etree.XPath(".//*[@aria-label]")
+_X_BUTTONS = etree.XPath(".//button")
+_X_SPANS = etree.XPath(".//span[normalize-space(text())!='']")
+_X_COMMENT_ID = etree.XPath("descendant-or-self::*[@data-comment-id]/@data-comment-id")
+_X_DATA_ID = etree.XPath("descendant-or-self::*[@data-id]/@data-id")
+
+_X_NEXT_DATA = etree.XPath('//script[@id="__NEXT_DATA__"]/text()')
+
+# JSON yorum kaydı: metin + id alanı olan sözlük. Anahtarlar sırayla denenir.
+PAYLOAD_ID_KEYS = ("comment_id", "commentId", "id")
+PAYLOAD_TEXT_KEYS = ("comment", "commentText", "content", "text", "body", "message")
+PAYLOAD_USER_KEYS = ("username", "userName", "user_name", "nickname", "displayName", "name")
+PAYLOAD_USER_OBJ_KEYS = ("user", "author", "member")
+PAYLOAD_DATE_KEYS = ("datetime", "date", "created_at", "createdAt", "created", "timestamp", "time")
+PAYLOAD_LIKE_KEYS = ("like", "likes", "likeCount", "like_count", "likesCount", "upvotes", "thumbsUp")
+PAYLOAD_DISLIKE_KEYS = ("dislike", "dislikes", "dislikeCount", "dislike_count", "dislikesCount", "downvotes",
+                        "thumbsDown")
+
+_BLOCK_TAGS = {"div", "p", "li", "ul", "ol", "section", "article", "blockquote", "pre", "tr", "table",
+               "h1", "h2", "h3", "h4", "h5", "h6"}
+_WS = re.compile(r"[ \t\r\f\v\u00a0]+")
+_NUM = re.compile(r"\d+")
+
+
+def comment_hash(text: str) -> str:
+    return hashlib.sha1(text.strip().encode("utf-8")).hexdigest()
+
+
+def visible_text(el) -> str:
+    """
+    WebElement.text yaklaşımı: <br> ve blok elemanlar satır sonu, satır içi boşluklar tek boşluk,
+    boş satırlar atılır. script/style yok sayılır.
+    """
+    parts = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else ""
+        if tag in ("script", "style", "template"):
+            if node.tail:
+                parts.append(node.tail)
+            return
+        if tag == "br":
+            parts.append("\n")
+        elif tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if node.text and tag:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if node.tail and node is not el:
+            parts.append(node.tail)
+
+    walk(el)
+    lines = (_WS.sub(" ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def find_card(comment_el):
+    """Yorum metninden yukarı çıkıp hem kullanıcı linki hem tarih içeren ilk atayı bulur (en fazla 7)."""
+    card = comment_el
+    for _ in range(CARD_MAX_DEPTH):
+        parent = card.getparent()
+        if parent is None:
+            break
+        card = parent
+        if _X_MEMBER(card) and _X_DATE(card):
+            break
+    return card
+
+
+def extract_like_dislike(card):
+    like = ""
+    dislike = ""
+
+    for el in _X_ARIA(card):
+        al = (el.get("aria-label") or "").lower()
+        if like == "" and ("like" in al or "beğen" in al):
+            nums = _NUM.findall(al)
+            if nums:
+                like = nums[0]
+        if dislike == "" and ("dislike" in al or "beğenme" in al):
+            nums = _NUM.findall(al)
+            if nums:
+                dislike = nums[0]
+
+    if like == "" or dislike == "":
+        nums = []
+        for b in _X_BUTTONS(card):
+            t = visible_text(b)
+            if t.isdigit():
+                nums.append(t)
+            else:
+                nums.extend(_NUM.findall(t))
+        if like == "" and len(nums) >= 1:
+            like = nums[0]
+        if dislike == "" and len(nums) >= 2:
+            dislike = nums[1]
+
+    if like == "" or dislike == "":
+        nums = [t for t in (visible_text(s) for s in _X_SPANS(card)) if t.isdigit()]
+        if like == "" and len(nums) >= 1:
+            like = nums[0]
+        if dislike == "" and len(nums) >= 2:
+            dislike = nums[1]
+
+    return like, dislike
+
+
+def extract_comment_id(card, member_fallback: bool = False) -> str:
+    for xp in (_X_COMMENT_ID, _X_DATA_ID):
+        for v in xp(card):
+            if _NUM.fullmatch(v or ""):
+                return v
+    if member_fallback:
+        members = _X_MEMBER(card)
+        if members:
+            href = members[0].get("href") or ""
+            return href.split("/members/")[-1].split("/")[0].strip()
+    return ""
+
+
+def _first_text(xp, card) -> str:
+    found = xp(card)
+    return visible_text(found[0]) if found else ""
+
+
+def parse_html(html: str):
+    return lxml_html.fromstring(html) if html else None
+
+
+def extract_comments_from_html(html: str, page: int, source_url: str, member_id_fallback: bool = False):
+    """
+    Sayfa HTML'i -> CSV_FIELDS satırları (boş/yorumsuz sayfada []).
+    member_id_fallback: comment_id bulunamazsa /members/<id> linkinden al (yorumNew davranışı).
+    """
+    root = parse_html(html) if isinstance(html, str) else html
+    if root is None:
+        return []
+    containers = _X_CONTAINER(root)
+    if not containers:
+        return []
+
+    rows = []
+    for idx, ce in enumerate(_X_COMMENTS(containers[0]), start=1):
+        comment_text = visible_text(ce)
+        if not comment_text:
+            continue
+
+        card = find_card(ce)
+        like, dislike = extract_like_dislike(card)
+
+        rows.append({
+            "page": page,
+            "index_in_page": idx,
+            "datetime": _first_text(_X_DATE, card),
+            "username": _first_text(_X_MEMBER, card),
+            "like": like,
+            "dislike": dislike,
+            "comment_id": extract_comment_id(card, member_id_fallback),
+            "comment": comment_text,
+            "hash": comment_hash(comment_text),
+            "source_url": source_url,
+        })
+    return rows
+
+
+# ================== JSON YÜKÜNDEN ÇIKARIM ==================
+def _first_key(d: dict, keys):
+    for k in keys:
+        v = d.get(k)
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def _payload_text(v) -> str:
+    if not isinstance(v, str):
+        return ""
+    if "<" in v and ">" in v:
+        # HTML gövde (<p>, <br>) -> kartlardaki gibi görünen metin
+        return visible_text(lxml_html.fragment_fromstring(v, create_parent="div"))
+    return v.strip()
+
+
+def _payload_datetime(v) -> str:
+    if isinstance(v, bool) or v is None:
+        return ""
+    if isinstance(v, (int, float)):
+        ts = v / 1000 if v > 1e11 else v   # ms / sn
+        return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return str(v).strip()
+
+
+def _payload_count(v) -> str:
+    if isinstance(v, bool) or v is None:
+        return ""
+    if isinstance(v, (int, float)):
+        return str(int(v))
+    m = _NUM.search(str(v))
+    return m.group(0) if m else ""
+
+
+def _payload_user(d: dict) -> str:
+    for k in PAYLOAD_USER_OBJ_KEYS:
+        v = d.get(k)
+        if isinstance(v, dict):
+            name = _first_key(v, PAYLOAD_USER_KEYS)
+            if name is not None:
+                return str(name).strip()
+        elif isinstance(v, str) and v.strip():
+            return v.strip()
+    name = _first_key(d, PAYLOAD_USER_KEYS[:-1])  # düz "name" yorum kaydında belirsiz
+    return str(name).strip() if name is not None else ""
+
+
+def _as_comment(d: dict):
+    text = _payload_text(_first_key(d, PAYLOAD_TEXT_KEYS))
+    cid = _first_key(d, PAYLOAD_ID_KEYS)
+    if not text or cid is None or isinstance(cid, (dict, list)):
+        return None
+    return {
+        "datetime": _payload_datetime(_first_key(d, PAYLOAD_DATE_KEYS)),
+        "username": _payload_user(d),
+        "like": _payload_count(_first_key(d, PAYLOAD_LIKE_KEYS)),
+        "dislike": _payload_count(_first_key(d, PAYLOAD_DISLIKE_KEYS)),
+        "comment_id": str(cid),
+        "comment": text,
+    }
+
+
+def iter_payload_comments(obj, under_key: str | None = None):
+    """
+    JSON ağacını sırayla dolaşıp yorum kayıtlarını verir (yanıtlar/replies dahil).
+    under_key: sadece adı bunu içeren bir anahtarın altındaki kayıtlar (ör. __NEXT_DATA__ içinde "comment").
+    """
+    stack = [(obj, under_key is None)]
+    while stack:
+        node, inside = stack.pop()
+        if isinstance(node, dict):
+            rec = _as_comment(node) if inside else None
+            if rec is not None:
+                yield rec
+            children = []
+            for k, v in node.items():
+                if isinstance(v, (dict, list)):
+                    children.append((v, inside or under_key.lower() in str(k).lower()))
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend((v, inside) for v in reversed(node))
+
+
+def embedded_payloads(root) -> list:
+    """HTML'e gömülü JSON (Next.js __NEXT_DATA__)."""
+    out = []
+    for raw in _X_NEXT_DATA(root) if root is not None else ():
+        try:
+            out.append(json.loads(raw))
+        except ValueError:
+            pass
+    return out
+
+
+def extract_comments_from_payloads(payloads, page: int, source_url: str, under_key: str | None = None):
+    """JSON yükleri -> CSV_FIELDS satırları (aynı comment_id bir kez)."""
+    rows = []
+    seen_ids = set()
+    for payload in payloads:
+        for rec in iter_payload_comments(payload, under_key):
+            if rec["comment_id"] in seen_ids:
+                continue
+            seen_ids.add(rec["comment_id"])
+            rows.append({
+                "page": page,
+                "index_in_page": len(rows) + 1,
+                **rec,
+                "hash": comment_hash(rec["comment"]),
+                "source_url": source_url,
+            })
+    return rows
+
+
+def extract_comments_structured(html, payloads, page: int, source_url: str, member_id_fallback: bool = False):
+    """
+    network modu: gömülü __NEXT_DATA__ (sayfanın ilk yorumları) + yakalanan XHR yanıtları;
+    ikisinde de yorum yoksa HTML kartları (extract_comments_from_html).
+    """
+    root = parse_html(html) if isinstance(html, str) else html
+    # XHR yanıtları zaten yorum URL'lerinden; __NEXT_DATA__'da sadece "comment" anahtarlarının altı
+    rows = extract_comments_from_payloads(
+        embedded_payloads(root) + [{"comments": p} for p in payloads or ()],
+        page, source_url, under_key="comment",
+    )
+    if rows:
+        return rows
+    return extract_comments_from_html(root, page, source_url, member_id_fallback)
@@ -0,0 +1,211 @@
+import codecs
+import csv
+import glob
+import io
+import os
+import re
+import time
+
+from comment_extract import CSV_FIELDS
+
+# ================== YORUM ÇIKTISI (SINK) ==================
+# Satırlar bellekte tamponlanır; satır sayısı ya da süre dolunca tek seferde diske yazılır.
+#   "csv"     : tek CSV dosyası (eski çıktıyla aynı), flush başına tek write + fsync
+#   "csv.zst" : <out>_parts/part-00001.csv.zst ... (zstd sıkıştırmalı, başlıklı CSV segmentleri)
+#   "parquet" : <out>_parts/part-00001.parquet ... (zstd, tipli kolonlar)
+#
+# Kilitlenmeye dayanıklılık: flush() diske yazdığı noktayı ({"bytes": n} / {"segments": k})
+# döndürür; çağıran taraf bunu checkpoint ile AYNI commit'te saklar. Yeniden açılışta
+# checkpoint'ten sonra kalan yarım veri (CSV kuyruğu / fazla segment) atılır -> sayfalar
+# yeniden taranır, çift satır ya da kayıp olmaz.
+# ==========================================================
+
+SINK_FORMAT = "csv"          # "csv" | "csv.zst" | "parquet"
+SINK_FLUSH_ROWS = 2000
+SINK_FLUSH_SEC = 30.0
+SINK_FORMATS = ("csv", "csv.zst", "parquet")
+
+INT_FIELDS = ("page", "index_in_page")
+
+_PART_RE = re.compile(r"part-(\d+)\.")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet / zstd çıktı için pyarrow gerekli: pip install pyarrow") from e
+    return pa, pq
+
+
+def parts_dir(out_path: str) -> str:
+    return f"{os.path.splitext(out_path)[0]}_parts"
+
+
+def list_parts(out_path: str) -> dict:
+    """{segment no: yol} (yarım kalmış .tmp dosyaları hariç)."""
+    out = {}
+    for path in glob.glob(os.path.join(parts_dir(out_path), "part-*")):
+        m = _PART_RE.match(os.path.basename(path))
+        if m and not path.endswith(".tmp"):
+            out[int(m.group(1))] = path
+    return out
+
+
+def _fsync_replace(tmp: str, path: str):
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class CommentSink:
+    """
+        sink = CommentSink("tesla.csv", CSV_FIELDS, fmt="parquet", state=checkpoint.get("sink"))
+        sink.add(rows, page)
+        if sink.due():
+            state = sink.flush()      # veri diskte (fsync)
+            ... state'i checkpoint ile birlikte commit et ...
+    """
+
+    def __init__(
+        self,
+        out_path: str,
+        fields,
+        fmt: str = SINK_FORMAT,
+        flush_rows: int = SINK_FLUSH_ROWS,
+        flush_sec: float = SINK_FLUSH_SEC,
+        state: dict | None = None,
+    ):
+        if fmt not in SINK_FORMATS:
+            raise ValueError(f"Bilinmeyen çıktı formatı: {fmt} (seçenekler: {SINK_FORMATS})")
+        if fmt != "csv":
+            _require_pyarrow()
+        self.out_path = out_path
+        self.fields = list(fields)
+        self.fmt = fmt
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_sec = float(flush_sec)
+        self.last_page = None      # tampondaki en son sayfa (checkpoint'e yazılacak)
+        self.dirty = False         # son flush'tan beri add() çağrıldı mı
+        self._buf = []
+        self._t_flush = time.monotonic()
+        self._recover(state or {})
+
+    # ---------- kurtarma ----------
+    def _recover(self, state: dict):
+        if self.fmt == "csv":
+            committed = state.get("bytes")
+            size = os.path.getsize(self.out_path) if os.path.exists(self.out_path) else 0
+            if committed is not None and size > committed:
+                print(f"♻️ {self.out_path}: checkpoint sonrası {size - committed} byte yarım veri atıldı.")
+                with open(self.out_path, "r+b") as f:
+                    f.truncate(committed)
+            return
+
+        d = parts_dir(self.out_path)
+        os.makedirs(d, exist_ok=True)
+        for tmp in glob.glob(os.path.join(d, "*.tmp")):
+            os.remove(tmp)
+        existing = list_parts(self.out_path)
+        committed = state.get("segments")
+        if committed is None:
+            committed = max(existing, default=0)
+        for n, path in existing.items():
+            if n > committed:
+                print(f"♻️ {path}: checkpoint sonrası segment atıldı.")
+                os.remove(path)
+        self._segments = committed
+
+    # ---------- yazma ----------
+    def add(self, rows, page: int):
+        self._buf.extend(rows)
+        self.last_page = page
+        self.dirty = True
+
+    def due(self) -> bool:
+        return len(self._buf) >= self.flush_rows or (
+            self.dirty and time.monotonic() - self._t_flush >= self.flush_sec
+        )
+
+    def state(self) -> dict:
+        if self.fmt == "csv":
+            return {"bytes": os.path.getsize(self.out_path) if os.path.exists(self.out_path) else 0}
+        return {"segments": self._segments}
+
+    def flush(self) -> dict:
+        """Tamponu diske yazar (fsync) ve commit edilecek sink durumunu döndürür."""
+        rows, self._buf = self._buf, []
+        self.dirty = False
+        self._t_flush = time.monotonic()
+        if rows:
+            if self.fmt == "csv":
+                self._append_csv(rows)
+            else:
+                self._write_segment(rows)
+        return self.state()
+
+    def _csv_text(self, rows, header: bool) -> str:
+        buf = io.StringIO()
+        w = csv.DictWriter(buf, fieldnames=self.fields, extrasaction="ignore")
+        if header:
+            w.writeheader()
+        w.writerows(rows)
+        return buf.getvalue()
+
+    def _append_csv(self, rows):
+        new = not os.path.exists(self.out_path) or os.path.getsize(self.out_path) == 0
+        data = self._csv_text(rows, header=new).encode("utf-8")
+        if new:
+            data = codecs.BOM_UTF8 + data   # eski çıktı gibi utf-8-sig
+        with open(self.out_path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_segment(self, rows):
+        pa, pq = _require_pyarrow()
+        n = self._segments + 1
+        path = os.path.join(parts_dir(self.out_path), f"part-{n:05d}.{self.fmt}")
+        tmp = f"{path}.tmp"
+        if self.fmt == "parquet":
+            cols = {
+                f: pa.array([r.get(f) for r in rows], pa.int32() if f in INT_FIELDS else pa.string())
+                for f in self.fields
+            }
+            pq.write_table(pa.table(cols), tmp, compression="zstd")
+        else:
+            with pa.CompressedOutputStream(tmp, "zstd") as out:
+                out.write(self._csv_text(rows, header=True).encode("utf-8"))
+        _fsync_replace(tmp, path)
+        self._segments = n
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+
+def read_comments(out_path: str, fmt: str = SINK_FORMAT, fields=CSV_FIELDS):
+    """Sink çıktısını tek DataFrame olarak okur (segmentler sırasıyla birleştirilir)."""
+    import pandas as pd
+
+    dtypes = {f: "int32" if f in INT_FIELDS else str for f in fields}
+    if fmt == "csv":
+        return pd.read_csv(out_path, encoding="utf-8-sig", dtype=dtypes, keep_default_na=False)
+
+    pa, pq = _require_pyarrow()
+    paths = [p for _, p in sorted(list_parts(out_path).items())]
+    if not paths:
+        return pd.DataFrame(columns=list(fields))
+    if fmt == "parquet":
+        return pa.concat_tables([pq.read_table(p) for p in paths]).to_pandas()
+
+    import pyarrow.csv as pcsv
+    opts = pcsv.ConvertOptions(
+        column_types={f: pa.int32() if f in INT_FIELDS else pa.string() for f in fields},
+        strings_can_be_null=False,
+    )
+    tables = []
+    for p in paths:
+        with pa.input_stream(p, compression="zstd") as src:
+            tables.append(pcsv.read_csv(src, convert_options=opts))
+    return pa.concat_tables(tables).to_pandas()
@@ -0,0 +1,271 @@
+import asyncio
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from crawl_http import (
+    DEFAULT_HEADERS,
+    GONE_STATUS,
+    HTTP_TIMEOUT_SEC,
+    has_comments_container,
+    looks_blocked,
+)
+
+# ================== ASYNC TARAMA MOTORU ==================
+# time.sleep ile bekleme yerine: host başına token-bucket (istek/sn + burst) ve
+# eşzamanlı istek tavanı. Bütçe izin verdiği sürece istekler boşluksuz uçuşta kalır.
+#
+#   rate  : host başına saniyedeki istek (0 -> sınırsız)
+#   burst : boştayken art arda atılabilecek istek sayısı
+#   max_in_flight: aynı anda açık istek
+#
+# HTTP yanıtı kullanılamazsa (challenge / #comments_new yok) fallback_fn (tarayıcı)
+# ayrı bir thread havuzunda çalıştırılır; event loop bloklanmaz.
+# =========================================================
+
+DEFAULT_RATE_PER_SEC = 2.0
+DEFAULT_BURST = 4
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+class TokenBucket:
+    """
+    Rezervasyonlu token-bucket: her acquire bir token ayırır, token yoksa
+    sırası gelene kadar bekler (FIFO, meşgul döngü yok). Tek event loop içinde kullanılır.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.t = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.t) * self.rate)
+        self.t = now
+
+    def reserve(self) -> float:
+        """Bir token ayırır, beklenecek süreyi (sn) döndürür."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def rate_from_config(cfg) -> tuple[float, int]:
+    """
+    ScrapeConfig -> (istek/sn, burst).
+    requests_per_sec verilmemişse eski bekleme ayarlarından türetilir: 1 / ortalama(min_sleep, max_sleep).
+    """
+    rate = float(getattr(cfg, "requests_per_sec", 0) or 0)
+    if rate <= 0:
+        mean_sleep = (cfg.min_sleep + cfg.max_sleep) / 2
+        rate = 1.0 / mean_sleep if mean_sleep > 0 else 0.0
+    burst = int(getattr(cfg, "burst", 0) or DEFAULT_BURST)
+    return rate, burst
+
+
+class OrderedEmitter:
+    """
+    Sırasız biten işleri iş sırasına göre on_result'a verir (tek thread / event loop).
+    stop_fn True dönerse o işten sonraki index'ler atılır.
+    """
+
+    def __init__(self, on_result, stop_fn=None, n_jobs: int = 0):
+        self.on_result = on_result
+        self.stop_fn = stop_fn
+        self.stop_at = n_jobs
+        self.emitted = 0
+        self._pending = []
+        self._next = 0
+
+    def stopped(self, i: int) -> bool:
+        return i > self.stop_at
+
+    def push(self, i, job, res, err):
+        heapq.heappush(self._pending, (i, job, res, err))
+        while self._pending and self._pending[0][0] == self._next:
+            j, jb, r, e = heapq.heappop(self._pending)
+            self._next += 1
+            if j > self.stop_at:
+                continue
+            self.on_result(jb, r, e)
+            self.emitted += 1
+            if e is None and self.stop_fn is not None and self.stop_fn(jb, r):
+                self.stop_at = j
+
+
+async def fetch_html(session, url: str, bucket: TokenBucket | None, require_comments: bool = True):
+    """
+    Tek sayfa: bucket'tan token al (None -> beklemeden), GET, yanıtı sınıflandır.
+    Dönüş: (html | None, sebep, tarayıcıya_düşülebilir_mi, sonuç)
+    sonuç: pacing.OUTCOMES'tan biri ("ok", "blocked", "no_comments", "error") ya da None (gone)
+    """
+    if bucket is not None:
+        await bucket.acquire()
+    try:
+        async with session.get(url) as r:
+            html = await r.text(errors="replace")
+            status = r.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return None, f"hata: {e!r}", True, "error"
+    if looks_blocked(status, html):
+        return None, f"challenge/blok (HTTP {status})", True, "blocked"
+    if status in GONE_STATUS:
+        return None, f"HTTP {status}", False, None  # tarayıcı da aynısını görür
+    if status != 200:
+        return None, f"HTTP {status}", True, "error"
+    if require_comments and not has_comments_container(html):
+        return None, "#comments_new yok", True, "no_comments"
+    return html, "", False, "ok"
+
+
+def host_bucket(buckets: dict, url: str, rate: float, burst: int) -> TokenBucket:
+    host = urlsplit(url).netloc
+    bucket = buckets.get(host)
+    if bucket is None:
+        bucket = buckets[host] = TokenBucket(rate, burst)
+    return bucket
+
+
+async def _crawl(
+    jobs,
+    url_fn,
+    parse_fn,
+    on_result,
+    rate: float,
+    burst: int,
+    max_in_flight: int,
+    per_host_in_flight: int,
+    timeout: float,
+    fallback_fn,
+    fallback_workers: int,
+    stop_fn,
+    require_comments: bool,
+    headers: dict,
+    pacer,
+) -> dict:
+    jobs = list(jobs)
+    stats = {"http_ok": 0, "fallback": 0, "gone": 0, "error": 0, "pages": 0}
+    if not jobs:
+        return stats
+
+    loop = asyncio.get_running_loop()
+    buckets = {}
+    todo = asyncio.Queue()
+    for i, job in enumerate(jobs):
+        todo.put_nowait((i, job))
+
+    emitter = OrderedEmitter(on_result, stop_fn, len(jobs))
+    in_flight = [0]
+    executor = ThreadPoolExecutor(max_workers=max(1, fallback_workers)) if fallback_fn else None
+
+    async def worker(session):
+        while True:
+            try:
+                i, job = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if emitter.stopped(i):
+                continue
+
+            url = url_fn(job)
+            bucket = host_bucket(buckets, url, rate, burst)
+            if pacer is not None:
+                # eşzamanlılık ve hız pacer'dan (AIMD) okunur
+                while in_flight[0] >= pacer.concurrency:
+                    await asyncio.sleep(0.05)
+                bucket.rate = pacer.rate
+            in_flight[0] += 1
+            try:
+                try:
+                    # gecikme ölçümüne token beklemesi girmesin (yoksa yavaşlama kendini besler)
+                    await bucket.acquire()
+                    t0 = time.perf_counter()
+                    html, reason, can_fallback, outcome = await fetch_html(session, url, None, require_comments)
+                finally:
+                    in_flight[0] -= 1
+                if pacer is not None and outcome is not None:
+                    pacer.observe(outcome, time.perf_counter() - t0 if outcome == "ok" else None)
+                if html is not None:
+                    stats["http_ok"] += 1
+                elif can_fallback and fallback_fn is not None:
+                    stats["fallback"] += 1
+                    print(f"↪️ {url}: HTTP yetmedi ({reason}), tarayıcı ile açılıyor...")
+                    html = await loop.run_in_executor(executor, fallback_fn, job, url)
+                elif outcome is None:
+                    # 404/410: liste burada bitiyor -> boş sonuç (stop_fn sonraki işleri bırakır)
+                    stats["gone"] += 1
+                    print(f"ℹ️ {url}: {reason}, sayfa yok (liste sonu).")
+                    emitter.push(i, job, [], None)
+                    continue
+                else:
+                    raise RuntimeError(f"{url}: {reason}")
+                res, err = parse_fn(job, html), None
+            except Exception as e:
+                stats["error"] += 1
+                res, err = None, e
+            emitter.push(i, job, res, err)
+
+    connector = aiohttp.TCPConnector(limit=max_in_flight, limit_per_host=per_host_in_flight, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    try:
+        async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=client_timeout) as session:
+            await asyncio.gather(*(worker(session) for _ in range(min(max_in_flight, len(jobs)))))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    stats["pages"] = emitter.emitted
+    return stats
+
+
+def crawl_pages(
+    jobs,
+    url_fn,
+    parse_fn,
+    on_result,
+    rate: float = DEFAULT_RATE_PER_SEC,
+    burst: int = DEFAULT_BURST,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    per_host_in_flight: int = 0,
+    timeout: float = HTTP_TIMEOUT_SEC,
+    fallback_fn=None,
+    fallback_workers: int = 1,
+    stop_fn=None,
+    require_comments: bool = True,
+    headers: dict | None = None,
+    pacer=None,
+) -> dict:
+    """
+    jobs      : sıralı iş listesi (sayfa no ...)
+    url_fn    : job -> url
+    parse_fn  : (job, html) -> sonuç (satır listesi)
+    on_result : (job, result, err) -> İŞ SIRASIYLA çağrılır (browser.run_sharded ile aynı sözleşme);
+                404/410 dönen sayfanın sonucu [] (liste sonu, hata değil)
+    fallback_fn: (job, url) -> html; HTTP yanıtı kullanılamazsa thread havuzunda (tarayıcı)
+    stop_fn   : (job, result) -> True ise sonraki işler bırakılır
+    pacer     : pacing.Pacer verilirse hız ve eşzamanlılık (max_in_flight'a kadar) geri beslemeyle ayarlanır
+
+    Dönüş: {"http_ok", "fallback", "gone", "error", "pages", "seconds"}
+    """
+    t0 = time.perf_counter()
+    stats = asyncio.run(_crawl(
+        jobs, url_fn, parse_fn, on_result,
+        rate=rate, burst=burst, max_in_flight=max(1, max_in_flight),
+        per_host_in_flight=per_host_in_flight, timeout=timeout,
+        fallback_fn=fallback_fn, fallback_workers=fallback_workers,
+        stop_fn=stop_fn, require_comments=require_comments,
+        headers=headers or DEFAULT_HEADERS, pacer=pacer,
+    ))
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    return stats
@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ================== HTTP-ÖNCE AYARLARI ==================
+# Sayfa önce düz HTTP ile (keep-alive, gzip, oturum çerezleri) istenir.
+# Yanıtta #comments_new yoksa ya da challenge/bot sayfası gibi görünüyorsa
+# çağıran taraf tarayıcıya düşer. Başarılı HTTP sayfası ~10 ms'ler, tarayıcı saniyeler.
+# =========================================================
+
+HTTP_TIMEOUT_SEC = 15
+HTTP_POOL_SIZE = 16     # host başına açık tutulan bağlantı
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# challenge / bot koruması izleri (küçük harf)
+CHALLENGE_MARKERS = (
+    "cf-chl",
+    "challenge-platform",
+    "just a moment...",
+    "attention required",
+    "px-captcha",
+    "captcha-delivery",
+    "access denied",
+)
+BLOCK_STATUS = {403, 429, 503}
+GONE_STATUS = {404, 410}   # tarayıcı da aynısını görür -> fallback yok
+
+_COMMENTS_RE = re.compile(r"""id\s*=\s*["']comments_new["']""", re.I)
+
+
+def has_comments_container(html: str) -> bool:
+    return bool(html) and _COMMENTS_RE.search(html) is not None
+
+
+def looks_blocked(status: int, html: str) -> bool:
+    if status in BLOCK_STATUS:
+        return True
+    head = (html or "")[:20_000].lower()
+    return any(m in head for m in CHALLENGE_MARKERS)
+
+
+def make_session(pool_size: int = HTTP_POOL_SIZE, headers: dict | None = None) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update(headers or DEFAULT_HEADERS)
+    return s
+
+
+@dataclass
+class HttpResult:
+    url: str
+    ok: bool
+    status: int = 0
+    html: str = ""
+    reason: str = ""
+    elapsed: float = 0.0
+    gone: bool = False
+    blocked: bool = False
+
+    @property
+    def outcome(self) -> str | None:
+        """pacing.Pacer.observe için sonuç sınıfı (gone -> None: hız sorunu değil)."""
+        if self.ok:
+            return "ok"
+        if self.gone:
+            return None
+        if self.blocked:
+            return "blocked"
+        return "no_comments" if self.status == 200 else "error"
+
+
+class PageFetcher:
+    """
+    Thread-safe HTTP-önce sayfa çekici (tek keep-alive oturum, tüm worker'lar paylaşır).
+
+        fetcher = PageFetcher()
+        res = fetcher.fetch_http(url)
+        if not res.ok:
+            ... tarayıcı ile aç ...
+            fetcher.adopt_browser_cookies(driver)   # sonraki HTTP istekleri aynı çerezlerle
+    """
+
+    def __init__(self, session: requests.Session | None = None, timeout: float = HTTP_TIMEOUT_SEC,
+                 require_comments: bool = True):
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.require_comments = require_comments
+        self._lock = threading.Lock()
+        self.stats = {"http_ok": 0, "http_fallback": 0, "blocked": 0, "gone": 0, "error": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def fetch_http(self, url: str) -> HttpResult:
+        t0 = time.perf_counter()
+        try:
+            r = self.session.get(url, timeout=self.timeout, allow_redirects=True)
+            html = r.text
+        except requests.RequestException as e:
+            self._count("error")
+            self._count("http_fallback")
+            return HttpResult(url, False, reason=f"hata: {e}", elapsed=time.perf_counter() - t0)
+
+        res = HttpResult(r.url, False, r.status_code, html, elapsed=time.perf_counter() - t0)
+        if looks_blocked(r.status_code, html):
+            self._count("blocked")
+            res.blocked = True
+            res.reason = f"challenge/blok (HTTP {r.status_code})"
+        elif r.status_code in GONE_STATUS:
+            res.reason = f"HTTP {r.status_code}"
+            res.gone = True
+        elif r.status_code != 200:
+            res.reason = f"HTTP {r.status_code}"
+        elif self.require_comments and not has_comments_container(html):
+            res.reason = "#comments_new yok"
+        else:
+            res.ok = True
+
+        self._count("http_ok" if res.ok else "gone" if res.gone else "http_fallback")
+        return res
+
+    def adopt_browser_cookies(self, driver):
+        """Tarayıcının geçtiği challenge çerezlerini HTTP oturumuna kopyalar."""
+        try:
+            for c in driver.get_cookies():
+                self.session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+        except Exception:
+            pass
+
+    def close(self):
+        self.session.close()
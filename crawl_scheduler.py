@@ -0,0 +1,225 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import aiohttp
+
+import yorumCekme
+from browser import DriverPool, LazyDriver
+from crawl_async import OrderedEmitter, fetch_html, host_bucket
+from crawl_http import DEFAULT_HEADERS, HTTP_TIMEOUT_SEC
+
+# ================== ÇOKLU TICKER TARAMA ==================
+# derin.py'deki TICKERS evreni tek işte taranır. Her ticker kendi çıktı / progress /
+# dedup / sayfa günlüğüyle (scraper.open_crawl_state) ayrı bir "şerit"tir; istekler
+# ORTAK bütçeden kullanılır:
+#   - GLOBAL_IN_FLIGHT  : tüm ticker'lar toplam eşzamanlı istek
+#   - PER_HOST_IN_FLIGHT: aynı host'a eşzamanlı istek
+#   - HOST_RATE_PER_SEC : host başına istek/sn (token-bucket, ticker'lar paylaşır)
+# Boşalan istek slotu ağırlıklı round-robin ile sıradaki ticker'a verilir
+# (priority=2 olan ticker, 1 olana göre iki kat sayfa alır). Biten ticker bütçeyi bırakır.
+# =========================================================
+
+COMMENTARY_URLS = {
+    "AMZN": "https://www.investing.com/equities/amazon-com-inc-commentary",
+    "NVDA": "https://www.investing.com/equities/nvidia-corp-commentary",
+    "TSLA": "https://www.investing.com/equities/tesla-motors-commentary",
+    "AMD": "https://www.investing.com/equities/adv-micro-device-commentary",
+    "GOOGL": "https://www.investing.com/equities/google-inc-commentary",
+    "META": "https://www.investing.com/equities/facebook-inc-commentary",
+    "AAPL": "https://www.investing.com/equities/apple-computer-inc-commentary",
+}
+
+OUT_DIR = "data/comments"
+
+GLOBAL_IN_FLIGHT = 8
+PER_HOST_IN_FLIGHT = 4
+HOST_RATE_PER_SEC = 2.0
+HOST_BURST = 4
+BROWSERS = 1   # HTTP'nin yetmediği sayfalar için ortak (tembel açılan) tarayıcı sayısı
+
+
+@dataclass
+class TickerCrawl:
+    ticker: str
+    cfg: object          # scraper.ScrapeConfig
+    priority: int = 1
+
+
+def plan_universe(
+    tickers=None,
+    urls: dict | None = None,
+    priorities: dict | None = None,
+    out_dir: str = OUT_DIR,
+    scraper=yorumCekme,
+    **overrides,
+) -> list:
+    """
+    tickers=None -> derin.TICKERS. Her ticker için out_dir altında
+    <ticker>_yorumlari.csv + <ticker>.json (+ .seen.sqlite) ile bir ScrapeConfig kurar.
+    overrides: tüm ticker'lara uygulanacak ScrapeConfig alanları (max_pages, out_format ...).
+    """
+    if tickers is None:
+        from derin import TICKERS  # derin (yfinance, pandas) sadece burada yüklenir
+        tickers = list(TICKERS)
+    urls = urls or COMMENTARY_URLS
+    priorities = priorities or {}
+    os.makedirs(out_dir, exist_ok=True)
+
+    plans = []
+    for t in tickers:
+        url = urls.get(t)
+        if not url:
+            print(f"⚠️ {t}: yorum sayfası URL'i yok, atlanıyor.")
+            continue
+        name = t.lower()
+        cfg = scraper.ScrapeConfig(
+            base_url=url,
+            out_csv=os.path.join(out_dir, f"{name}_yorumlari.csv"),
+            progress_file=os.path.join(out_dir, f"{name}.json"),
+            **overrides,
+        )
+        plans.append(TickerCrawl(t, cfg, int(priorities.get(t, 1))))
+    return plans
+
+
+class _Lane:
+    """Tek ticker: sayfa listesi, sıralı yazım ve ağırlıklı round-robin sayacı."""
+
+    def __init__(self, plan: TickerCrawl, scraper):
+        self.ticker = plan.ticker
+        self.cfg = plan.cfg
+        self.weight = max(1, plan.priority)
+        self.current = 0
+        self.seen, self.sink, self.frontier = scraper.open_crawl_state(self.cfg)
+
+        retry = self.frontier.retryable(self.cfg.max_attempts) if self.cfg.retry_failed else []
+        self.jobs = sorted(set(self.frontier.pending()) | set(retry))
+        self.next = 0
+        self.emitter = OrderedEmitter(
+            scraper.make_page_handler(self.cfg, self.seen, self.sink, self.frontier),
+            stop_fn=lambda page, rows: not rows,
+            n_jobs=len(self.jobs),
+        )
+        self.stats = {"http_ok": 0, "fallback": 0, "gone": 0, "error": 0}
+
+    def has_work(self) -> bool:
+        return self.next < len(self.jobs) and not self.emitter.stopped(self.next)
+
+    def take(self):
+        i = self.next
+        self.next += 1
+        return i, self.jobs[i]
+
+
+def _pick(lanes):
+    """Smooth weighted round-robin: her seçimde ağırlık kadar kredi, seçilen toplam kadar öder."""
+    active = [lane for lane in lanes if lane.has_work()]
+    if not active:
+        return None
+    total = sum(lane.weight for lane in active)
+    for lane in active:
+        lane.current += lane.weight
+    best = max(active, key=lambda lane: lane.current)
+    best.current -= total
+    return best
+
+
+async def _run(lanes, scraper, pool, rate, burst, global_in_flight, per_host_in_flight, timeout, headers):
+    loop = asyncio.get_running_loop()
+    buckets = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, pool.size))
+
+    async def worker(session):
+        while True:
+            lane = _pick(lanes)
+            if lane is None:
+                return
+            i, page = lane.take()
+            url = scraper.first_page_url(lane.cfg, lane.frontier.begin(page))
+            try:
+                html, reason, can_fallback, outcome = await fetch_html(
+                    session, url, host_bucket(buckets, url, rate, burst)
+                )
+                if html is not None:
+                    lane.stats["http_ok"] += 1
+                    rows = scraper.parse_page_html(lane.cfg, page, html)
+                elif can_fallback:
+                    lane.stats["fallback"] += 1
+                    print(f"↪️ [{lane.ticker}] {url}: HTTP yetmedi ({reason}), tarayıcı ile açılıyor...")
+                    html = await loop.run_in_executor(executor, scraper.fetch_with_browser, pool, lane.cfg, url)
+                    rows = scraper.parse_page_html(lane.cfg, page, html)
+                elif outcome is None:
+                    # 404/410: liste sonu -> boş sayfa gibi (truncate + stop_fn)
+                    lane.stats["gone"] += 1
+                    rows = []
+                else:
+                    raise RuntimeError(f"{url}: {reason}")
+                err = None
+            except Exception as e:
+                lane.stats["error"] += 1
+                rows, err = None, e
+            lane.emitter.push(i, page, rows, err)
+
+    connector = aiohttp.TCPConnector(limit=global_in_flight, limit_per_host=per_host_in_flight, ttl_dns_cache=300)
+    try:
+        async with aiohttp.ClientSession(
+            headers=headers, connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as session:
+            await asyncio.gather(*(worker(session) for _ in range(global_in_flight)))
+    finally:
+        executor.shutdown(wait=True)
+
+
+def run_universe(
+    plans,
+    scraper=yorumCekme,
+    rate: float = HOST_RATE_PER_SEC,
+    burst: int = HOST_BURST,
+    global_in_flight: int = GLOBAL_IN_FLIGHT,
+    per_host_in_flight: int = PER_HOST_IN_FLIGHT,
+    browsers: int = BROWSERS,
+    timeout: float = HTTP_TIMEOUT_SEC,
+    headers: dict | None = None,
+) -> dict:
+    """
+    plans: plan_universe() çıktısı. Tüm ticker'lar tek event loop'ta, ortak bütçeyle taranır.
+    Dönüş: {ticker: {"pages", "http_ok", "fallback", "gone", "error"}}
+    """
+    if not plans:
+        return {}
+    t0 = time.perf_counter()
+    lanes = []
+    try:
+        for plan in plans:
+            lanes.append(_Lane(plan, scraper))
+        print(
+            f"🗂️ {len(lanes)} ticker | global {global_in_flight}, host başına {per_host_in_flight} eşzamanlı, "
+            f"{rate:.2f} istek/sn | " + ", ".join(f"{ln.ticker}:{len(ln.jobs)}" for ln in lanes)
+        )
+
+        driver_cfg = plans[0].cfg
+        quit_fn = lambda d: scraper.safe_quit_driver(d, driver_cfg)
+        with DriverPool(
+            lambda: LazyDriver(lambda: scraper.open_driver(driver_cfg), quit_fn), quit_fn, size=browsers
+        ) as pool:
+            asyncio.run(_run(
+                lanes, scraper, pool, rate, burst, max(1, global_in_flight),
+                per_host_in_flight, timeout, headers or DEFAULT_HEADERS,
+            ))
+    finally:
+        report = {}
+        for lane in lanes:
+            report[lane.ticker] = {"pages": lane.emitter.emitted, **lane.stats}
+            scraper.close_crawl_state(lane.cfg, lane.seen, lane.sink, lane.frontier)
+
+    print(f"📊 {time.perf_counter() - t0:.1f}s")
+    for ticker, st in report.items():
+        print(f"   {ticker}: {st}")
+    return report
+
+
+if __name__ == "__main__":
+    run_universe(plan_universe(max_pages=7000))
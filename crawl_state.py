@@ -0,0 +1,288 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# ================== TARAMA DURUMU ==================
+# Dedup kümesi ile ilerleme (checkpoint) ayrı tutulur:
+#   - SeenStore : SQLite (WAL) üzerinde kalıcı hash kümesi + önünde bellek içi Bloom filtresi.
+#                 Yeni yorumların çoğu Bloom'da "kesin yok" çıkar -> diske hiç gidilmez.
+#                 Ekleme sayfa başına tek transaction.
+#   - checkpoint: sadece {"last_page": n, ...} gibi birkaç byte'lık JSON, atomik yazılır.
+#                 SeenStore.set_meta ile hash'lerle aynı SQLite transaction'ında da tutulabilir.
+#   - Frontier  : aynı SQLite'ta sayfa günlüğü (pending / in_flight / done / failed + deneme sayısı).
+#                 Sayfalar sırasız bitebilir; yeniden başlatmada tam kalınan yerden, başarısızlar
+#                 ayrı bir geçişte tekrar denenir. Başa yeni yorum gelince (refresh) sayfa
+#                 numaraları shift() ile kaydırılır; backfill kaldığı içerikten devam eder.
+#                 Listenin sonu (boş çıkan ilk sayfa) meta'da tutulur: seed() oradan ötesini eklemez.
+# Eski progress.json içindeki "seen_hashes" listesi ilk açılışta SeenStore'a taşınır.
+# ===================================================
+
+BLOOM_CAPACITY = 2_000_000   # beklenen eleman; aşılırsa sadece yanlış-pozitif oranı artar
+BLOOM_FP_RATE = 0.01
+MAX_ATTEMPTS = 3             # failed sayfa en fazla bu kadar denenir
+END_PAGE_KEY = "frontier_end_page"  # meta: truncate() ile bulunan liste sonu
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = BLOOM_CAPACITY, fp_rate: float = BLOOM_FP_RATE):
+        n = max(1, capacity)
+        self.m = max(8, int(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / n * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+
+    def _positions(self, key: str):
+        # çift hash: h1 + i*h2 (Kirsch-Mitzenmacher)
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, key: str):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class SeenStore:
+    """
+    Set gibi davranır (`in`, add, len) ama kalıcıdır.
+
+        seen = SeenStore("tesla.seen.sqlite")
+        if h not in seen:
+            seen.add(h)
+        seen.commit()      # sayfa sonunda (save_progress içinde)
+    """
+
+    def __init__(self, path: str, capacity: int = BLOOM_CAPACITY):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (h TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT) WITHOUT ROWID")
+        self._db.commit()
+
+        self._bloom = BloomFilter(capacity)
+        self._count = 0
+        for (h,) in self._db.execute("SELECT h FROM seen"):
+            self._bloom.add(h)
+            self._count += 1
+
+    def __contains__(self, h: str) -> bool:
+        if h not in self._bloom:
+            return False
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM seen WHERE h = ?", (h,)).fetchone() is not None
+
+    def add(self, h: str):
+        with self._lock:
+            cur = self._db.execute("INSERT OR IGNORE INTO seen (h) VALUES (?)", (h,))
+            if cur.rowcount:
+                self._count += 1
+                self._bloom.add(h)
+
+    def update(self, hashes):
+        for h in hashes:
+            self.add(h)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._db.execute("SELECT v FROM meta WHERE k = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value):
+        """Bir sonraki commit() ile hash'lerle AYNI transaction'da kalıcı olur."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta (k, v) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+class Frontier:
+    """
+    Sayfa bazlı tarama günlüğü. SeenStore'un bağlantısını paylaşır: durum değişiklikleri
+    hash'ler ve checkpoint ile AYNI commit'te kalıcı olur (sayfa done <=> satırları diskte).
+
+        frontier = Frontier(seen)
+        frontier.seed(cfg.max_pages, done_through=eski_last_page)
+        for page in frontier.pending():
+            frontier.begin(page)
+            ... frontier.done(page) / frontier.fail(page, err) / frontier.truncate(page)
+    """
+
+    def __init__(self, store: SeenStore):
+        self._store = store
+        self._db = store._db
+        self._lock = store._lock
+        self._end_page = store.get_meta(END_PAGE_KEY)
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " page INTEGER PRIMARY KEY, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " error TEXT, updated REAL)"
+            )
+            # önceki çalışmadan yarım kalanlar (kilitlenme) tekrar kuyruğa
+            self._db.execute("UPDATE pages SET state = 'pending' WHERE state = 'in_flight'")
+            self._db.commit()
+
+    def _set(self, page: int, state: str, error: str | None = None):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pages (page, state, attempts, error, updated) VALUES (?, ?, 1, ?, ?)"
+                " ON CONFLICT(page) DO UPDATE SET state = excluded.state,"
+                " error = excluded.error, updated = excluded.updated",
+                (page, state, error, time.time()),
+            )
+
+    def _set_end(self, end_page: int | None):
+        self._end_page = end_page
+        self._store.set_meta(END_PAGE_KEY, end_page)  # sayfa durumlarıyla aynı commit'te
+
+    def seed(self, last_page: int, done_through: int = 0):
+        """
+        1..last_page arası bilinmeyen sayfaları ekler; done_through'a kadarkiler (eski checkpoint) done.
+        Liste sonu biliniyorsa (truncate) last_page ona indirilir: atılan sayfalar geri gelmez.
+        """
+        if self._end_page is not None:
+            last_page = min(last_page, self._end_page)
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO pages (page, state, updated) VALUES (?, ?, ?)",
+                ((p, "done" if p <= done_through else "pending", now) for p in range(1, last_page + 1)),
+            )
+            self._db.commit()
+
+    def begin(self, page: int) -> int:
+        # sadece günlükteki sayfa (truncate sonrası geç kalan worker satır eklemesin);
+        # done sayfa (refresh geçişi) olduğu gibi kalır
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET state = 'in_flight', attempts = attempts + 1, updated = ?"
+                " WHERE page = ? AND state != 'done'",
+                (time.time(), page),
+            )
+        return page
+
+    def done(self, page: int):
+        self._set(page, "done")
+        if self._end_page is not None and page >= self._end_page:
+            self._set_end(None)  # liste uzamış: bir sonraki seed yine last_page'e kadar
+
+    def fail(self, page: int, error):
+        self._set(page, "failed", error=str(error)[:500])
+
+    def truncate(self, end_page: int):
+        """
+        end_page boş çıktı (son): sonraki açık sayfalar atılır, end_page bir dahaki sefere yine denenir.
+        Sınır kaydedilir; yeniden başlatmadaki seed() atılan sayfaları tekrar eklemez.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE page > ? AND state != 'done'", (end_page,))
+            self._db.execute("UPDATE pages SET state = 'pending', attempts = 0 WHERE page = ?", (end_page,))
+        if self._end_page is None or end_page < self._end_page:  # geç kalan worker sınırı büyütmesin
+            self._set_end(end_page)
+
+    def shift(self, by: int, after: int):
+        """
+        Listenin başına `by` sayfalık yeni yorum geldi: after'dan sonraki sayfalar (içerikleri
+        kaydığı için) `by` ileri taşınır, açılan after+1..after+by aralığı done olur
+        (orada artık after'a kadarki bilinen içerik var).
+        """
+        if by <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            # PRIMARY KEY çakışmasın diye iki adımda: önce negatife, sonra yerine
+            self._db.execute("UPDATE pages SET page = -(page + ?) WHERE page > ?", (by, after))
+            self._db.execute("UPDATE pages SET page = -page WHERE page < 0")
+            self._db.executemany(
+                "INSERT OR IGNORE INTO pages (page, state, updated) VALUES (?, 'done', ?)",
+                ((p, now) for p in range(after + 1, after + by + 1)),
+            )
+        if self._end_page is not None and self._end_page > after:
+            self._set_end(self._end_page + by)  # liste sonu da kaydı
+
+    def _pages(self, sql: str, args=()) -> list:
+        with self._lock:
+            return [p for (p,) in self._db.execute(sql, args)]
+
+    def pending(self) -> list:
+        return self._pages("SELECT page FROM pages WHERE state = 'pending' ORDER BY page")
+
+    def retryable(self, max_attempts: int = MAX_ATTEMPTS) -> list:
+        return self._pages(
+            "SELECT page FROM pages WHERE state = 'failed' AND attempts < ? ORDER BY page", (max_attempts,)
+        )
+
+    def done_through(self) -> int:
+        """Baştan kesintisiz tamamlanmış son sayfa (checkpoint'teki last_page)."""
+        with self._lock:
+            (first_open,) = self._db.execute("SELECT MIN(page) FROM pages WHERE state != 'done'").fetchone()
+            if first_open is not None:
+                return first_open - 1
+            (last,) = self._db.execute("SELECT MAX(page) FROM pages").fetchone()
+        return last or 0
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._db.execute("SELECT state, COUNT(*) FROM pages GROUP BY state").fetchall())
+
+
+def _write_json_atomic(path: str, data: dict):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str, default: dict | None = None) -> dict:
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return dict(default or {})
+
+
+def save_checkpoint(path: str, data: dict):
+    _write_json_atomic(path, data)
+
+
+def seen_db_path(progress_file: str, seen_db: str = "") -> str:
+    if seen_db:
+        return seen_db
+    root, _ = os.path.splitext(progress_file)
+    return f"{root}.seen.sqlite"
+
+
+def open_seen_store(progress_file: str, seen_db: str = "") -> SeenStore:
+    """
+    progress_file'ın yanındaki SeenStore'u açar. Eski formatta (seen_hashes listeli)
+    progress dosyası varsa hash'leri bir kez store'a taşır ve checkpoint'i küçültür.
+    """
+    store = SeenStore(seen_db_path(progress_file, seen_db))
+    progress = load_checkpoint(progress_file)
+    legacy = progress.pop("seen_hashes", None)
+    if legacy:
+        store.update(legacy)
+        store.commit()
+        save_checkpoint(progress_file, progress)
+        print(f"🗃️ {len(legacy)} eski hash {store.path} dosyasına taşındı.")
+    return store
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+
+# ================== VERİ KALİTESİ AYARLARI ==================
+# Tüm ticker'lar tek uzun tabloda (datetime, ticker, OHLCV) tek geçişte kontrol edilir.
+# Sonuç yazdırılmaz; her bulgu bir satır olan DataFrame döner (makinece okunur).
+# ============================================================
+
+JUMP_THRESHOLD = 0.5            # |getiri| > %50 -> sıçrama
+SPLIT_RATIOS = (2, 3, 4, 5, 8, 10, 15, 20, 25, 30, 50)  # ileri/ters split oranları
+SPLIT_TOLERANCE = 0.03          # oran, split oranının ±%3'ü içindeyse "split şüphesi"
+OHLC_TOLERANCE = 1e-6          # high/low zarfı için göreli tolerans (adjusted fiyat yuvarlaması)
+STALE_MIN_RUN = 3               # OHLCV aynen tekrarlanan en az kaç ardışık bar -> bayat
+
+SEVERITY = {
+    "non_positive_price": "error",
+    "duplicate_bar": "error",
+    "ohlc_inconsistent": "warning",
+    "suspected_split": "warning",
+    "price_jump": "warning",
+    "calendar_gap": "warning",
+    "stale_bar": "warning",
+}
+
+REPORT_COLS = ["ticker", "datetime", "check", "severity", "value", "detail"]
+
+_PRICE = ["open", "high", "low", "close"]
+
+
+def _issues(check: str, tickers, datetimes, values, detail: str = "") -> pd.DataFrame:
+    return pd.DataFrame({
+        "ticker": np.asarray(tickers, dtype=object),
+        "datetime": datetimes,
+        "check": check,
+        "severity": SEVERITY[check],
+        "value": np.asarray(values, dtype=np.float64),
+        "detail": detail,
+    })
+
+
+def _split_ratio_hit(ratio: np.ndarray) -> np.ndarray:
+    """ratio ~ k veya ~ 1/k (k in SPLIT_RATIOS) olan satırlar."""
+    r = np.where(ratio >= 1, ratio, 1 / ratio)
+    ks = np.asarray(SPLIT_RATIOS, dtype=np.float64)
+    return (np.abs(r[:, None] / ks[None, :] - 1) <= SPLIT_TOLERANCE).any(axis=1)
+
+
+def infer_calendar(df: pd.DataFrame) -> pd.DatetimeIndex:
+    """İşlem takvimi = tüm ticker'lardaki tarihlerin birleşimi."""
+    return pd.DatetimeIndex(pd.unique(df["datetime"])).sort_values()
+
+
+def _sorted_keys(df: pd.DataFrame, ticker: str | None):
+    """ticker -> tam sayı kod; (kod, datetime) sırası. Zaten sıralıysa (kayıt formatı) sıralama atlanır."""
+    if "ticker" in df.columns:
+        codes, uniques = pd.factorize(df["ticker"])
+        uniques = np.asarray(uniques, dtype=object).astype(str).astype(object)
+    else:
+        codes, uniques = np.zeros(len(df), dtype=np.intp), np.asarray([ticker or ""], dtype=object)
+    dtv = pd.DatetimeIndex(df["datetime"])
+    t_ns = dtv.asi8  # dtv.unit biriminde tam sayı
+    if (np.diff(codes) >= 0).all() and ((np.diff(t_ns) > 0) | (np.diff(codes) > 0)).all():
+        order = None
+    else:
+        order = np.lexsort((t_ns, codes))
+        codes, t_ns, dtv = codes[order], t_ns[order], dtv[order]
+    return codes, uniques, t_ns, dtv, order
+
+
+def _calendar_gaps(t_ns, dtv, same, calendar):
+    """Takvimde olup ticker'da olmayan barlar -> (boşluktan önceki bar indeksleri, eksik sayısı, detay)."""
+    if calendar is None:
+        cal = np.sort(pd.unique(t_ns))
+    else:
+        cal = pd.DatetimeIndex(calendar)
+        if cal.tz is not None and dtv.tz is not None:
+            cal = cal.tz_convert(dtv.tz)
+        cal = np.sort(cal.as_unit(dtv.unit).asi8)
+    pos = np.searchsorted(cal, t_ns)
+    missing = np.where(same, np.r_[0, np.diff(pos)] - 1, 0)
+    idx = np.flatnonzero(missing > 0)
+    return idx - 1, missing[idx], "next=" + dtv[idx].astype(str).to_numpy(dtype=object)
+
+
+def validate_prices(
+    df: pd.DataFrame,
+    calendar=None,
+    ticker: str | None = None,
+) -> pd.DataFrame:
+    """
+    Çok ticker'lı ham/işlenmiş fiyat tablosunu doğrular.
+      df      : datetime + OHLCV (+ ticker) kolonları
+      calendar: beklenen bar zamanları; None -> infer_calendar(df)
+      ticker  : df'de ticker kolonu yoksa kullanılacak ad
+
+    Dönüş: REPORT_COLS kolonlu DataFrame (boşsa sorun yok).
+      non_positive_price : open/high/low/close <= 0           (value = fiyat)
+      duplicate_bar      : aynı (ticker, datetime) tekrarı      (value = tekrar sayısı)
+      ohlc_inconsistent  : high < max(o, c, l) veya low > min   (value = close)
+      suspected_split    : close oranı bir split oranına yakın (value = close / önceki close)
+      price_jump         : |getiri| > JUMP_THRESHOLD            (value = getiri)
+      calendar_gap       : takvimde olup ticker'da olmayan barlar (value = eksik bar sayısı,
+                           datetime = boşluktan önceki son bar)
+      stale_bar          : OHLCV önceki barla aynı, >= STALE_MIN_RUN ardışık (value = seri uzunluğu)
+    """
+    if df.empty:
+        return pd.DataFrame(columns=REPORT_COLS)
+
+    codes, uniques, t_ns, dtv, order = _sorted_keys(df, ticker)
+
+    def col(name):
+        if name not in df.columns:
+            return None
+        v = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        return v if order is None else v[order]
+
+    ohlcv = {c: col(c) for c in _PRICE + ["volume"]}
+    found = []
+
+    def add(check, idx, values, detail=""):
+        found.append(_issues(check, uniques[codes[idx]], dtv[idx], values, detail))
+
+    same = np.r_[False, codes[1:] == codes[:-1]]  # önceki satır aynı ticker mı
+
+    # --- non-positive ---
+    price_names = [c for c in _PRICE if ohlcv[c] is not None]
+    for c in price_names:
+        with np.errstate(invalid="ignore"):
+            idx = np.flatnonzero(ohlcv[c] <= 0)
+        if len(idx):
+            add("non_positive_price", idx, ohlcv[c][idx], detail=c)
+
+    # --- duplicate (ticker, datetime) ---
+    dup = same & np.r_[False, t_ns[1:] == t_ns[:-1]]
+    if dup.any():
+        # tekrar serisinin ilk satırına toplam adet yaz
+        first = np.flatnonzero(~dup)
+        group = np.cumsum(~dup) - 1
+        n = np.bincount(group)
+        hit = n > 1
+        add("duplicate_bar", first[hit], n[hit])
+
+        # tekrarları at (son geleni tut): aşağıdaki kontroller bar başına bir satır varsayar
+        keep = np.r_[~dup[1:], True]
+        codes, t_ns, dtv = codes[keep], t_ns[keep], dtv[keep]
+        ohlcv = {c: (v[keep] if v is not None else None) for c, v in ohlcv.items()}
+        same = np.r_[False, codes[1:] == codes[:-1]]
+
+    # --- OHLC tutarlılığı ---
+    if len(price_names) == 4:
+        o, h, l, c = (ohlcv[x] for x in _PRICE)
+        with np.errstate(invalid="ignore"):
+            bad = ((h * (1 + OHLC_TOLERANCE) < np.fmax(np.fmax(o, c), l))
+                   | (l * (1 - OHLC_TOLERANCE) > np.fmin(np.fmin(o, c), h)))
+        idx = np.flatnonzero(bad)
+        if len(idx):
+            add("ohlc_inconsistent", idx, c[idx])
+
+    # --- split / sıçrama (sadece büyük hareketli satırlar incelenir) ---
+    close = ohlcv["close"]
+    prev = np.r_[np.nan, close[:-1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = close / prev
+        big = same & (prev > 0) & (close > 0) & (np.abs(ratio - 1) > min(JUMP_THRESHOLD, 0.4))
+    cand = np.flatnonzero(big)
+    split = _split_ratio_hit(ratio[cand])
+    if split.any():
+        idx = cand[split]
+        add("suspected_split", idx, ratio[idx])
+    idx = cand[~split & (np.abs(ratio[cand] - 1) > JUMP_THRESHOLD)]
+    if len(idx):
+        add("price_jump", idx, ratio[idx] - 1)
+
+    # --- takvim boşlukları ---
+    idx, missing, nxt = _calendar_gaps(t_ns, dtv, same, calendar)
+    if len(idx):
+        add("calendar_gap", idx, missing, detail=nxt)
+
+    # --- bayat bar (OHLCV önceki barla birebir aynı) ---
+    rep = same.copy()
+    for v in ohlcv.values():
+        if v is not None:
+            rep[1:] &= v[1:] == v[:-1]
+    if rep.any():
+        # ardışık tekrar serileri: seri id = tekrar olmayan barların kümülatif sayısı
+        run_id = np.cumsum(~rep)
+        run_len = np.bincount(run_id, weights=rep)[run_id]
+        idx = np.flatnonzero(rep & (run_len >= STALE_MIN_RUN))
+        if len(idx):
+            add("stale_bar", idx, run_len[idx])
+
+    if not found:
+        return pd.DataFrame(columns=REPORT_COLS)
+    report = pd.concat(found, ignore_index=True)
+    return report.sort_values(["ticker", "datetime", "check"], kind="stable").reset_index(drop=True)
+
+
+def validate_calendar(
+    df: pd.DataFrame,
+    calendar=None,
+    ticker: str | None = None,
+) -> pd.DataFrame:
+    """
+    Sadece calendar_gap kontrolü; df'de datetime (+ ticker) yeterli, OHLCV gerekmez.
+    Parça parça doğrulanan veride (ticker ticker çekim) takvim ancak tüm ticker'lar
+    görüldükten sonra kurulabilir: o zaman bu fonksiyon birleşik tabloyla çağrılır.
+    Dönüş: validate_prices ile aynı REPORT_COLS biçimi.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=REPORT_COLS)
+
+    codes, uniques, t_ns, dtv, _ = _sorted_keys(df, ticker)
+    keep = np.r_[(codes[1:] != codes[:-1]) | (t_ns[1:] != t_ns[:-1]), True]  # tekrarlar tek bar
+    codes, t_ns, dtv = codes[keep], t_ns[keep], dtv[keep]
+    same = np.r_[False, codes[1:] == codes[:-1]]
+
+    idx, missing, nxt = _calendar_gaps(t_ns, dtv, same, calendar)
+    if not len(idx):
+        return pd.DataFrame(columns=REPORT_COLS)
+    report = _issues("calendar_gap", uniques[codes[idx]], dtv[idx], missing, nxt)
+    return report.sort_values(["ticker", "datetime"], kind="stable").reset_index(drop=True)
+
+
+def summarize_report(report: pd.DataFrame) -> pd.DataFrame:
+    """ticker x check bulgu sayıları."""
+    if report.empty:
+        return pd.DataFrame()
+    return report.pivot_table(index="ticker", columns="check", values="value",
+                              aggfunc="size", fill_value=0)
+
+
+def raise_on_errors(report: pd.DataFrame):
+    """severity == "error" bulgusu varsa ValueError."""
+    if report.empty:
+        return
+    err = report[report["severity"] == "error"]
+    if not err.empty:
+        first = err.iloc[0]
+        raise ValueError(
+            f"{first['ticker']}: {first['check']} ({len(err)} hata, ilk: {first['datetime']} "
+            f"value={first['value']}). Veri bozuk olabilir."
+        )
@@ -1,11 +1,29 @@
 import os
 import math
+import hashlib
+import json
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from data_quality import REPORT_COLS, raise_on_errors, validate_calendar, validate_prices
+from indicators import (
+    INDICATOR_COLS,
+    StreamingIndicators,
+    add_technical_indicators_panel,
+    check_streaming_features,
+    compute_panel_features,
+    needs_full_history,
+    registered_features,
+)
+
 # ================== AYARLAR ==================
 TICKERS = {
     "AMZN": "Amazon.com Inc.",
@@ -24,8 +42,71 @@ END_DATE = "2026-01-01"  # None yaparsan bugüne kadar çeker
 INTERVAL = "1d"
 OUT_PATH = "data/all_prices_with_technicals.csv"
 CSV_SEP = ";"  # TR Excel için ";" iyi
+
+# ✅ Çıktı formatı: "csv" (tek dosya) | "parquet" (ticker/year bölümlü dataset)
+OUT_FORMAT = "csv"
+DATASET_DIR = "data/prices"  # parquet: data/prices/ticker=AMZN/year=2024/part-0.parquet
+
+# ✅ Artımlı güncelleme: en uzun rolling pencere SMA-50, ama EMA/MACD özyinelemeli
+# olduğu için kuyruk daha uzun tutuluyor (span=26 -> 400 barda başlangıç etkisi ~(25/27)^400 ≈ 4e-14)
+WARMUP_BARS = 400
+# auto_adjust=True: son kayıttan sonra split/temettü olursa yfinance TÜM geçmişi yeniden ölçekler.
+# Delta çekimi örtüşen (tamamlanmış) barla başlar; close'lar bu göreli farktan fazla ayrışırsa
+# ticker baştan çekilir. Veri kalitesi kontrolü de kayıtlı kuyruğun son birkaç barını görür.
+ADJUST_TOLERANCE = 1e-4
+QUALITY_CONTEXT_BARS = 5
+
+# ✅ Eşzamanlı çekim (ticker sayısı yüzlere çıkınca sıralı döngü çok yavaş)
+FETCH_WORKERS = 4           # aynı anda en fazla kaç indirme
+FETCH_RETRIES = 3           # ticker başına deneme sayısı
+FETCH_BACKOFF_SEC = 1.0     # 1s, 2s, 4s ... (+ küçük jitter)
+FETCH_BATCH_SIZE = 1        # >1 ise birkaç ticker tek yf.download çağrısında
+
+# ✅ Ham indirme cache'i (indikatör değiştirince aynı geçmişi tekrar indirmeyelim)
+CACHE_ENABLED = True
+CACHE_DIR = "data/.yf_cache"
+CACHE_TTL_SEC = 6 * 3600          # sadece hâlâ "açık" (bugüne uzanan) aralıklar için
+CACHE_OPEN_RANGE_DAYS = 3         # end, bugünden bu kadar gün yakınsa aralık açık sayılır
+CACHE_MAX_BYTES = 512 * 1024**2   # aşılırsa en eski kullanılan girdiler silinir (LRU)
+CACHE_EVICT_TO = 0.9              # silme max'ın bu oranına kadar (sınırda her yazmada taramasın)
+CACHE_OFFLINE = False             # True: ağa hiç çıkma, cache'te yoksa boş dön (testler için)
+
+# ✅ Intraday: sağlayıcı tek istekte sınırlı aralık veriyor -> aralık parçalara bölünür
+INTRADAY_CHUNK_DAYS = {
+    "1m": 7,
+    "2m": 59, "5m": 59, "15m": 59, "30m": 59, "90m": 59,
+    "60m": 59, "1h": 59,
+}
+
+# ✅ Kompakt şema: göstergeler float32, ticker/isim categorical, datetime ns
+COMPACT_SCHEMA = True
+PRICE_SCALE = None  # örn. 10_000 -> fiyatlar diskte Int64 (fiyat x 1e4) olarak saklanır
+
+# ✅ Gösterge motoru: "pandas" (ticker başına) | "panel" (tüm ticker'lar tek NumPy panelinde)
+INDICATOR_ENGINE = "pandas"
+
+# ✅ Varsayılan sete ek göstergeler (indicators.INDICATOR_REGISTRY'den), örn. ["atr_14", "obv"]
+EXTRA_FEATURES = []
+
+# ✅ Veri kalitesi raporu (data_quality.validate_prices); None -> dosyaya yazma
+QUALITY_REPORT_PATH = "data/quality_report.csv"
 # ============================================
 
+RAW_COLS = ["datetime", "open", "high", "low", "close", "volume"]
+PRICE_COLS = ["open", "high", "low", "close"]
+
+# fiyatlar float64 kalır (warm-up/artımlı hesap hassasiyeti için), göstergeler float32
+TECH_SCHEMA = {
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+    "ticker": "category",
+    "ticker_name": "category",
+    **{c: "float32" for c in registered_features()},
+}
+
 
 def compute_rsi_sma(price: pd.Series, period: int = 14) -> pd.Series:
     """RSI (SMA tabanlı)."""
@@ -63,6 +144,117 @@ def _rename_datetime_col(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
     return df
 
 
+def _cache_key(ticker: str, start: str, end: str, interval: str, auto_adjust: bool) -> str:
+    raw = json.dumps([ticker, str(start), str(end), interval, bool(auto_adjust)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+_cache_lock = threading.Lock()
+_cache_bytes = None  # cache'in bilinen toplam boyutu; ilk yazmada bir kez taranır, sonra yazdıkça güncellenir
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.parquet")
+
+
+def _is_open_range(end: str) -> bool:
+    today = pd.Timestamp.utcnow().tz_localize(None).normalize()
+    return pd.Timestamp(end).tz_localize(None) >= today - pd.Timedelta(days=CACHE_OPEN_RANGE_DAYS)
+
+
+def cache_get(ticker: str, start: str, end: str, interval: str, auto_adjust: bool = True):
+    """
+    Cache'te geçerli bir girdi varsa DataFrame, yoksa None döner.
+    Kapalı (geçmişte biten) aralıklar hiç eskimez; açık aralıklar CACHE_TTL_SEC sonra eskir.
+    """
+    path = _cache_path(_cache_key(ticker, start, end, interval, auto_adjust))
+    if not os.path.exists(path):
+        return None
+
+    if _is_open_range(end) and not CACHE_OFFLINE:
+        age = time.time() - os.path.getmtime(path)
+        if age > CACHE_TTL_SEC:
+            return None
+
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        return None
+
+    # LRU için erişim zamanını güncelle (mtime TTL için, atime LRU için)
+    try:
+        os.utime(path, (time.time(), os.path.getmtime(path)))
+    except OSError:
+        pass
+    return df
+
+
+def cache_put(ticker: str, start: str, end: str, interval: str, df: pd.DataFrame, auto_adjust: bool = True):
+    if df is None or df.empty:
+        return  # boş sonuç geçici hata olabilir, cache'leme
+    path = _cache_path(_cache_key(ticker, start, end, interval, auto_adjust))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{random.randint(0, 1 << 30)}.tmp"
+    try:
+        df.to_parquet(tmp, index=False, compression="zstd")
+        old = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        new = os.path.getsize(path)
+    except Exception as e:
+        print(f"⚠️ cache yazılamadı ({ticker}): {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+
+    # her yazmada dizini taramak yerine sayaç; sadece sınır aşılınca taranıp LRU silinir
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _cache_entries())
+        else:
+            _cache_bytes += new - old
+        if _cache_bytes > CACHE_MAX_BYTES:
+            _cache_bytes = _evict_cache(CACHE_MAX_BYTES, int(CACHE_MAX_BYTES * CACHE_EVICT_TO))
+
+
+def _cache_entries() -> list:
+    """[(son erişim, boyut, yol)] — tüm cache dizini taranır."""
+    entries = []
+    for root, _, files in os.walk(CACHE_DIR):
+        for fn in files:
+            if not fn.endswith(".parquet"):
+                continue
+            p = os.path.join(root, fn)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            entries.append((max(st.st_atime, st.st_mtime), st.st_size, p))
+    return entries
+
+
+def _evict_cache(max_bytes: int = CACHE_MAX_BYTES, target_bytes: int | None = None) -> int:
+    """
+    Toplam boyut max_bytes'ı aşarsa en uzun süredir okunmayan girdileri target_bytes'a
+    (verilmezse max_bytes) inene kadar siler.
+    Dönüş: kalan toplam boyut (başka süreçlerin yazdıkları dahil, diskten).
+    """
+    entries = _cache_entries()
+    total = sum(e[1] for e in entries)
+    if total <= max_bytes:
+        return total
+
+    for _, size, p in sorted(entries):
+        try:
+            os.remove(p)
+        except OSError:
+            continue
+        total -= size
+        if total <= (max_bytes if target_bytes is None else target_bytes):
+            break
+    return total
+
+
 def fetch_one_ticker(
     ticker: str,
     start: str,
@@ -73,10 +265,19 @@ def fetch_one_ticker(
     ✅ En sağlam: auto_adjust=True
     - Close/High/Low/Open zaten adjusted gelir
     - Adj Close ile uğraşmayız
+    CACHE_ENABLED ise aynı (ticker, start, end, interval) tekrar indirilmez.
     """
     if end is None:
         end = pd.Timestamp.utcnow().strftime("%Y-%m-%d")
 
+    if CACHE_ENABLED:
+        cached = cache_get(ticker, start, end, interval)
+        if cached is not None:
+            return cached
+        if CACHE_OFFLINE:
+            print(f"[cache] {ticker}: offline modda cache'te yok ({start} -> {end}).")
+            return pd.DataFrame()
+
     df = yf.download(
         ticker,
         start=start,
@@ -88,6 +289,16 @@ def fetch_one_ticker(
         threads=False,
     )
 
+    df = _normalize_download(df, ticker)
+    if CACHE_ENABLED:
+        cache_put(ticker, start, end, interval, df)
+    return df
+
+
+def _normalize_download(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """
+    yf.download çıktısını standart RAW_COLS formatına çevirir.
+    """
     if df is None or df.empty:
         return pd.DataFrame()
 
@@ -106,7 +317,7 @@ def fetch_one_ticker(
         inplace=True,
     )
 
-    keep = ["datetime", "open", "high", "low", "close", "volume"]
+    keep = RAW_COLS
     missing = [c for c in keep if c not in df.columns]
     if missing:
         raise KeyError(f"{ticker}: Eksik kolonlar: {missing}. Mevcut: {df.columns.tolist()}")
@@ -121,37 +332,184 @@ def fetch_one_ticker(
     return df
 
 
-def sanity_check_prices(df: pd.DataFrame, ticker: str):
+def fetch_many_tickers(
+    tickers: list[str],
+    start: str,
+    end: str | None,
+    interval: str,
+) -> dict[str, pd.DataFrame]:
     """
-    Uçuk hataları yakala: close çok küçük / negatif / aşırı sıçrama
+    Birden fazla ticker'ı tek yf.download çağrısında çeker.
+    Dönüş: {ticker: RAW_COLS DataFrame} (veri gelmeyen ticker için boş DataFrame)
     """
-    if df.empty:
-        return
+    if end is None:
+        end = pd.Timestamp.utcnow().strftime("%Y-%m-%d")
 
-    cmin = float(df["close"].min())
-    cmax = float(df["close"].max())
+    out = {}
+    if CACHE_ENABLED:
+        for ticker in tickers:
+            cached = cache_get(ticker, start, end, interval)
+            if cached is not None:
+                out[ticker] = cached
+            elif CACHE_OFFLINE:
+                out[ticker] = pd.DataFrame()
+        tickers = [t for t in tickers if t not in out]
+        if not tickers:
+            return out
 
-    # genel: close <= 0 olamaz
-    if cmin <= 0:
-        raise ValueError(f"{ticker}: close <= 0 bulundu (min={cmin}). Veri bozuk olabilir.")
+    raw = yf.download(
+        list(tickers),
+        start=start,
+        end=end,
+        interval=interval,
+        auto_adjust=True,
+        actions=False,
+        progress=False,
+        threads=False,
+        group_by="ticker",
+    )
 
-    # AMZN özel: 2017 sonrası adjusted close genelde çok küçük olmaz.
-    if ticker == "AMZN" and cmin < 5:
-        print(f"⚠️ {ticker}: close çok küçük görünüyor (min={cmin}). "
-              f"Bu normal değilse split/kolon karışmış olabilir.")
-        print(df.nsmallest(10, "close")[["datetime", "close"]].to_string(index=False))
+    for ticker in tickers:
+        if raw is None or raw.empty:
+            out[ticker] = pd.DataFrame()
+            continue
+        if isinstance(raw.columns, pd.MultiIndex):
+            if ticker not in raw.columns.get_level_values(0):
+                out[ticker] = pd.DataFrame()
+                continue
+            sub = raw[ticker].dropna(how="all")
+        else:
+            sub = raw  # tek ticker istenmiş
+        out[ticker] = _normalize_download(sub.copy(), ticker)
+        if CACHE_ENABLED:
+            cache_put(ticker, start, end, interval, out[ticker])
+    return out
 
-    # return uç değerlerine bak
-    ret = df["close"].pct_change()
-    if ret.abs().max() > 2:  # %200+ günlük sıçrama -> şüpheli
-        print(f"⚠️ {ticker}: aşırı günlük hareket var (max |pct|={ret.abs().max():.2f}). "
-              f"Veri kaynağı/split kontrol gerekebilir.")
-        print(df.loc[ret.abs().nlargest(5).index, ["datetime", "close"]].to_string(index=False))
 
+def fetch_with_retry(fn, *args, retries: int = FETCH_RETRIES, backoff: float = FETCH_BACKOFF_SEC):
+    """
+    fn(*args) çağrısını hata alırsa üstel bekleme ile tekrar dener.
+    Son denemede de hata alırsa exception yukarı fırlatılır.
+    """
+    for attempt in range(1, max(1, retries) + 1):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            wait = backoff * (2 ** (attempt - 1)) + random.uniform(0, backoff * 0.25)
+            print(f"⚠️ {args[0]}: deneme {attempt}/{retries} başarısız ({e}). {wait:.1f}s sonra tekrar.")
+            time.sleep(wait)
 
-def add_technical_indicators(one_ticker_df: pd.DataFrame, ticker: str, ticker_name: str) -> pd.DataFrame:
+
+def iter_fetch_concurrent(
+    jobs: list[tuple[str, str]],
+    end: str | None,
+    interval: str,
+    fetch_fn=fetch_one_ticker,
+    workers: int = FETCH_WORKERS,
+    retries: int = FETCH_RETRIES,
+    backoff: float = FETCH_BACKOFF_SEC,
+    batch_size: int = FETCH_BATCH_SIZE,
+    fetch_batch_fn=fetch_many_tickers,
+):
+    """
+    jobs = [(ticker, start), ...] -> biten indirmeleri (ticker, df) olarak TAMAMLANMA
+    sırasıyla üretir. Böylece çağıran taraf göstergeleri hesaplarken diğer indirmeler sürer.
+
+    - workers: sınırlı thread havuzu
+    - batch_size > 1: aynı start'a sahip ticker'lar tek fetch_batch_fn çağrısında
+      (batch başarısız olursa o batch'teki ticker'lar tek tek denenir)
+    - hata: retries kadar denemeden sonra ticker boş DataFrame ile döner
+    """
+    def _single(ticker, start):
+        try:
+            return {ticker: fetch_with_retry(fetch_fn, ticker, start, end, interval,
+                                             retries=retries, backoff=backoff)}
+        except Exception as e:
+            print(f"[-] {ticker}: {retries} denemede çekilemedi: {e}")
+            return {ticker: pd.DataFrame()}
+
+    def _batch(tickers, start):
+        try:
+            got = fetch_with_retry(fetch_batch_fn, tickers, start, end, interval,
+                                   retries=retries, backoff=backoff)
+            return {t: got.get(t, pd.DataFrame()) for t in tickers}
+        except Exception as e:
+            print(f"⚠️ batch {tickers} başarısız ({e}), tek tek deneniyor.")
+            out = {}
+            for t in tickers:
+                out.update(_single(t, start))
+            return out
+
+    tasks = []
+    if batch_size > 1:
+        by_start: dict[str, list[str]] = {}
+        for ticker, start in jobs:
+            by_start.setdefault(start, []).append(ticker)
+        for start, tickers in by_start.items():
+            for i in range(0, len(tickers), batch_size):
+                tasks.append((_batch, (tickers[i:i + batch_size], start)))
+    else:
+        tasks = [(_single, (ticker, start)) for ticker, start in jobs]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(fn, *args) for fn, args in tasks]
+        for fut in as_completed(futures):
+            for ticker, df in fut.result().items():
+                yield ticker, df
+
+
+def check_prices(frames, calendar=None, append: bool = False, since=None) -> pd.DataFrame:
+    """
+    Uçuk hataları yakala (tüm ticker'lar tek geçişte, bkz. data_quality.validate_prices).
+      frames: {ticker: ham df} ya da ticker kolonlu uzun DataFrame
+      append: rapor dosyasının üzerine yazma, sonuna ekle (parça parça doğrulama)
+      since : bağlam için eklenmiş önceki barların sonu; bu barlardaki bulgular atılır. İstisna:
+              since barına damgalı calendar_gap (boşluk yeni barlara uzanır) raporlanır
+    Rapor QUALITY_REPORT_PATH'e yazılır; "error" bulgusu (close <= 0, tekrar bar) varsa ValueError.
+    """
+    if isinstance(frames, dict):
+        frames = {t: df for t, df in frames.items() if not df.empty}
+        if not frames:
+            return pd.DataFrame(columns=REPORT_COLS)
+        frames = pd.concat(
+            [df[[c for c in RAW_COLS if c in df.columns]].assign(ticker=t) for t, df in frames.items()],
+            ignore_index=True,
+        )
+
+    report = validate_prices(frames, calendar=calendar)
+    if since is not None and not report.empty:
+        dt = report["datetime"]
+        new_bars = (dt > since) | ((dt == since) & (report["check"] == "calendar_gap"))
+        report = report[new_bars].reset_index(drop=True)
+    _write_report(report, append)
+    raise_on_errors(report)
+    return report
+
+
+def _write_report(report: pd.DataFrame, append: bool):
+    """Bulguları özetler ve QUALITY_REPORT_PATH'e yazar (append -> dosyanın sonuna)."""
+    if report.empty:
+        return
+    counts = report["check"].value_counts().to_dict()
+    print(f"⚠️ Veri kalitesi: {len(report)} bulgu {counts}")
+    if QUALITY_REPORT_PATH:
+        os.makedirs(os.path.dirname(QUALITY_REPORT_PATH) or ".", exist_ok=True)
+        new = not append or not os.path.exists(QUALITY_REPORT_PATH)
+        report.to_csv(QUALITY_REPORT_PATH, mode="w" if new else "a", header=new, index=False,
+                      sep=CSV_SEP, encoding="utf-8-sig" if new else "utf-8")
+
+
+def add_technical_indicators(
+    one_ticker_df: pd.DataFrame,
+    ticker: str,
+    ticker_name: str,
+    extra_features: list[str] | None = None,
+) -> pd.DataFrame:
     """
     ✅ Tek kaynak fiyat: close (auto_adjust=True ile zaten adjusted)
+    extra_features: varsayılan sete ek kayıtlı göstergeler (None -> EXTRA_FEATURES)
     """
     df = one_ticker_df.copy()
     df = df.sort_values("datetime").reset_index(drop=True)
@@ -189,52 +547,657 @@ def add_technical_indicators(one_ticker_df: pd.DataFrame, ticker: str, ticker_na
     # log return (daha stabil)
     df["log_return"] = np.log(price).diff()
 
+    extra = EXTRA_FEATURES if extra_features is None else extra_features
+    extra = [f for f in extra if f not in INDICATOR_COLS]
+    if extra:
+        # tek satırlık panel: sadece istenen göstergeler ve bağımlılıkları hesaplanır
+        res = compute_panel_features(
+            lambda field: pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=np.float64)[None, :],
+            extra,
+        )
+        for col in extra:
+            df[col] = res[col][0]
+
     return df
 
 
-def build_pipeline():
+def _resolve_end() -> str:
     if END_DATE is None:
-        end = pd.Timestamp.utcnow().strftime("%Y-%m-%d")
+        return pd.Timestamp.utcnow().strftime("%Y-%m-%d")
+    return END_DATE
+
+
+def apply_compact_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    TECH_SCHEMA'yı uygular: float32 göstergeler, categorical ticker/isim, ns datetime.
+    Bellek ve dosya boyutu ~yarıya iner; notebook'un ayrıca astype("float32") yapmasına gerek kalmaz.
+    """
+    if not COMPACT_SCHEMA or df.empty:
+        return df
+
+    df = df.astype({c: t for c, t in TECH_SCHEMA.items() if c in df.columns})
+    if "datetime" in df.columns and pd.api.types.is_datetime64_any_dtype(df["datetime"]):
+        df["datetime"] = df["datetime"].dt.as_unit("ns")
+    return df
+
+
+def _encode_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """PRICE_SCALE ayarlıysa fiyatları diskte ölçekli tamsayı (Int64) olarak sakla."""
+    if not PRICE_SCALE:
+        return df
+    enc = {
+        c: (df[c].astype("float64") * PRICE_SCALE).round().astype("Int64")
+        for c in PRICE_COLS if c in df.columns
+    }
+    return df.assign(**enc)
+
+
+def _decode_prices(df: pd.DataFrame) -> pd.DataFrame:
+    if not PRICE_SCALE:
+        return df
+    dec = {
+        c: df[c].astype("float64") / PRICE_SCALE
+        for c in PRICE_COLS if c in df.columns and pd.api.types.is_integer_dtype(df[c])
+    }
+    return df.assign(**dec) if dec else df
+
+
+def feature_matrix(df: pd.DataFrame, cols: list[str] | None = None) -> np.ndarray:
+    """
+    Model girdisi için float32 matris (varsayılan: gösterge kolonları).
+    Kolonlar zaten float32 ise ek dtype dönüşümü yapılmaz.
+    """
+    cols = cols or [c for c in INDICATOR_COLS if c in df.columns]
+    return df[cols].to_numpy(dtype=np.float32, copy=False)
+
+
+def _finalize_frame(all_list: list[pd.DataFrame]) -> pd.DataFrame:
+    full_df = pd.concat(all_list, ignore_index=True)
+    full_df = (
+        full_df.drop_duplicates(subset=["ticker", "datetime"], keep="last")
+        .sort_values(["ticker", "datetime"])
+        .reset_index(drop=True)
+    )
+    return apply_compact_schema(full_df)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError as e:
+        raise ImportError("Parquet dataset için pyarrow gerekli: pip install pyarrow") from e
+    return pa, ds
+
+
+def _dataset_partitioning(pa, ds):
+    return ds.partitioning(
+        pa.schema([("ticker", pa.string()), ("year", pa.int16())]),
+        flavor="hive",
+    )
+
+
+def save_prices_dataset(
+    full_df: pd.DataFrame,
+    root: str = DATASET_DIR,
+    touched: dict | None = None,
+):
+    """
+    ✅ ticker/year bölümlü Parquet dataset yazar (tipli kolonlar).
+      - touched=None: dataset baştan yazılır
+      - touched={ticker: ilk_yeni_datetime | None}: sadece o ticker'ın etkilenen
+        yıl bölümleri yeniden yazılır (artımlı güncelleme için)
+    """
+    pa, ds = _require_pyarrow()
+
+    df = full_df
+    if touched is not None:
+        mask = pd.Series(False, index=df.index)
+        for ticker, first_dt in touched.items():
+            m = df["ticker"] == ticker
+            if first_dt is not None:
+                m &= df["datetime"].dt.year >= pd.Timestamp(first_dt).year
+            mask |= m
+        df = df[mask]
+        if df.empty:
+            return
+    elif os.path.isdir(root):
+        shutil.rmtree(root)
+
+    df = _encode_prices(df).assign(
+        ticker=df["ticker"].astype(str),  # bölüm kolonu düz string
+        year=df["datetime"].dt.year.astype("int16"),
+    )
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_dataset_partitioning(pa, ds),
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+
+def load_prices(
+    path: str | None = None,
+    tickers: list[str] | str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Fiyat/gösterge verisini okur. Parquet dataset'te ticker ve tarih aralığı
+    bölümlere (ticker=/year=) itilir; sadece ilgili dosyalar okunur.
+
+      df = load_prices(tickers="AMZN", start="2018-01-01", end="2025-12-31")
+
+    end dahildir. CSV için aynı filtreler okuma sonrası uygulanır.
+    """
+    if path is None:
+        path = DATASET_DIR if OUT_FORMAT == "parquet" else OUT_PATH
+    if isinstance(tickers, str):
+        tickers = [tickers]
+
+    if os.path.isdir(path):
+        pa, ds = _require_pyarrow()
+        dataset = ds.dataset(path, format="parquet", partitioning=_dataset_partitioning(pa, ds))
+
+        filt = None
+
+        def _and(expr):
+            return expr if filt is None else filt & expr
+
+        if tickers:
+            filt = _and(ds.field("ticker").isin(list(tickers)))
+
+        tz = dataset.schema.field("datetime").type.tz
+        if start is not None:
+            ts = pd.Timestamp(start)
+            filt = _and(ds.field("year") >= ts.year)
+            ts = ts.tz_localize(tz) if (tz and ts.tzinfo is None) else ts
+            filt = _and(ds.field("datetime") >= pa.scalar(ts, type=dataset.schema.field("datetime").type))
+        if end is not None:
+            ts = pd.Timestamp(end)
+            filt = _and(ds.field("year") <= ts.year)
+            ts = ts.tz_localize(tz) if (tz and ts.tzinfo is None) else ts
+            filt = _and(ds.field("datetime") <= pa.scalar(ts, type=dataset.schema.field("datetime").type))
+
+        cols = None
+        if columns is not None:
+            cols = list(dict.fromkeys(["datetime", "ticker"] + list(columns)))
+
+        df = dataset.to_table(columns=cols, filter=filt).to_pandas()
+        df = df.drop(columns=["year"], errors="ignore")
+        if "ticker" in df.columns:
+            df["ticker"] = df["ticker"].astype(str)
+        df = df.sort_values(["ticker", "datetime"]).reset_index(drop=True)
+        # bölüm kolonu (ticker) sona eklenir -> kayıttaki kolon sırasına geri dön
+        order = RAW_COLS + ["ticker", "ticker_name"] + INDICATOR_COLS
+        df = df[[c for c in order if c in df.columns] + [c for c in df.columns if c not in order]]
+        return apply_compact_schema(_decode_prices(df))
+
+    df = load_existing_prices(path)
+    if df.empty:
+        return df
+    if tickers:
+        df = df[df["ticker"].isin(tickers)]
+    if start is not None:
+        df = df[df["datetime"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["datetime"] <= pd.Timestamp(end)]
+    if columns is not None:
+        df = df[list(dict.fromkeys(["datetime", "ticker"] + list(columns)))]
+    return df.reset_index(drop=True)
+
+
+def save_prices(full_df: pd.DataFrame, path: str | None = None, touched: dict | None = None):
+    if OUT_FORMAT == "parquet":
+        root = path or DATASET_DIR
+        save_prices_dataset(full_df, root, touched=touched)
+        print(f"\n[OK] Kaydedildi (parquet dataset): {root}")
+        return
+
+    path = path or OUT_PATH
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    _encode_prices(full_df).to_csv(path, index=False, encoding="utf-8", sep=CSV_SEP)
+    print(f"\n[OK] Kaydedildi: {path}")
+
+
+def _parse_datetime(s: pd.Series) -> pd.Series:
+    try:
+        return pd.to_datetime(s, errors="coerce")
+    except ValueError:
+        # intraday: DST yüzünden karışık offset (-04:00/-05:00) -> UTC'ye çek
+        return pd.to_datetime(s, errors="coerce", utc=True)
+
+
+def load_existing_prices(path: str | None = None) -> pd.DataFrame:
+    """
+    Daha önce kaydedilmiş teknik gösterge dosyasını okur (yoksa boş döner).
+    """
+    if path is None and OUT_FORMAT == "parquet":
+        if not os.path.isdir(DATASET_DIR):
+            return pd.DataFrame()
+        return load_prices(DATASET_DIR)
+
+    path = path or OUT_PATH
+    if not os.path.exists(path):
+        return pd.DataFrame()
+
+    df = pd.read_csv(path, sep=CSV_SEP, encoding="utf-8", float_precision="round_trip")
+    if df.empty:
+        return df
+
+    df["datetime"] = _parse_datetime(df["datetime"])
+    return apply_compact_schema(_decode_prices(df))
+
+
+def _match_tz(fresh: pd.DataFrame, stored_dt: pd.Series) -> pd.DataFrame:
+    """
+    Yeni çekilen barların datetime timezone'unu kayıtlı veriyle aynı yap.
+    """
+    stored_tz = getattr(stored_dt.dt, "tz", None)
+    fresh_tz = getattr(fresh["datetime"].dt, "tz", None)
+    if stored_tz is not None and fresh_tz is None:
+        fresh["datetime"] = fresh["datetime"].dt.tz_localize(stored_tz)
+    elif stored_tz is not None and fresh_tz is not None:
+        fresh["datetime"] = fresh["datetime"].dt.tz_convert(stored_tz)
+    elif stored_tz is None and fresh_tz is not None:
+        fresh["datetime"] = fresh["datetime"].dt.tz_localize(None)
+    return fresh
+
+
+def merge_delta(
+    stored: pd.DataFrame,
+    fresh: pd.DataFrame,
+    ticker: str,
+    ticker_name: str,
+    warmup_bars: int = WARMUP_BARS,
+) -> pd.DataFrame:
+    """
+    Tek ticker için artımlı birleştirme:
+      - stored: kayıtlı satırlar (göstergeli)
+      - fresh : son kayıtlı datetime'dan itibaren çekilen ham barlar
+    Son kayıtlı bar da yeniden yazılır (gün içinde çekildiyse eksik bar olabilir).
+    Göstergeler sadece warm-up kuyruğu + yeni barlar üzerinde hesaplanır; birikimli bir
+    gösterge (EXTRA_FEATURES'ta OBV gibi) istenmişse tüm kayıtlı geçmiş üzerinde.
+    """
+    stored = stored.sort_values("datetime").reset_index(drop=True)
+    if fresh.empty:
+        return stored
+
+    fresh = _match_tz(fresh.copy(), stored["datetime"])
+    first_new = fresh["datetime"].min()
+
+    keep = stored[stored["datetime"] < first_new]
+    if needs_full_history(EXTRA_FEATURES):
+        tail = keep[RAW_COLS]  # kayıtlı göstergeler float32: ofset taşımak hata biriktirir
     else:
-        end = END_DATE
+        tail = keep.tail(warmup_bars)[RAW_COLS]
+
+    combined = pd.concat([tail, fresh[RAW_COLS]], ignore_index=True)
+    tech = add_technical_indicators(combined, ticker, ticker_name)
+    new_rows = tech[tech["datetime"] >= first_new]
+
+    return pd.concat([keep, new_rows], ignore_index=True)
+
+
+def history_rescaled(stored: pd.DataFrame, fresh: pd.DataFrame, tol: float = ADJUST_TOLERANCE) -> bool:
+    """
+    Kayıtlı ve yeniden çekilen barlar aynı ölçekte mi? Kayıtlı SON bar hariç (gün içinde çekildiyse
+    eksik bardı, close'u meşru olarak değişir) örtüşen barların close'ları karşılaştırılır.
+    """
+    stored = stored.sort_values("datetime")
+    done = stored.iloc[:-1][["datetime", "close"]]
+    fresh = _match_tz(fresh[["datetime", "close"]].copy(), stored["datetime"])
+    both = done.merge(fresh, on="datetime", suffixes=("_old", "_new"))
+    if both.empty:
+        return False
+    old = both["close_old"].to_numpy("float64")
+    new = both["close_new"].to_numpy("float64")
+    return bool((np.abs(new - old) > tol * np.abs(old)).any())
+
+
+def _with_stored_tail(stored: pd.DataFrame, fresh: pd.DataFrame, n: int = QUALITY_CONTEXT_BARS) -> pd.DataFrame:
+    """Kalite kontrolü için: yeni barlardan önceki son n kayıtlı bar + yeni barlar (sınırdaki sıçrama görünsün)."""
+    fresh = _match_tz(fresh.copy(), stored["datetime"])
+    tail = stored[stored["datetime"] < fresh["datetime"].min()].sort_values("datetime").tail(n)
+    return pd.concat([tail[RAW_COLS], fresh[RAW_COLS]], ignore_index=True)
+
+
+def build_pipeline(
+    fetch_fn=fetch_one_ticker,
+    workers: int = FETCH_WORKERS,
+    batch_size: int = FETCH_BATCH_SIZE,
+    fetch_batch_fn=fetch_many_tickers,
+    engine: str = INDICATOR_ENGINE,
+):
+    """
+    fetch_fn(ticker, start, end, interval) -> ham OHLCV DataFrame.
+    Testlerde yfinance yerine yerel sahte kaynak verilebilir.
+    İndirmeler `workers` thread ile paralel; biten ticker'ın göstergeleri hemen hesaplanır.
+    engine="panel": göstergeler indirmeler bitince tüm ticker'lar için tek geçişte hesaplanır.
+    """
+    end = _resolve_end()
 
     all_list = []
+    raw_frames = {}
 
-    for ticker, name in TICKERS.items():
-        print(f"[+] {ticker} ({name}) çekiliyor... {START_DATE} -> {end}")
+    print(f"[+] {len(TICKERS)} ticker çekiliyor... {START_DATE} -> {end} (workers={workers}, batch={batch_size})")
+    jobs = [(ticker, START_DATE) for ticker in TICKERS]
 
-        df = fetch_one_ticker(ticker, START_DATE, END_DATE, INTERVAL)
+    for ticker, df in iter_fetch_concurrent(
+        jobs, END_DATE, INTERVAL,
+        fetch_fn=fetch_fn, workers=workers, batch_size=batch_size, fetch_batch_fn=fetch_batch_fn,
+    ):
+        name = TICKERS[ticker]
 
         if df.empty:
             print(f"[-] {ticker}: veri gelmedi, atlanıyor.")
             continue
 
-        sanity_check_prices(df, ticker)
-
-        print(f"    rows={len(df)} | close min/max={df['close'].min():.4f}/{df['close'].max():.4f}")
+        print(f"[+] {ticker} ({name}) rows={len(df)} | close min/max={df['close'].min():.4f}/{df['close'].max():.4f}")
+        raw_frames[ticker] = df
+        if engine == "panel":
+            continue
         tech = add_technical_indicators(df, ticker, name)
         all_list.append(tech)
 
+    check_prices(raw_frames)
+
+    if raw_frames and engine == "panel":
+        all_list.append(add_technical_indicators_panel(
+            raw_frames, TICKERS, features=INDICATOR_COLS + EXTRA_FEATURES
+        ))
+
     if not all_list:
         raise ValueError("Hiç veri çekilemedi. İnternet/yfinance/SSL/proxy durumunu kontrol et.")
 
-    full_df = pd.concat(all_list, ignore_index=True)
-    full_df = (
-        full_df.drop_duplicates(subset=["ticker", "datetime"])
-        .sort_values(["ticker", "datetime"])
-        .reset_index(drop=True)
-    )
+    full_df = _finalize_frame(all_list)
+
+    save_prices(full_df)
+    print(full_df.head(5).to_string(index=False))
 
-    out_dir = os.path.dirname(OUT_PATH)
+    return full_df
+
+
+def update_pipeline(
+    fetch_fn=fetch_one_ticker,
+    workers: int = FETCH_WORKERS,
+    batch_size: int = FETCH_BATCH_SIZE,
+    fetch_batch_fn=fetch_many_tickers,
+    engine: str = INDICATOR_ENGINE,
+):
+    """
+    ✅ Artımlı (delta) güncelleme:
+      - Kayıtlı dosyadaki her ticker için son datetime okunur
+      - Sadece eksik barlar çekilir (bir önceki bardan itibaren: örtüşme ile ölçek kontrolü)
+      - Göstergeler warm-up kuyruğu üzerinden yeniden hesaplanıp eklenir
+      - Örtüşen barların close'u değiştiyse (split/temettü düzeltmesi) ticker baştan çekilir
+    Kayıt yoksa build_pipeline ile tam çekim yapılır.
+    """
+    existing = load_existing_prices()
+    if existing.empty:
+        print("[i] Kayıtlı veri yok, tam çekim yapılıyor.")
+        return build_pipeline(fetch_fn=fetch_fn, workers=workers, batch_size=batch_size,
+                              fetch_batch_fn=fetch_batch_fn, engine=engine)
+
+    end = _resolve_end()
+    all_list = []
+    jobs = []
+    stored_by_ticker = {}
+    touched = {}  # parquet: sadece değişen ticker/year bölümleri yazılır
+    quality_frames = {}  # kalite kontrolü: yeni barlar (+ kayıtlı kuyruk)
+    refetch = []
+
+    for ticker, name in TICKERS.items():
+        stored = existing[existing["ticker"] == ticker]
+
+        if stored.empty:
+            print(f"[+] {ticker} ({name}) yeni ticker, tam çekilecek... {START_DATE} -> {end}")
+            jobs.append((ticker, START_DATE))
+            continue
+
+        dts = stored["datetime"].sort_values()
+        last_dt = dts.iloc[-1]
+        if last_dt.strftime("%Y-%m-%d") >= end:
+            print(f"[=] {ticker}: güncel (son={last_dt}).")
+            all_list.append(stored)
+            continue
+        # bir önceki (tamamlanmış) bardan başla: örtüşen bar ile ölçek karşılaştırılır
+        start = dts.iloc[max(0, len(dts) - 2)].strftime("%Y-%m-%d")
+
+        print(f"[+] {ticker} ({name}) delta çekilecek... {start} -> {end}")
+        stored_by_ticker[ticker] = stored
+        jobs.append((ticker, start))
+
+    for ticker, fresh in iter_fetch_concurrent(
+        jobs, END_DATE, INTERVAL,
+        fetch_fn=fetch_fn, workers=workers, batch_size=batch_size, fetch_batch_fn=fetch_batch_fn,
+    ):
+        name = TICKERS[ticker]
+        stored = stored_by_ticker.get(ticker)
+
+        if fresh.empty:
+            if stored is None:
+                print(f"[-] {ticker}: veri gelmedi, atlanıyor.")
+            else:
+                print(f"[=] {ticker}: yeni bar yok.")
+                all_list.append(stored)
+            continue
+
+        if stored is None:
+            quality_frames[ticker] = fresh
+            all_list.append(add_technical_indicators(fresh, ticker, name))
+            touched[ticker] = None
+            continue
+
+        if history_rescaled(stored, fresh):
+            print(f"[!] {ticker}: örtüşen barların close'u değişmiş (split/temettü düzeltmesi), baştan çekilecek.")
+            refetch.append(ticker)
+            continue
+
+        quality_frames[ticker] = _with_stored_tail(stored, fresh)
+        merged = merge_delta(stored, fresh, ticker, name)
+        touched[ticker] = fresh["datetime"].min()
+        print(f"    {ticker}: yeni/yenilenen bar={int((merged['datetime'] >= fresh['datetime'].min()).sum())}")
+        all_list.append(merged)
+
+    for ticker, full in iter_fetch_concurrent(
+        [(t, START_DATE) for t in refetch], END_DATE, INTERVAL,
+        fetch_fn=fetch_fn, workers=workers, batch_size=batch_size, fetch_batch_fn=fetch_batch_fn,
+    ):
+        if full.empty:
+            # ölçeği farklı delta eklenmez; kayıt olduğu gibi kalır, sonraki çalıştırma tekrar dener
+            print(f"[-] {ticker}: tam çekim başarısız, kayıtlı veri değiştirilmedi.")
+            all_list.append(stored_by_ticker[ticker])
+            continue
+        print(f"    {ticker}: tam geçmiş yeniden yazılıyor (rows={len(full)})")
+        quality_frames[ticker] = full
+        all_list.append(add_technical_indicators(full, ticker, TICKERS[ticker]))
+        touched[ticker] = None
+
+    check_prices(quality_frames)
+
+    # TICKERS'tan çıkarılmış ama dosyada kalan ticker'lar korunur
+    extra = existing[~existing["ticker"].isin(list(TICKERS))]
+    if not extra.empty:
+        all_list.append(extra)
+
+    if not all_list:
+        raise ValueError("Hiç veri çekilemedi. İnternet/yfinance/SSL/proxy durumunu kontrol et.")
+
+    full_df = _finalize_frame(all_list)
+    save_prices(full_df, touched=touched)
+    return full_df
+
+
+def iter_date_chunks(start: str, end: str, interval: str):
+    """
+    [start, end) aralığını sağlayıcı limitine göre (start, end) string parçalarına böler.
+    Günlük ve üstü interval'larda tek parça döner.
+    """
+    days = INTRADAY_CHUNK_DAYS.get(interval)
+    if not days:
+        yield start, end
+        return
+
+    cur = pd.Timestamp(start)
+    stop = pd.Timestamp(end)
+    while cur < stop:
+        nxt = min(cur + pd.Timedelta(days=days), stop)
+        yield cur.strftime("%Y-%m-%d"), nxt.strftime("%Y-%m-%d")
+        cur = nxt
+
+
+def _append_output(tech: pd.DataFrame, first: bool, part: int, dest: str):
+    """
+    Chunk'ı dest'e ekler (CSV'ye append, parquet'te dataset dizinine yeni parça dosyası).
+    """
+    tech = _encode_prices(apply_compact_schema(tech))
+    if OUT_FORMAT == "parquet":
+        pa, ds = _require_pyarrow()
+        df = tech.assign(
+            ticker=tech["ticker"].astype(str),
+            year=tech["datetime"].dt.year.astype("int16"),
+        )
+        ds.write_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            dest,
+            format="parquet",
+            partitioning=_dataset_partitioning(pa, ds),
+            existing_data_behavior="overwrite_or_ignore",
+            basename_template=f"chunk-{part:06d}-{{i}}.parquet",
+        )
+        return
+
+    tech.to_csv(dest, mode="w" if first else "a", header=first,
+                index=False, encoding="utf-8", sep=CSV_SEP)
+
+
+def _remove_output(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _replace_output(tmp: str, final: str):
+    """Tamamlanan çıktıyı (dosya ya da dataset dizini) eskisinin yerine koyar."""
+    if os.path.isdir(tmp) and os.path.isdir(final):
+        old = f"{final}.old"
+        _remove_output(old)
+        os.replace(final, old)
+        os.replace(tmp, final)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp, final)
+
+
+def build_pipeline_chunked(fetch_fn=fetch_one_ticker, state_dir: str | None = None):
+    """
+    ✅ Intraday (1m/5m...) için bellek sınırlı çekim:
+      - Tarih aralığı sağlayıcı limitine göre parçalanır (INTRADAY_CHUNK_DAYS)
+      - Her parça StreamingIndicators'tan geçer; rolling/EWM durumu parça sınırında taşınır
+      - Sonuç parça parça diske eklenir -> bellekte en fazla ~1 parça tutulur
+      - Her parça, önceki parçanın son barlarıyla birlikte doğrulanır (sınırdaki sıçrama/split görünür);
+        bulgular rapora eklenir
+      - Takvim boşlukları (calendar_gap) en sonda, tüm ticker'ların bar zamanlarının birleşimine
+        göre kontrol edilir (bellekte ticker başına sadece datetime kolonu tutulur)
+      - Yazım <çıktı>.tmp'ye; eski çıktı sadece çalıştırma başarıyla biterse değiştirilir
+      - EXTRA_FEATURES de hesaplanır (günlük yolla aynı kolonlar); canlı hesaplanamayan ek
+        gösterge varsa çekime başlamadan ValueError
+    state_dir verilirse her ticker'ın son gösterge durumu oraya kaydedilir (canlı devam için).
+    Dönüş: {ticker: yazılan satır sayısı}
+    """
+    check_streaming_features(EXTRA_FEATURES)
+    end = _resolve_end()
+    final = DATASET_DIR if OUT_FORMAT == "parquet" else OUT_PATH
+    tmp = f"{final}.tmp"
+    _remove_output(tmp)  # önceki yarım kalmış çalıştırma
+    out_dir = os.path.dirname(final)
     if out_dir:
         os.makedirs(out_dir, exist_ok=True)
+    if QUALITY_REPORT_PATH and os.path.exists(QUALITY_REPORT_PATH):
+        os.remove(QUALITY_REPORT_PATH)  # bu çalıştırmanın bulguları parça parça eklenir
 
-    full_df.to_csv(OUT_PATH, index=False, encoding="utf-8", sep=CSV_SEP)
-    print(f"\n[OK] Kaydedildi: {OUT_PATH}")
-    print(full_df.head(5).to_string(index=False))
+    first = True
+    part = 0
+    written = {}
+    states = {}
+    bar_times = []  # takvim kontrolü için (ticker, datetime)
 
-    return full_df
+    try:
+        # ticker sırasıyla yaz -> çıktı (ticker, datetime) sıralı kalır
+        for ticker in sorted(TICKERS):
+            name = TICKERS[ticker]
+            state = StreamingIndicators(ticker, name, EXTRA_FEATURES)
+            written[ticker] = 0
+            prev_tail = None
+
+            for c_start, c_end in iter_date_chunks(START_DATE, end, INTERVAL):
+                try:
+                    df = fetch_with_retry(fetch_fn, ticker, c_start, c_end, INTERVAL)
+                except Exception as e:
+                    print(f"[-] {ticker} {c_start} -> {c_end}: çekilemedi: {e}")
+                    continue
+
+                if df.empty:
+                    continue
+
+                # parça sınırlarında çakışan barları at
+                if state.last_datetime is not None:
+                    df = _match_tz(df, pd.Series([state.last_datetime]))
+                    df = df[df["datetime"] > state.last_datetime]
+                    if df.empty:
+                        continue
+
+                if prev_tail is None:
+                    check_prices({ticker: df}, append=True)
+                else:
+                    check_prices({ticker: pd.concat([prev_tail, df[RAW_COLS]], ignore_index=True)},
+                                 append=True, since=state.last_datetime)
+                prev_tail = df[RAW_COLS].tail(QUALITY_CONTEXT_BARS)
+                bar_times.append(df[["datetime"]].assign(ticker=ticker))
+                tech = state.update_frame(df)
+
+                _append_output(tech, first, part, tmp)
+                first = False
+                part += 1
+                written[ticker] += len(tech)
+                print(f"    {ticker} {c_start} -> {c_end}: {len(tech)} bar")
+
+            states[ticker] = state
+            print(f"[+] {ticker} ({name}) toplam {written[ticker]} bar yazıldı.")
+
+        if first:
+            raise ValueError("Hiç veri çekilemedi. İnternet/yfinance/SSL/proxy durumunu kontrol et.")
+        _write_report(validate_calendar(pd.concat(bar_times, ignore_index=True)), append=True)
+    except BaseException:
+        _remove_output(tmp)  # eski çıktı olduğu gibi kalır
+        raise
+
+    _replace_output(tmp, final)
+    if state_dir:
+        for ticker, state in states.items():
+            if state.last_datetime is not None:
+                state.save(os.path.join(state_dir, f"{ticker}.json"))
+
+    print(f"\n[OK] Kaydedildi: {final}")
+    return written
 
 
 if __name__ == "__main__":
-    build_pipeline()
+    import sys
+
+    if "--update" in sys.argv:
+        update_pipeline()
+    elif INTERVAL in INTRADAY_CHUNK_DAYS:
+        build_pipeline_chunked()
+    else:
+        build_pipeline()
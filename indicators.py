@@ -0,0 +1,778 @@
+import json
+import math
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# ================== PANEL GÖSTERGE MOTORU ==================
+# Tüm ticker'lar tek bir (ticker x bar) NumPy panelinde tutulur ve göstergeler
+# tek geçişte, tüm ticker'lar için birlikte hesaplanır.
+#
+# Hizalama: her satır bir ticker'ın KENDİ bar sırası, sağa yaslı (son barlar aynı
+# sütunda). Kısa geçmişli ticker'ın başı NaN ile doldurulur. Pencereler bar saydığı
+# için sonuçlar derin.add_technical_indicators ile birebir (bit düzeyinde) aynıdır:
+# rolling/ewm için pandas'ın kendi çekirdekleri kolon kolon kullanılır, baştaki NaN
+# dolgu bu çekirdeklerin durumunu değiştirmez.
+# ===========================================================
+
+
+def _sort_frames(frames: dict[str, pd.DataFrame]):
+    tickers = list(frames)
+    sorted_frames = [
+        frames[t].sort_values("datetime").reset_index(drop=True) for t in tickers
+    ]
+    lengths = np.array([len(df) for df in sorted_frames], dtype=np.int64)
+    return tickers, sorted_frames, lengths
+
+
+def _field_panel(sorted_frames: list[pd.DataFrame], lengths: np.ndarray, field: str) -> np.ndarray:
+    n_bar = int(lengths.max()) if len(lengths) else 0
+    panel = np.full((len(sorted_frames), n_bar), np.nan, dtype=np.float64)
+    for i, df in enumerate(sorted_frames):
+        if lengths[i]:
+            panel[i, n_bar - lengths[i]:] = pd.to_numeric(df[field], errors="coerce").to_numpy(
+                dtype=np.float64
+            )
+    return panel
+
+
+def build_panel(frames: dict[str, pd.DataFrame], field: str = "close"):
+    """
+    {ticker: df} -> (panel, lengths, tickers, sorted_frames)
+      panel  : float64 (n_ticker, n_bar) C-contiguous, sağa yaslı, baş kısmı NaN
+      lengths: her ticker'ın bar sayısı
+    """
+    tickers, sorted_frames, lengths = _sort_frames(frames)
+    return _field_panel(sorted_frames, lengths, field), lengths, tickers, sorted_frames
+
+
+def _valid_mask(lengths: np.ndarray, n_bar: int) -> np.ndarray:
+    return np.arange(n_bar)[None, :] >= (n_bar - lengths)[:, None]
+
+
+def _as_frame(panel: np.ndarray) -> pd.DataFrame:
+    # (bar x ticker) görünüm: pandas rolling/ewm her ticker kolonunda kendi çekirdeğini çalıştırır
+    return pd.DataFrame(panel.T, copy=False)
+
+
+def _rolling_mean(panel: np.ndarray, window: int) -> np.ndarray:
+    out = _as_frame(panel).rolling(window=window, min_periods=window).mean()
+    return np.ascontiguousarray(out.to_numpy().T)
+
+
+def _rolling_std(panel: np.ndarray, window: int) -> np.ndarray:
+    out = _as_frame(panel).rolling(window=window, min_periods=window).std()
+    return np.ascontiguousarray(out.to_numpy().T)
+
+
+def _ewm_mean(panel: np.ndarray, span: int) -> np.ndarray:
+    out = _as_frame(panel).ewm(span=span, adjust=False).mean()
+    return np.ascontiguousarray(out.to_numpy().T)
+
+
+def _diff(panel: np.ndarray) -> np.ndarray:
+    out = np.empty_like(panel)
+    out[:, :1] = np.nan
+    np.subtract(panel[:, 1:], panel[:, :-1], out=out[:, 1:])
+    return out
+
+
+def _pct_change(panel: np.ndarray) -> np.ndarray:
+    out = np.empty_like(panel)
+    out[:, :1] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 1:] = panel[:, 1:] / panel[:, :-1] - 1
+    return out
+
+
+def _shift(panel: np.ndarray) -> np.ndarray:
+    out = np.empty_like(panel)
+    out[:, :1] = np.nan
+    out[:, 1:] = panel[:, :-1]
+    return out
+
+
+# ================== GÖSTERGE KAYDI (REGISTRY) ==================
+# Her gösterge girdilerini (ham alan ya da başka gösterge/ara sonuç) ve
+# parametrelerini bildirir. Motor sadece istenen kolonları ve onların
+# bağımlılıklarını hesaplar; ortak ara sonuçlar (_mean_20, _ema_12 ...) bir kez
+# hesaplanıp paylaşılır. "_" ile başlayanlar ara sonuçtur, çıktıya kolon olmaz.
+# full_history=True: değer ilk bardan birikir (OBV); artımlı güncellemede warm-up
+# kuyruğu yetmez, tüm geçmiş yeniden hesaplanır.
+# ================================================================
+
+RAW_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class Indicator:
+    name: str
+    inputs: tuple
+    func: Callable = field(repr=False)
+    params: dict = field(default_factory=dict)
+    full_history: bool = False
+
+
+INDICATOR_REGISTRY: dict[str, Indicator] = {}
+
+
+def register_indicator(name: str, inputs, full_history: bool = False, **params):
+    """
+    Dekoratör: fonksiyon panel(ler) alır, panel döndürür.
+
+        @register_indicator("atr_14", ("high", "low", "close"), window=14)
+        def _atr(high, low, close, window): ...
+    """
+    def deco(func):
+        if name in RAW_FIELDS:
+            raise ValueError(f"{name}: ham alan adı gösterge adı olamaz.")
+        INDICATOR_REGISTRY[name] = Indicator(name, tuple(inputs), func, dict(params), full_history)
+        return func
+    return deco
+
+
+def registered_features() -> list[str]:
+    """Çıktıya kolon olarak istenebilecek göstergeler (ara sonuçlar hariç)."""
+    return [n for n in INDICATOR_REGISTRY if not n.startswith("_")]
+
+
+def needs_full_history(features) -> bool:
+    """features (veya bağımlılıklarından biri) tüm geçmişe bağlı mı (bkz. full_history)?"""
+    todo = [f for f in features if f not in RAW_FIELDS]
+    seen = set()
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        ind = INDICATOR_REGISTRY.get(name)
+        if ind is None:
+            continue
+        if ind.full_history:
+            return True
+        todo.extend(i for i in ind.inputs if i not in RAW_FIELDS)
+    return False
+
+
+def _identity(x):
+    return x
+
+
+# --- ortak ara sonuçlar ---
+register_indicator("_mean_20", ("close",), window=20)(_rolling_mean)
+register_indicator("_std_20", ("close",), window=20)(_rolling_std)
+register_indicator("_ema_12", ("close",), span=12)(_ewm_mean)
+register_indicator("_ema_26", ("close",), span=26)(_ewm_mean)
+register_indicator("_delta", ("close",))(_diff)
+
+
+@register_indicator("_avg_gain_14", ("_delta",), window=14)
+def _avg_gain(delta, window):
+    return _rolling_mean(np.maximum(delta, 0.0), window)
+
+
+@register_indicator("_avg_loss_14", ("_delta",), window=14)
+def _avg_loss(delta, window):
+    return _rolling_mean(-np.minimum(delta, 0.0), window)
+
+
+# --- çıktı kolonları (add_technical_indicators ile aynı sıra/tanım) ---
+register_indicator("sma_20", ("_mean_20",))(_identity)
+register_indicator("sma_50", ("close",), window=50)(_rolling_mean)
+register_indicator("ema_20", ("close",), span=20)(_ewm_mean)
+
+
+@register_indicator("rsi_14", ("_avg_gain_14", "_avg_loss_14"))
+def _rsi(avg_gain, avg_loss):
+    # compute_rsi_sma ile aynı adımlar
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+@register_indicator("macd", ("_ema_12", "_ema_26"))
+def _macd(ema_12, ema_26):
+    return ema_12 - ema_26
+
+
+register_indicator("macd_signal", ("macd",), span=9)(_ewm_mean)
+register_indicator("bb_middle", ("_mean_20",))(_identity)
+
+
+@register_indicator("bb_upper", ("_mean_20", "_std_20"))
+def _bb_upper(m20, s20):
+    return m20 + 2 * s20
+
+
+@register_indicator("bb_lower", ("_mean_20", "_std_20"))
+def _bb_lower(m20, s20):
+    return m20 - 2 * s20
+
+
+register_indicator("daily_return", ("close",))(_pct_change)
+register_indicator("vol_20", ("daily_return",), window=20)(_rolling_std)
+
+
+@register_indicator("log_return", ("close",))
+def _log_return(close):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _diff(np.log(close))
+
+
+# --- ek göstergeler (varsayılan sette yok; sadece istenirse hesaplanır) ---
+@register_indicator("atr_14", ("high", "low", "close"), window=14)
+def _atr(high, low, close, window):
+    """Average True Range (SMA tabanlı, RSI ile aynı yaklaşım)."""
+    prev_close = _shift(close)
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return _rolling_mean(tr, window)
+
+
+@register_indicator("obv", ("_delta", "volume"), full_history=True)
+def _obv(delta, volume):
+    """On-Balance Volume: kapanış yükselirse +hacim, düşerse -hacim (ilk bar 0)."""
+    step = np.nan_to_num(np.sign(delta) * volume, nan=0.0)
+    out = np.cumsum(step, axis=1)
+    out[np.isnan(volume)] = np.nan  # dolgu barları NaN kalsın
+    return out
+
+
+# Varsayılan kolon seti = add_technical_indicators çıktısı
+INDICATOR_COLS = [
+    "sma_20",
+    "sma_50",
+    "ema_20",
+    "rsi_14",
+    "macd",
+    "macd_signal",
+    "bb_middle",
+    "bb_upper",
+    "bb_lower",
+    "daily_return",
+    "vol_20",
+    "log_return",
+]
+
+
+def compute_panel_features(raw, features: list[str]) -> dict[str, np.ndarray]:
+    """
+    raw: ham alan adı -> panel veren fonksiyon (ör. {"close": panel}.__getitem__).
+         Ham paneller de sadece gerekirse istenir (ATR istenmezse high/low okunmaz).
+    features: istenen kolonlar. Dönüş: {kolon: panel}
+    """
+    cache: dict[str, np.ndarray] = {}
+    resolving: set[str] = set()
+
+    def get(name: str) -> np.ndarray:
+        if name in cache:
+            return cache[name]
+        if name in RAW_FIELDS:
+            cache[name] = raw(name)
+            return cache[name]
+        ind = INDICATOR_REGISTRY.get(name)
+        if ind is None:
+            raise KeyError(f"Bilinmeyen gösterge: {name}. Kayıtlı: {registered_features()}")
+        if name in resolving:
+            raise ValueError(f"Döngüsel gösterge bağımlılığı: {name}")
+        resolving.add(name)
+        args = [get(i) for i in ind.inputs]
+        resolving.discard(name)
+        cache[name] = ind.func(*args, **ind.params)
+        return cache[name]
+
+    return {f: get(f) for f in features}
+
+
+def compute_panel_indicators(panel: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    close paneli (n_ticker, n_bar) -> {kolon: panel} (varsayılan INDICATOR_COLS seti)
+    Ortak ara sonuçlar bir kez hesaplanır (m20/s20, ema_12/ema_26, delta).
+    """
+    return compute_panel_features({"close": panel}.__getitem__, INDICATOR_COLS)
+
+
+def add_technical_indicators_panel(
+    frames: dict[str, pd.DataFrame],
+    names: dict[str, str] | None = None,
+    features: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Çok ticker'lı sürüm: {ticker: ham OHLCV df} -> uzun format DataFrame.
+    Satırlar ticker, sonra datetime sırasında; kolonlar add_technical_indicators ile aynı.
+    features verilirse sadece o göstergeler (ve bağımlılıkları) hesaplanır.
+    """
+    names = names or {}
+    features = list(INDICATOR_COLS if features is None else features)
+    frames = {t: df for t, df in frames.items() if not df.empty}
+    if not frames:
+        return pd.DataFrame()
+
+    tickers, sorted_frames, lengths = _sort_frames(frames)
+    n_bar = int(lengths.max())
+    mask = _valid_mask(lengths, n_bar)
+
+    base = pd.concat(sorted_frames, ignore_index=True)
+    base["ticker"] = np.repeat(tickers, lengths)
+    base["ticker_name"] = np.repeat([names.get(t, t) for t in tickers], lengths)
+
+    results = compute_panel_features(
+        lambda field: _field_panel(sorted_frames, lengths, field), features
+    )
+    for col in features:
+        # C-sıralı boolean seçim -> ticker-major, bar artan: base satırlarıyla aynı sıra
+        base[col] = results[col][mask]
+
+    return base
+
+
+# ================== CANLI (STREAMING) GÖSTERGE DURUMU ==================
+# Her yeni bar tüm göstergeleri O(1) günceller (geçmiş yeniden hesaplanmaz).
+# Güncelleme kuralları pandas'ın rolling/ewm çekirdeklerinin birebir aynısı
+# (Kahan toplamı, Welford varyansı, ewm normalizasyonu), bu yüzden değerler
+# add_technical_indicators / compute_rsi_sma ile aynı çıkar.
+# Ek göstergelerden sadece STREAMING_EXTRAS'takiler canlı hesaplanabilir.
+# =======================================================================
+
+STREAMING_EXTRAS = ("atr_14", "obv")
+
+_EPS_F64 = float(np.finfo(np.float64).eps)
+_INV_COND_TOL = _EPS_F64 * 1e3
+_NAN = float("nan")
+with np.errstate(invalid="ignore"):
+    _NAN_INVALID = float(np.float64(0.0) / np.float64(0.0))  # donanımın 0/0 NaN'ı (işaret biti dahil)
+
+
+def _clean(x) -> float:
+    # pandas rolling/ewm: inf -> NaN
+    x = float(x)
+    return _NAN if math.isinf(x) else x
+
+
+def _num(x) -> float:
+    # pd.to_numeric(errors="coerce") gibi: sayıya çevrilemeyen -> NaN (inf korunur)
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _fmax(a: float, b: float) -> float:
+    # np.fmax: NaN'ı yok sayar
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a >= b else b
+
+
+def check_streaming_features(features) -> list[str]:
+    """
+    INDICATOR_COLS dışındaki istenen göstergeler (sırası korunur); canlı hesaplanamayan
+    varsa ValueError (chunked/intraday yol bunları sessizce atlamasın).
+    """
+    extra = list(dict.fromkeys(f for f in features if f not in INDICATOR_COLS))
+    unsupported = [f for f in extra if f not in STREAMING_EXTRAS]
+    if unsupported:
+        raise ValueError(
+            f"Canlı (chunked) gösterge durumu bu ek göstergeleri hesaplayamaz: {unsupported}. "
+            f"Desteklenen: {list(STREAMING_EXTRAS)}"
+        )
+    return extra
+
+
+def _div(a: float, b: float) -> float:
+    # IEEE bölme (python 0'a bölmede hata fırlatır, numpy inf/nan üretir)
+    if b == 0:
+        if a != a:
+            return a
+        if a == 0:
+            return _NAN_INVALID
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _RollingMean:
+    """pandas roll_mean ile aynı: Kahan toplamı, ayrı ekleme/çıkarma telafisi."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.consecutive = 0
+        self.prev_value = _NAN
+        self.started = False
+
+    def push(self, val: float) -> float:
+        val = _clean(val)
+        if not self.started:
+            self.prev_value = val
+            self.started = True
+
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                t = self.sum_x + y
+                self.comp_remove = t - self.sum_x - y
+                self.sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+
+        self.values.append(val)
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.consecutive += 1
+            else:
+                self.consecutive = 1
+            self.prev_value = val
+
+        if self.nobs >= self.window and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.consecutive >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return _NAN
+
+    def to_dict(self) -> dict:
+        d = dict(self.__dict__)
+        d["values"] = list(self.values)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d["window"])
+        obj.__dict__.update(d)
+        obj.values = deque(d["values"])
+        return obj
+
+
+class _RollingStd:
+    """pandas roll_var (ddof=1) + zsqrt ile aynı: Welford + Kahan, kararsızlıkta pencereyi baştan hesaplar."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.unstable = False
+        self.started = False
+
+    def _add(self, val: float):
+        if val != val:
+            return
+        prev_m2 = self.ssqdm_x
+        self.nobs += 1
+        prev_mean = self.mean_x - self.comp_add
+        y = val - self.comp_add
+        t = y - self.mean_x
+        self.comp_add = t + self.mean_x - y
+        if self.nobs:
+            self.mean_x = self.mean_x + t / self.nobs
+        else:
+            self.mean_x = 0.0
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+        if prev_m2 * _INV_COND_TOL > self.ssqdm_x:
+            self.unstable = True
+
+    def _remove(self, val: float):
+        if val != val:
+            return
+        prev_m2 = self.ssqdm_x
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.comp_remove
+            y = val - self.comp_remove
+            t = y - self.mean_x
+            self.comp_remove = t + self.mean_x - y
+            self.mean_x = self.mean_x - t / self.nobs
+            self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+            if prev_m2 * _INV_COND_TOL > self.ssqdm_x:
+                self.unstable = True
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+            self.unstable = False
+
+    def push(self, val: float) -> float:
+        val = _clean(val)
+        recompute = not self.started
+        self.started = True
+
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if not recompute:
+                self._remove(old)
+        self.values.append(val)
+        if not recompute:
+            self._add(val)
+
+        if recompute or self.unstable:
+            self.mean_x = self.ssqdm_x = self.nobs = self.comp_add = self.comp_remove = 0.0
+            for v in self.values:
+                self._add(v)
+            self.unstable = False
+
+        if self.nobs >= self.window and self.nobs > 1:
+            var = self.ssqdm_x / (self.nobs - 1.0)
+            return 0.0 if var < 0 else math.sqrt(var)
+        return _NAN
+
+    def to_dict(self) -> dict:
+        d = dict(self.__dict__)
+        d["values"] = list(self.values)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d["window"])
+        obj.__dict__.update(d)
+        obj.values = deque(d["values"])
+        return obj
+
+
+class _Ewm:
+    """pandas ewm(span, adjust=False).mean() özyinelemesi."""
+
+    def __init__(self, span: int):
+        self.span = span
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.com = com
+        self.weighted = _NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def push(self, cur: float) -> float:
+        cur = _clean(cur)
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(cur == cur)
+            return self.weighted if self.nobs >= 1 else _NAN
+
+        is_obs = cur == cur
+        self.nobs += int(is_obs)
+        factor = 1.0 - self.alpha
+        new_wt = self.alpha
+        if self.weighted == self.weighted:
+            self.old_wt *= factor
+            if is_obs:
+                if self.weighted != cur:
+                    if self.com == 1:
+                        new_wt = 1.0 - self.old_wt
+                    self.weighted = self.old_wt * self.weighted + new_wt * cur
+                    self.weighted /= (self.old_wt + new_wt)
+                self.old_wt = 1.0
+        elif is_obs:
+            self.weighted = cur
+        return self.weighted if self.nobs >= 1 else _NAN
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d["span"])
+        obj.__dict__.update(d)
+        return obj
+
+
+class StreamingIndicators:
+    """
+    Tek ticker için canlı gösterge durumu.
+
+        st = StreamingIndicators("AMZN", "Amazon.com Inc.")
+        row = st.update({"datetime": ts, "open": o, "high": h, "low": l, "close": c, "volume": v})
+        st.save("state/AMZN.json")  ...  st = StreamingIndicators.load("state/AMZN.json")
+
+    update() her bar için sabit zamanlıdır ve add_technical_indicators'ın o bar için
+    üreteceği satırın aynısını (ham kolonlar + ticker + göstergeler) döndürür.
+    extra_features: add_technical_indicators(extra_features=...) karşılığı (bkz. STREAMING_EXTRAS)
+    """
+
+    def __init__(self, ticker: str = "", ticker_name: str = "", extra_features=()):
+        self.ticker = ticker
+        self.ticker_name = ticker_name
+        self.extra_features = check_streaming_features(extra_features)
+        self.last_datetime = None
+        self.prev_close = _NAN
+        self.prev_log = _NAN
+        self.prev_raw_close = _NAN  # ek göstergeler: panel tanımı gibi temizlenmemiş close
+        self.obv_total = 0.0
+
+        self.m20 = _RollingMean(20)
+        self.m50 = _RollingMean(50)
+        self.s20 = _RollingStd(20)
+        self.ema_12 = _Ewm(12)
+        self.ema_20 = _Ewm(20)
+        self.ema_26 = _Ewm(26)
+        self.macd_signal = _Ewm(9)
+        self.avg_gain = _RollingMean(14)
+        self.avg_loss = _RollingMean(14)
+        self.vol_20 = _RollingStd(20)
+        self.atr_14 = _RollingMean(14)
+
+    def update(self, bar) -> dict:
+        dt = pd.Timestamp(bar["datetime"])
+        if self.last_datetime is not None and dt <= self.last_datetime:
+            raise ValueError(
+                f"{self.ticker}: bar sırası bozuk ({dt} <= son bar {self.last_datetime})."
+            )
+        self.last_datetime = dt
+
+        try:
+            price = _clean(bar["close"])
+        except (TypeError, ValueError):
+            price = _NAN
+        prev = self.prev_close
+
+        out = {c: bar.get(c, _NAN) for c in ["open", "high", "low", "close", "volume"]}
+        out["datetime"] = bar["datetime"]
+        out["ticker"] = self.ticker
+        out["ticker_name"] = self.ticker_name
+
+        m20 = self.m20.push(price)
+        s20 = self.s20.push(price)
+        out["sma_20"] = m20
+        out["sma_50"] = self.m50.push(price)
+        out["ema_20"] = self.ema_20.push(price)
+
+        # RSI
+        delta = price - prev
+        gain = delta if delta != delta else max(delta, 0.0)
+        loss = delta if delta != delta else -min(delta, 0.0)
+        ag = self.avg_gain.push(gain)
+        al = self.avg_loss.push(loss)
+        rs = _div(ag, al)
+        out["rsi_14"] = 100 - _div(100, 1 + rs)
+
+        # MACD
+        macd = self.ema_12.push(price) - self.ema_26.push(price)
+        out["macd"] = macd
+        out["macd_signal"] = self.macd_signal.push(macd)
+
+        # Bollinger
+        out["bb_middle"] = m20
+        out["bb_upper"] = m20 + 2 * s20
+        out["bb_lower"] = m20 - 2 * s20
+
+        # returns
+        ret = _div(price, prev) - 1
+        out["daily_return"] = ret
+        out["vol_20"] = self.vol_20.push(ret)
+
+        log_p = float(np.log(np.float64(price))) if price > 0 else (
+            -math.inf if price == 0 else _NAN
+        )
+        out["log_return"] = log_p - self.prev_log
+
+        if self.extra_features:
+            self._update_extras(bar, out)
+
+        self.prev_close = price
+        self.prev_log = log_p
+        return out
+
+    def _update_extras(self, bar, out: dict):
+        # indicators._atr / _obv ile aynı adımlar
+        close = _num(bar.get("close"))
+        prev = self.prev_raw_close
+        if "atr_14" in self.extra_features:
+            high, low = _num(bar.get("high")), _num(bar.get("low"))
+            tr = _fmax(high - low, _fmax(abs(high - prev), abs(low - prev)))
+            out["atr_14"] = self.atr_14.push(tr)
+        if "obv" in self.extra_features:
+            volume = _num(bar.get("volume"))
+            step = np.nan_to_num(np.sign(np.float64(close - prev)) * np.float64(volume), nan=0.0)
+            self.obv_total += float(step)
+            out["obv"] = _NAN if volume != volume else self.obv_total
+        self.prev_raw_close = close
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Birden çok barı sırayla iter (chunk/backfill için)."""
+        df = df.sort_values("datetime")
+        rows = [self.update(r) for r in df.to_dict("records")]
+        return pd.DataFrame(rows, columns=list(df.columns) + [
+            c for c in ["ticker", "ticker_name"] + INDICATOR_COLS + self.extra_features
+            if c not in df.columns
+        ])
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, ticker: str = "", ticker_name: str = "", extra_features=()):
+        """Geçmiş barlarla ısınmış durum üretir (tek seferlik O(n))."""
+        st = cls(ticker, ticker_name, extra_features)
+        st.update_frame(df)
+        return st
+
+    # ---------- snapshot / restore ----------
+    _PARTS = ["m20", "m50", "s20", "ema_12", "ema_20", "ema_26",
+              "macd_signal", "avg_gain", "avg_loss", "vol_20", "atr_14"]
+
+    def to_dict(self) -> dict:
+        d = {
+            "ticker": self.ticker,
+            "ticker_name": self.ticker_name,
+            "extra_features": self.extra_features,
+            "last_datetime": None if self.last_datetime is None else self.last_datetime.isoformat(),
+            "prev_close": self.prev_close,
+            "prev_log": self.prev_log,
+            "prev_raw_close": self.prev_raw_close,
+            "obv_total": self.obv_total,
+        }
+        for name in self._PARTS:
+            d[name] = getattr(self, name).to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        st = cls(d["ticker"], d["ticker_name"], d.get("extra_features", ()))
+        st.last_datetime = None if d["last_datetime"] is None else pd.Timestamp(d["last_datetime"])
+        st.prev_close = d["prev_close"]
+        st.prev_log = d["prev_log"]
+        # ek göstergelerden önceki snapshot'larda bu alanlar yok
+        st.prev_raw_close = d.get("prev_raw_close", st.prev_close)
+        st.obv_total = d.get("obv_total", 0.0)
+        for name in cls._PARTS:
+            if name in d:
+                part = getattr(st, name)
+                setattr(st, name, type(part).from_dict(d[name]))
+        return st
+
+    def save(self, path: str):
+        out_dir = os.path.dirname(path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)  # NaN/Infinity json'da korunur
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,78 @@
+import base64
+import json
+
+# ================== AĞ YANITI YAKALAMA (CDP) ==================
+# Yorumlar sayfanın kendi XHR/fetch çağrılarıyla JSON olarak gelir. Chrome'un performance
+# log'u (goog:loggingPrefs) Network.responseReceived / loadingFinished olaylarını verir;
+# URL'si CAPTURE_URL_PATTERNS'ten birini içeren JSON yanıtların gövdesi
+# Network.getResponseBody ile alınır. Ayrıştırma: comment_extract.extract_comments_structured.
+#
+#   options -> enable_performance_log(options)      (driver açılmadan önce)
+#   cap = NetworkCapture(driver)                    (Network.enable sonrası)
+#   cap.reset(); driver.get(url); payloads = cap.poll()
+# ==============================================================
+
+CAPTURE_URL_PATTERNS = ("comment",)   # URL'de (küçük harf) geçerse yanıt gövdesi alınır
+CAPTURE_MAX_BODY = 8 * 2**20          # bundan büyük gövde alınmaz (byte)
+
+
+def enable_performance_log(options):
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class NetworkCapture:
+    """Tek driver, tek okuyucu: get_log("performance") okunan olayları tüketir."""
+
+    def __init__(self, driver, url_patterns=CAPTURE_URL_PATTERNS):
+        self.driver = driver
+        self.patterns = tuple(p.lower() for p in url_patterns)
+        self.payloads = []
+        self._pending = {}   # requestId -> url (yanıt geldi, gövde henüz bitmedi)
+
+    def _events(self):
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return []
+        out = []
+        for entry in entries:
+            try:
+                out.append(json.loads(entry["message"])["message"])
+            except (KeyError, TypeError, ValueError):
+                pass
+        return out
+
+    def reset(self):
+        """Yeni sayfaya gitmeden önce: önceki sayfanın olayları ve yükleri atılır."""
+        self._events()
+        self._pending.clear()
+        self.payloads = []
+
+    def poll(self) -> list:
+        """Şu ana kadar tamamlanan eşleşen JSON yanıtları (bu sayfa için birikerek)."""
+        for msg in self._events():
+            method = msg.get("method")
+            params = msg.get("params") or {}
+            rid = params.get("requestId")
+            if method == "Network.responseReceived":
+                resp = params.get("response") or {}
+                url = resp.get("url", "")
+                if "json" in (resp.get("mimeType") or "") and any(p in url.lower() for p in self.patterns):
+                    self._pending[rid] = url
+            elif method == "Network.loadingFinished":
+                url = self._pending.pop(rid, None)
+                if url is not None and params.get("encodedDataLength", 0) <= CAPTURE_MAX_BODY:
+                    self._fetch(rid, url)
+            elif method == "Network.loadingFailed":
+                self._pending.pop(rid, None)
+        return self.payloads
+
+    def _fetch(self, request_id: str, url: str):
+        try:
+            res = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = res.get("body", "")
+            if res.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", "replace")
+            self.payloads.append(json.loads(body))
+        except Exception as e:
+            print(f"⚠️ {url}: yanıt gövdesi alınamadı ({e})")
@@ -7,6 +7,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 
+from browser import DriverPool, LazyDriver, run_sharded
+from crawl_async import crawl_pages
+from crawl_http import PageFetcher
+
+# ✅ Önce düz HTTP dene; #comments_new yoksa / challenge gelirse tarayıcıya düş
+HTTP_FIRST = True
+
+# ✅ Async motor (sabit sleep yerine host başına token-bucket)
+USE_ASYNC = True
+RATE_PER_SEC = 2.0      # host başına istek/sn (eski: sayfa başına ~3.5 sn bekleme)
+BURST = 4
+MAX_IN_FLIGHT = 8
+
 
 def open_driver():
     options = uc.ChromeOptions()
@@ -23,77 +36,173 @@ def open_driver():
     return driver
 
 
-def scrape_investing_comments(base_url, start_page=1, end_page=10):
+def parse_comments_html(html: str, page: int):
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Asıl yorum text'i: #comments_new içindeki div.break-words.leading-5
+    comment_divs = soup.select("#comments_new div.break-words.leading-5")
+
+    page_comments = []
+    for idx, cdiv in enumerate(comment_divs, start=1):
+        text = cdiv.get_text(" ", strip=True)
+        if not text:
+            continue
+
+        page_comments.append(
+            {
+                "page": page,
+                "index_in_page": idx,
+                "comment": text,
+            }
+        )
+    return page_comments
+
+
+def scrape_one_page(driver, base_url, page, fetcher=None):
+    if page == 1:
+        url = base_url
+    else:
+        url = f"{base_url}/{page}"
+
+    print(f"\n{'=' * 40}\n📄 {page}. SAYFA YÜKLENİYOR: {url}\n{'=' * 40}")
+
+    if fetcher is not None:
+        res = fetcher.fetch_http(url)
+        if res.ok:
+            return parse_comments_html(res.html, page)
+        if res.gone:
+            raise RuntimeError(f"{url}: {res.reason}")
+        print(f"↪️ HTTP yetmedi ({res.reason}), tarayıcı ile açılıyor...")
+
+    try:
+        driver.get(url)
+    except TimeoutException:
+        raise RuntimeError("Sayfa 30 saniye içinde yüklenemedi (Timeout).")
+
+    # Yorum container'ının geldiğinden emin ol
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "#comments_new"))
+    )
+    time.sleep(1.5)  # biraz otursun
+
+    if fetcher is not None:
+        fetcher.adopt_browser_cookies(driver)
+    return parse_comments_html(driver.page_source, page)
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except:
+        pass
+
+
+def scrape_investing_comments(base_url, start_page=1, end_page=10, workers=1, http_first=HTTP_FIRST):
     """
     Investing Tesla yorum sayfalarından (#comments_new içindeki)
     tüm yorum metinlerini çeker.
       base_url = "https://tr.investing.com/equities/tesla-motors-commentary"
       start_page=1, end_page=10  -> 1–10. sayfa
+      workers=N -> N adet driver bir kez açılır, sayfalar aralarında paylaştırılır
+                   (sonuç listesi yine sayfa sırasında)
+      http_first=True -> sayfa önce düz HTTP ile istenir, tarayıcı sadece gerekirse açılır
     """
     all_comments = []
 
-    for page in range(start_page, end_page + 1):
-        if page == 1:
-            url = base_url
-        else:
-            url = f"{base_url}/{page}"
+    def on_result(page, page_comments, err):
+        if err is not None:
+            print(f"⚠️ {page}. sayfa işlenirken hata: {err}")
+            return
+        print(f"✅ {page}. sayfadan {len(page_comments)} yorum çekildi.")
+        all_comments.extend(page_comments)
+
+    fetcher = PageFetcher() if http_first else None
+    if fetcher is not None:
+        # driver ilk HTTP başarısızlığında açılır
+        open_fn = lambda: LazyDriver(open_driver, _quit)
+    else:
+        open_fn = open_driver
+
+    try:
+        pool = DriverPool(open_fn, _quit, size=workers).start()
+    except Exception as e:
+        print(f"🚫 WebDriver başlatılırken hata oluştu: {e}")
+        return all_comments
+
+    try:
+        run_sharded(
+            range(start_page, end_page + 1),
+            lambda driver, page: scrape_one_page(driver, base_url, page, fetcher),
+            pool,
+            on_result,
+            # Bot gibi görünmemek için ufak bekleme
+            after_job_fn=lambda worker_id, n_done: time.sleep(2),
+        )
+    finally:
+        pool.close()
+        if fetcher is not None:
+            print(f"📊 HTTP: {fetcher.stats}")
+            fetcher.close()
 
-        print(f"\n{'=' * 40}\n📄 {page}. SAYFA YÜKLENİYOR: {url}\n{'=' * 40}")
+    return all_comments
 
-        # Her sayfa için driver'ı baştan aç
-        try:
-            driver = open_driver()
-        except Exception as e:
-            print(f"🚫 WebDriver başlatılırken hata oluştu: {e}")
-            break
 
-        try:
-            try:
-                driver.get(url)
-            except TimeoutException:
-                print("⚠️ Sayfa 30 saniye içinde yüklenemedi (Timeout). Atlaniyor...")
-                driver.quit()
-                continue
-
-            # Yorum container'ının geldiğinden emin ol
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#comments_new"))
-            )
-            time.sleep(1.5)  # biraz otursun
+def _page_url(base_url, page):
+    return base_url if page == 1 else f"{base_url}/{page}"
 
-            soup = BeautifulSoup(driver.page_source, "html.parser")
 
-            # Asıl yorum text'i: #comments_new içindeki div.break-words.leading-5
-            comment_divs = soup.select("#comments_new div.break-words.leading-5")
-
-            page_comments = []
-            for idx, cdiv in enumerate(comment_divs, start=1):
-                text = cdiv.get_text(" ", strip=True)
-                if not text:
-                    continue
+def scrape_investing_comments_async(
+    base_url,
+    start_page=1,
+    end_page=10,
+    rate=RATE_PER_SEC,
+    burst=BURST,
+    max_in_flight=MAX_IN_FLIGHT,
+    workers=1,
+):
+    """
+    scrape_investing_comments'in asyncio sürümü: sayfalar düz HTTP ile, host başına
+    token-bucket (rate istek/sn, burst) ve max_in_flight eşzamanlı istek ile çekilir.
+    HTTP'nin yetmediği sayfalar `workers` adet (tembel açılan) tarayıcıda açılır.
+    Sonuç listesi sayfa sırasındadır.
+    """
+    all_comments = []
 
-                page_comments.append(
-                    {
-                        "page": page,
-                        "index_in_page": idx,
-                        "comment": text,
-                    }
-                )
+    def on_result(page, page_comments, err):
+        if err is not None:
+            print(f"⚠️ {page}. sayfa işlenirken hata: {err}")
+            return
+        print(f"✅ {page}. sayfadan {len(page_comments)} yorum çekildi.")
+        all_comments.extend(page_comments)
 
-            print(f"✅ {page}. sayfadan {len(page_comments)} yorum çekildi.")
-            all_comments.extend(page_comments)
+    pool = DriverPool(lambda: LazyDriver(open_driver, _quit), _quit, size=workers).start()
 
-        except Exception as e:
-            print(f"⚠️ {page}. sayfa işlenirken hata: {e}")
+    def browser_fetch(page, url):
+        driver = pool.acquire()
+        try:
+            driver.get(url)
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#comments_new"))
+            )
+            return driver.page_source
         finally:
-            # Bu sayfanın driver'ını kapat
-            try:
-                driver.quit()
-            except:
-                pass
-
-        # Bot gibi görünmemek için ufak bekleme
-        time.sleep(2)
+            pool.release(driver)
+
+    try:
+        stats = crawl_pages(
+            range(start_page, end_page + 1),
+            lambda page: _page_url(base_url, page),
+            lambda page, html: parse_comments_html(html, page),
+            on_result,
+            rate=rate,
+            burst=burst,
+            max_in_flight=max_in_flight,
+            fallback_fn=browser_fetch,
+            fallback_workers=workers,
+        )
+        print(f"📊 {stats}")
+    finally:
+        pool.close()
 
     return all_comments
 
@@ -103,7 +212,10 @@ if __name__ == "__main__":
     BASE_URL = "https://tr.investing.com/equities/tesla-motors-commentary"
 
     # İlk deneme için 1–10. sayfalar
-    comments = scrape_investing_comments(BASE_URL, start_page=1, end_page=10)
+    if USE_ASYNC:
+        comments = scrape_investing_comments_async(BASE_URL, start_page=1, end_page=10)
+    else:
+        comments = scrape_investing_comments(BASE_URL, start_page=1, end_page=10)
 
     if comments:
         file_name = "tesla_yorumlari_sayfa1-10.csv"
@@ -0,0 +1,207 @@
+import csv
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ================== UYARLAMALI HIZ KONTROLÜ ==================
+# Sabit min_sleep/max_sleep yerine AIMD geri beslemesi:
+#   - sıkıntı (blok/challenge, #comments_new yok, yükleme hatası, yavaşlama):
+#     gecikme çarpanla büyür, eşzamanlılık yarıya iner (hızlı geri çekilme)
+#   - PACE_WINDOW sayfa üst üste sağlıklı: hız (1/gecikme) PACE_RATE_STEP kadar artar,
+#     eşzamanlılık +1 (yavaş toparlanma)
+#   - yavaşlama: yükleme süresinin EWMA'sı, son PACE_BASE_WINDOW sağlıklı sayfanın medyanının
+#     (taban) PACE_SLOW_FACTOR katını aşarsa; kalıcı yavaşlama pencerenin yarısını doldurana kadar sürer
+#   - geri çekilmeden hemen sonra gelen (o an zaten uçuşta olan isteklerin) aynı ya da daha
+#     hafif sıkıntıları tekrar sayılmaz; tek olay gecikmeyi katlayarak büyütmesin
+# Her karar ekrana (ve istenirse pace_log CSV'sine) yazılır.
+# ==============================================================
+
+PACE_MIN_DELAY = 0.05      # sn, istekler arası en kısa bekleme
+PACE_MAX_DELAY = 30.0      # sn
+PACE_WINDOW = 10           # artış için üst üste sağlıklı sayfa
+PACE_RATE_STEP = 0.25      # her sağlıklı pencerede hız artışı (istek/sn)
+PACE_JITTER = 0.3          # bekleme ±%30 rastgele
+PACE_SLOW_FACTOR = 2.5     # gecikme taban süresinin bu katını aşarsa "slow"
+PACE_EWMA = 0.2
+PACE_BASE_WINDOW = 50      # taban için tutulan son sağlıklı yükleme süresi sayısı
+PACE_BASE_QUANTILE = 0.5   # taban = bu dilim (medyan: tek tük hızlı/yavaş örnek tabanı oynatmaz)
+PACE_BASE_MIN_SAMPLES = 10  # taban bu kadar örnekten önce güvenilmez -> "slow" denmez
+PACE_LAT_CLIP = 4.0        # EWMA'ya giren süre tabanın bu katıyla sınırlı (tek aykırı sayfa "slow" yaptırmasın)
+
+# sonuç -> gecikme çarpanı (1'den büyükse sıkıntı)
+BACKOFF = {
+    "slow": 1.25,
+    "retry": 1.5,
+    "no_comments": 2.0,
+    "error": 2.0,
+    "blocked": 4.0,
+}
+OUTCOMES = ("ok",) + tuple(BACKOFF)
+
+LOG_FIELDS = ["ts", "name", "decision", "outcome", "delay", "concurrency", "pages_per_min"]
+
+
+class Pacer:
+    """
+    Thread-safe. Hem thread'li (wait / slot) hem asyncio (rate / concurrency okuma) yollarında kullanılır.
+
+        pacer = Pacer(delay=0.35, max_concurrency=4)
+        with pacer.slot():
+            t0 = time.perf_counter(); ok = ...
+            pacer.observe("ok" if ok else "error", time.perf_counter() - t0)
+        pacer.wait()
+    """
+
+    def __init__(
+        self,
+        delay: float = 1.0,
+        min_delay: float = PACE_MIN_DELAY,
+        max_delay: float = PACE_MAX_DELAY,
+        concurrency: int | None = None,
+        max_concurrency: int = 1,
+        window: int = PACE_WINDOW,
+        rate_step: float = PACE_RATE_STEP,
+        jitter: float = PACE_JITTER,
+        name: str = "pacer",
+        log_path: str = "",
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min(max(delay, min_delay), max_delay)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.concurrency = min(self.max_concurrency, max(1, int(concurrency or self.max_concurrency)))
+        self.window = max(1, window)
+        self.rate_step = rate_step
+        self.jitter = jitter
+        self.name = name
+        self.log_path = log_path
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._active = 0
+        self._healthy = 0
+        self._hold = 0            # geri çekilme sonrası yok sayılacak gözlem sayısı
+        self._hold_factor = 0.0   # son geri çekilmenin çarpanı
+        self._lat_ewma = None
+        self._lat_recent = deque(maxlen=PACE_BASE_WINDOW)
+        self._t0 = time.monotonic()
+        self.pages = 0
+        self.decisions = []
+
+    # ---------- okuma ----------
+    @property
+    def rate(self) -> float:
+        return 1.0 / self.delay
+
+    def pages_per_min(self) -> float:
+        return self.pages * 60.0 / max(1e-9, time.monotonic() - self._t0)
+
+    # ---------- geri besleme ----------
+    @property
+    def latency_base(self) -> float | None:
+        if not self._lat_recent:
+            return None
+        lat = sorted(self._lat_recent)
+        return lat[int(PACE_BASE_QUANTILE * (len(lat) - 1))]
+
+    def _classify(self, outcome: str, latency: float | None) -> str:
+        # taban sadece sağlıklı sayfalardan; EWMA ile aynı hızda kayıp yavaşlamayı gizlemesin
+        if outcome != "ok" or latency is None or latency <= 0:
+            return outcome
+        ready = len(self._lat_recent) >= PACE_BASE_MIN_SAMPLES
+        x = min(latency, PACE_LAT_CLIP * self.latency_base) if ready else latency
+        self._lat_ewma = x if self._lat_ewma is None else PACE_EWMA * x + (1 - PACE_EWMA) * self._lat_ewma
+        self._lat_recent.append(latency)
+        if ready and self._lat_ewma > PACE_SLOW_FACTOR * self.latency_base:
+            return "slow"
+        return outcome
+
+    def observe(self, outcome: str, latency: float | None = None):
+        """outcome: OUTCOMES'tan biri; latency: sayfanın yüklenme süresi (sn)."""
+        if outcome not in OUTCOMES:
+            raise ValueError(f"Bilinmeyen sonuç: {outcome} (seçenekler: {OUTCOMES})")
+        with self._cond:
+            self.pages += 1
+            outcome = self._classify(outcome, latency)
+            old_d, old_c = self.delay, self.concurrency
+
+            if self._hold > 0:
+                self._hold -= 1
+                if outcome == "ok" or BACKOFF[outcome] <= self._hold_factor:
+                    return
+
+            if outcome == "ok":
+                self._healthy += 1
+                if self._healthy < self.window:
+                    return
+                self._healthy = 0
+                self.delay = max(self.min_delay, 1.0 / (self.rate + self.rate_step))
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                decision = "hızlan"
+            else:
+                self._healthy = 0
+                factor = BACKOFF[outcome]
+                self.delay = min(self.max_delay, self.delay * factor)
+                if factor >= 2.0:
+                    self.concurrency = max(1, self.concurrency // 2)
+                self._hold = old_c if factor >= 2.0 else self.window
+                self._hold_factor = factor
+                decision = "yavaşla"
+
+            if (self.delay, self.concurrency) != (old_d, old_c):
+                self._cond.notify_all()
+                self._log(decision, outcome, old_d, old_c)
+
+    def _log(self, decision: str, outcome: str, old_d: float, old_c: int):
+        icon = "🐇" if decision == "hızlan" else "🐢"
+        ppm = self.pages_per_min()
+        print(
+            f"{icon} Pacer[{self.name}] {decision} ({outcome}): gecikme {old_d:.2f}->{self.delay:.2f}s, "
+            f"eşzamanlılık {old_c}->{self.concurrency}, {ppm:.1f} sayfa/dk"
+        )
+        row = {
+            "ts": round(time.time(), 3), "name": self.name, "decision": decision, "outcome": outcome,
+            "delay": round(self.delay, 4), "concurrency": self.concurrency, "pages_per_min": round(ppm, 2),
+        }
+        self.decisions.append(row)
+        if self.log_path:
+            new = not os.path.exists(self.log_path)
+            with open(self.log_path, "a", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=LOG_FIELDS)
+                if new:
+                    w.writeheader()
+                w.writerow(row)
+
+    # ---------- uygulama ----------
+    def next_delay(self, extra: float = 0.0) -> float:
+        return self.delay * random.uniform(1 - self.jitter, 1 + self.jitter) + extra
+
+    def wait(self, extra: float = 0.0):
+        time.sleep(self.next_delay(extra))
+
+    @contextmanager
+    def slot(self):
+        """Aynı anda en fazla `concurrency` iş (havuzdaki fazla worker bekler)."""
+        with self._cond:
+            while self._active >= self.concurrency:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+
+def pacer_from_config(cfg, max_concurrency: int | None = None, delay: float | None = None, name: str = "") -> Pacer:
+    """ScrapeConfig -> Pacer: başlangıç gecikmesi (verilmezse) eski sabit beklemelerin ortalaması."""
+    return Pacer(
+        delay=delay or (cfg.min_sleep + cfg.max_sleep) / 2,
+        max_concurrency=max_concurrency or getattr(cfg, "workers", 1),
+        name=name or os.path.splitext(os.path.basename(cfg.out_csv))[0],
+        log_path=getattr(cfg, "pace_log", ""),
+    )
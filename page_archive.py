@@ -0,0 +1,315 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from comment_extract import CSV_FIELDS, extract_comments_from_html, extract_comments_structured
+from comment_sink import SINK_FORMATS, CommentSink, list_parts
+
+# ================== SAYFA ARŞİVİ (KAYIT / TEKRAR) ==================
+# Taranan her sayfanın HTML'i (network modunda yakalanan JSON yükleri de) sıkıştırılıp
+# URL, zaman, sayfa no ve base_url ile tek bir SQLite dosyasına yazılır (ScrapeConfig.archive).
+# Seçiciler değişince / yeni alan eklenince 7000 sayfayı yeniden taramak yerine arşiv, güncel
+# comment_extract koduyla süreçler arası paralel yeniden ayrıştırılır:
+#   python page_archive.py amd.archive.sqlite --out amd_yeniden.csv --workers 8
+#   python page_archive.py amd.archive.sqlite --bench --modes offline,network --repeat 3
+# Aynı arşiv çıkarıcılar için deterministik benchmark korpusudur (satır hash'lerinden digest).
+# ===================================================================
+
+ARCHIVE_CODEC = "zstd"        # "zstd" (pyarrow) | "zlib"; pyarrow yoksa zlib
+ARCHIVE_LEVEL = 6
+ARCHIVE_COMMIT_EVERY = 50     # bu kadar sayfada bir commit (save_progress'te de commit edilir)
+REPLAY_CHUNK = 64             # süreç başına tek seferde verilen sayfa
+REPLAY_MODES = ("offline", "network")
+
+
+def _zstd():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    return pa.Codec("zstd", compression_level=ARCHIVE_LEVEL)
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd().compress(data, asbytes=True)
+    return zlib.compress(data, ARCHIVE_LEVEL)
+
+
+def decompress(blob: bytes, codec: str, size: int) -> bytes:
+    if codec == "zstd":
+        return _zstd().decompress(blob, decompressed_size=size, asbytes=True)
+    return zlib.decompress(blob)
+
+
+class PageArchive:
+    """
+        arc = PageArchive("amd.archive.sqlite")
+        arc.add(page, url, html, payloads, base_url=cfg.base_url)
+        arc.close()
+
+        for rec in PageArchive(path, readonly=True).records(ids): ...
+    """
+
+    def __init__(self, path: str, codec: str = ARCHIVE_CODEC, readonly: bool = False,
+                 commit_every: int = ARCHIVE_COMMIT_EVERY):
+        self.path = path
+        self.codec = codec if codec != "zstd" or _zstd() is not None else "zlib"
+        self.commit_every = max(1, commit_every)
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        if readonly:
+            self._db = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, check_same_thread=False)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " id INTEGER PRIMARY KEY, base_url TEXT, page INTEGER, url TEXT, ts REAL, codec TEXT,"
+            " html BLOB, html_size INTEGER, payloads BLOB, payloads_size INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_base_page ON pages (base_url, page)")
+        self._db.commit()
+
+    def add(self, page: int, url: str, html: str, payloads=(), base_url: str = "", ts: float | None = None):
+        raw = (html or "").encode("utf-8")
+        blob = compress(raw, self.codec)
+        p_raw = json.dumps(list(payloads), ensure_ascii=False).encode("utf-8") if payloads else None
+        p_blob = compress(p_raw, self.codec) if p_raw else None
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pages (base_url, page, url, ts, codec, html, html_size, payloads, payloads_size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (base_url, page, url, ts or time.time(), self.codec, blob, len(raw),
+                 p_blob, len(p_raw) if p_raw else 0),
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self._db.commit()
+                self._uncommitted = 0
+
+    def ids(self, base_url: str | None = None) -> list:
+        """Arşiv sırasıyla (kayıt zamanı) kayıt id'leri; base_url verilirse sadece o ticker."""
+        sql, args = "SELECT id FROM pages ORDER BY id", ()
+        if base_url:
+            sql, args = "SELECT id FROM pages WHERE base_url = ? ORDER BY id", (base_url,)
+        with self._lock:
+            return [i for (i,) in self._db.execute(sql, args)]
+
+    def records(self, ids):
+        """id listesi -> {"id", "base_url", "page", "url", "ts", "html", "payloads"} (açılmış)."""
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, base_url, page, url, ts, codec, html, html_size, payloads, payloads_size"
+                f" FROM pages WHERE id IN ({','.join('?' * len(ids))}) ORDER BY id",
+                ids,
+            ).fetchall()
+        for rid, base_url, page, url, ts, codec, html, html_size, p_blob, p_size in rows:
+            payloads = json.loads(decompress(p_blob, codec, p_size)) if p_blob else []
+            yield {
+                "id": rid, "base_url": base_url, "page": page, "url": url, "ts": ts,
+                "html": decompress(html, codec, html_size).decode("utf-8"), "payloads": payloads,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, raw, packed, ticker = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(html_size + payloads_size), 0),"
+                " COALESCE(SUM(LENGTH(html) + COALESCE(LENGTH(payloads), 0)), 0), COUNT(DISTINCT base_url)"
+                " FROM pages"
+            ).fetchone()
+        return {"pages": n, "tickers": ticker, "raw_mb": round(raw / 2**20, 2), "packed_mb": round(packed / 2**20, 2)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+# ---------- tarayıcı süreci: yol başına tek açık arşiv ----------
+_OPEN = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_archive(path: str) -> PageArchive:
+    """Aynı yol için paylaşılan PageArchive (paralel worker'lar / ticker şeritleri aynı dosyaya yazar)."""
+    key = os.path.abspath(path)
+    with _OPEN_LOCK:
+        arc = _OPEN.get(key)
+        if arc is None:
+            arc = _OPEN[key] = PageArchive(path)
+        return arc
+
+
+def close_archive(path: str):
+    with _OPEN_LOCK:
+        arc = _OPEN.pop(os.path.abspath(path), None)
+    if arc is not None:
+        arc.commit()
+        print(f"🗄️ Arşiv: {path} | {arc.stats()}")
+        arc.close()
+
+
+# ---------- yeniden çıkarım ----------
+def extract_record(rec: dict, mode: str = "offline", member_id_fallback: bool = False) -> list:
+    """Arşiv kaydı -> satırlar; scraper'ların parse_page_html'i ile aynı çıkarım."""
+    if mode == "network":
+        return extract_comments_structured(rec["html"], rec["payloads"], rec["page"], rec["url"], member_id_fallback)
+    return extract_comments_from_html(rec["html"], rec["page"], rec["url"], member_id_fallback)
+
+
+_READERS = {}   # çocuk süreçte yol başına salt-okunur bağlantı
+
+
+def _extract_chunk(path: str, ids, mode: str, member_id_fallback: bool) -> list:
+    arc = _READERS.get(path)
+    if arc is None:
+        arc = _READERS[path] = PageArchive(path, readonly=True)
+    return [(rec["page"], extract_record(rec, mode, member_id_fallback)) for rec in arc.records(ids)]
+
+
+def iter_extracted(path: str, mode: str = "offline", workers: int = 0, base_url: str | None = None,
+                   member_id_fallback: bool = False, chunk: int = REPLAY_CHUNK):
+    """
+    (page, rows) ARŞİV SIRASIYLA. workers<=1 -> aynı süreçte (benchmark için gürültüsüz);
+    aksi halde ProcessPoolExecutor (0 -> CPU sayısı), her süreç arşivi salt-okunur açar.
+    """
+    if mode not in REPLAY_MODES:
+        raise ValueError(f"Bilinmeyen çıkarım modu: {mode} (seçenekler: {REPLAY_MODES})")
+    index = PageArchive(path, readonly=True)
+    ids = index.ids(base_url)
+    index.close()
+    chunk = max(1, chunk)
+    chunks = [ids[i:i + chunk] for i in range(0, len(ids), chunk)]
+    n = len(chunks)
+    if workers == 1 or n <= 1:
+        for c in chunks:
+            yield from _extract_chunk(path, c, mode, member_id_fallback)
+        return
+    with ProcessPoolExecutor(max_workers=workers or None) as ex:
+        for res in ex.map(_extract_chunk, [path] * n, chunks, [mode] * n, [member_id_fallback] * n):
+            yield from res
+
+
+def replay(
+    path: str,
+    out_path: str,
+    out_format: str = "csv",
+    mode: str = "offline",
+    workers: int = 0,
+    base_url: str | None = None,
+    member_id_fallback: bool = False,
+) -> dict:
+    """
+    Arşivi güncel çıkarım koduyla yeniden ayrıştırıp out_path'e yazar (tarama çıktısıyla aynı
+    CSV_FIELDS; hash ile dedup, ilk görülen kalır). Var olan çıktının üzerine yazmaz.
+    """
+    if os.path.exists(out_path) or list_parts(out_path):
+        raise FileExistsError(f"{out_path} zaten var; yeniden çıkarım yeni bir dosyaya yazılır.")
+    t0 = time.perf_counter()
+    sink = CommentSink(out_path, CSV_FIELDS, fmt=out_format)
+    seen = set()
+    stats = {"pages": 0, "empty_pages": 0, "rows": 0, "unique": 0}
+    for page, rows in iter_extracted(path, mode, workers, base_url, member_id_fallback):
+        stats["pages"] += 1
+        stats["rows"] += len(rows)
+        if not rows:
+            stats["empty_pages"] += 1
+        new_rows = [r for r in rows if r["hash"] not in seen]
+        seen.update(r["hash"] for r in new_rows)
+        sink.add(new_rows, page)
+        if sink.due():
+            sink.flush()
+    sink.flush()
+    stats["unique"] = len(seen)
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    stats["pages_per_sec"] = round(stats["pages"] / max(stats["seconds"], 1e-9), 1)
+    print(f"♻️ {path} -> {out_path} ({mode}): {stats}")
+    return stats
+
+
+def bench(path: str, modes=REPLAY_MODES, workers: int = 1, repeat: int = 3, member_id_fallback: bool = False) -> dict:
+    """
+    Arşiv = sabit korpus. Her mod için en iyi süre ve satır hash'lerinin digest'i
+    (çıkarıcı değişikliği çıktıyı değiştirdiyse digest değişir).
+    """
+    out = {"archive": path, "workers": workers, "modes": {}}
+    for mode in modes:
+        best, digest, pages, rows = None, "", 0, 0
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            h = hashlib.sha1()
+            pages = rows = 0
+            for page, page_rows in iter_extracted(path, mode, workers, member_id_fallback=member_id_fallback):
+                pages += 1
+                rows += len(page_rows)
+                for r in page_rows:
+                    h.update(f"{page}\t{r['comment_id']}\t{r['hash']}\t{r['like']}\t{r['dislike']}\n".encode("utf-8"))
+            sec = time.perf_counter() - t0
+            best = sec if best is None else min(best, sec)
+            digest = h.hexdigest()
+        out["modes"][mode] = {
+            "seconds": round(best, 4), "pages": pages, "rows": rows,
+            "pages_per_sec": round(pages / max(best, 1e-9), 1), "digest": digest,
+        }
+        print(f"  {mode:8s} {pages:6d} sayfa {rows:8d} satır  {best:8.3f} s  "
+              f"{pages / max(best, 1e-9):8.1f} sayfa/s  {digest[:12]}")
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sayfa arşivinden yorumları yeniden çıkar / çıkarıcı benchmark'ı")
+    ap.add_argument("archive", help="ScrapeConfig.archive ile yazılan .sqlite")
+    ap.add_argument("--out", default=None, help="yeniden çıkarım çıktısı (yeni dosya)")
+    ap.add_argument("--format", default="csv", choices=SINK_FORMATS)
+    ap.add_argument("--mode", default="offline", choices=REPLAY_MODES)
+    ap.add_argument("--workers", type=int, default=0, help="süreç sayısı (0 -> CPU sayısı, 1 -> tek süreç)")
+    ap.add_argument("--base-url", default=None, help="sadece bu ticker'ın sayfaları")
+    ap.add_argument("--member-id-fallback", action="store_true", help="yorumNew arşivleri (comment_id yoksa üye id)")
+    ap.add_argument("--bench", action="store_true", help="sadece çıkarım süresi + digest")
+    ap.add_argument("--modes", default=",".join(REPLAY_MODES), help="--bench için virgüllü modlar")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--save", default=None, help="--bench sonucunu JSON'a yaz")
+    args = ap.parse_args(argv)
+
+    print(f"🗄️ {args.archive}: {PageArchive(args.archive, readonly=True).stats()}")
+    if args.bench:
+        modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+        unknown = [m for m in modes if m not in REPLAY_MODES]
+        if unknown:
+            ap.error(f"bilinmeyen mod: {unknown} (seçenekler: {list(REPLAY_MODES)})")
+        results = bench(args.archive, modes, args.workers, args.repeat, args.member_id_fallback)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"[OK] Kaydedildi: {args.save}")
+        return 0
+    if not args.out:
+        ap.error("--out ya da --bench gerekli")
+    replay(args.archive, args.out, args.format, args.mode, args.workers, args.base_url, args.member_id_fallback)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# modüller repo kökünde (paket yok)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# ----- test sitesi -----
+# /page/N (1..LAST_PAGE): #comments_new içinde "page-N"; küçük sayfalar daha geç yanıtlanır
+# (sonuçlar sırasız biter). LAST_PAGE sonrası 404. Diğer yollar tek tek sınıflandırma içindir.
+LAST_PAGE = 8
+PAGE_DELAY_SEC = 0.02
+
+PAGE_RE = re.compile(r"page-(\d+)")
+
+
+def page_html(n: int) -> str:
+    return f"<html><body><div id='comments_new'><p>page-{n}</p></div></body></html>"
+
+
+FIXED = {
+    "/blocked": (403, "<html><title>Access denied</title></html>"),
+    "/challenge": (200, "<html><title>Just a moment...</title><div id='comments_new'></div></html>"),
+    "/bare": (200, "<html><body><p>yorum kutusu yok</p></body></html>"),
+    "/gone": (404, "<html>not found</html>"),
+    "/removed": (410, "<html>gone</html>"),
+    "/broken": (500, "<html>oops</html>"),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits.append((time.monotonic(), self.path))
+        m = re.fullmatch(r"/page/(\d+)", self.path)
+        if m:
+            n = int(m.group(1))
+            if 1 <= n <= LAST_PAGE:
+                time.sleep((LAST_PAGE - n) * PAGE_DELAY_SEC)
+                status, body = 200, page_html(n)
+            else:
+                status, body = 404, "<html>not found</html>"
+        else:
+            status, body = FIXED.get(self.path, (404, "<html>not found</html>"))
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class Site:
+    def __init__(self, server):
+        self.server = server
+        self.base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def url(self, path) -> str:
+        return f"{self.base}/page/{path}" if isinstance(path, int) else self.base + path
+
+    @property
+    def hits(self) -> list:
+        return self.server.hits
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.hits = []
+    t = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.02}, daemon=True)
+    t.start()
+    try:
+        yield Site(server)
+    finally:
+        server.shutdown()
+        server.server_close()
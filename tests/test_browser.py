@@ -0,0 +1,122 @@
+import threading
+
+import requests
+
+import yorumNew
+from browser import DriverPool, run_sharded
+from conftest import LAST_PAGE, PAGE_RE
+
+
+class _Driver:
+    """Sadece kimliği olan sahte driver (süreç yok -> RSS/reap adımları boşa düşer)."""
+
+    def __init__(self, n):
+        self.n = n
+
+    def quit(self):
+        pass
+
+
+def _pool(size):
+    ids = iter(range(1000))
+    lock = threading.Lock()
+
+    def open_fn():
+        with lock:
+            return _Driver(next(ids))
+
+    return DriverPool(open_fn, lambda d: d.quit(), size=size, health_fn=lambda d: True)
+
+
+def _fetch_page(site, used):
+    def process_fn(driver, page):
+        used.add(driver.n)
+        r = requests.get(site.url(page), timeout=5)
+        if r.status_code == 404:
+            return []
+        r.raise_for_status()
+        return [int(PAGE_RE.search(r.text).group(1))]
+
+    return process_fn
+
+
+def test_run_sharded_emits_in_job_order(site):
+    got, used = [], set()
+    jobs = list(range(1, LAST_PAGE + 1))
+    with _pool(4) as pool:
+        n = run_sharded(jobs, _fetch_page(site, used), pool, lambda job, res, err: got.append((job, res, err)))
+
+    assert n == LAST_PAGE
+    assert got == [(p, [p], None) for p in jobs]
+    assert len(used) > 1  # işler worker'lara dağıldı
+
+
+def test_run_sharded_stops_after_empty_page(site):
+    got, used = [], set()
+    jobs = list(range(1, LAST_PAGE + 9))
+    with _pool(3) as pool:
+        run_sharded(
+            jobs, _fetch_page(site, used), pool, lambda job, res, err: got.append((job, res, err)),
+            stop_fn=lambda job, res: not res,
+        )
+
+    # sıra beklenirken önden çekilen sayfalar olabilir ama boş sayfadan sonrası on_result'a gitmez
+    assert got == [(p, [p], None) for p in range(1, LAST_PAGE + 1)] + [(LAST_PAGE + 1, [], None)]
+
+
+def test_run_sharded_passes_errors_in_order(site):
+    def process_fn(driver, job):
+        if job % 3 == 0:
+            raise ValueError(job)
+        return [job]
+
+    got = []
+    with _pool(2) as pool:
+        run_sharded(range(1, 8), process_fn, pool, lambda job, res, err: got.append((job, res, err)))
+
+    assert [job for job, _, _ in got] == list(range(1, 8))
+    for job, res, err in got:
+        if job % 3 == 0:
+            assert res is None and isinstance(err, ValueError)
+        else:
+            assert (res, err) == ([job], None)
+
+
+class _FakeChrome:
+    def __init__(self, options=None, use_subprocess=None):
+        arg = next(a for a in options.arguments if a.startswith("--user-data-dir="))
+        self.user_data_dir = arg.split("=", 1)[1]
+        self.current_url = "about:blank"
+
+    def set_page_load_timeout(self, t):
+        pass
+
+    def execute_cdp_cmd(self, *args):
+        return {}
+
+    def execute_script(self, *args):
+        return 1
+
+    def quit(self):
+        pass
+
+
+def test_parallel_drivers_get_distinct_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(yorumNew, "CHROME_PROFILE_DIR", str(tmp_path / "main"))
+    monkeypatch.setattr(yorumNew.uc, "Chrome", _FakeChrome)
+    cfg = yorumNew.ScrapeConfig(
+        base_url="http://127.0.0.1", workers=3, spare_drivers=1, fallback_profile_dir=str(tmp_path / "fb")
+    )
+
+    with yorumNew._driver_pool(cfg) as pool:
+        drivers = [pool.acquire() for _ in range(cfg.workers)]
+        dirs = {d.user_data_dir for d in drivers}
+        assert len(dirs) == cfg.workers
+        assert str(tmp_path / "main") in dirs
+
+        new = pool.replace(drivers[0])
+        assert new.user_data_dir not in {d.user_data_dir for d in drivers[1:]}
+        for d in drivers[1:] + [new]:
+            pool.release(d)
+
+    assert not yorumNew._profile_slots
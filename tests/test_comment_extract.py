@@ -0,0 +1,122 @@
+import hashlib
+import os
+
+import pytest
+
+from comment_extract import (
+    CSV_FIELDS,
+    comment_hash,
+    extract_comments_from_html,
+    extract_like_dislike,
+    find_card,
+    parse_html,
+    visible_text,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "investing_comments.html")
+URL = "https://www.investing.com/equities/tesla-motors-commentary/3"
+
+
+@pytest.fixture(scope="module")
+def page_html():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+def _row(index, dt, user, like, dislike, cid, text, digest):
+    return {
+        "page": 3, "index_in_page": index, "datetime": dt, "username": user, "like": like,
+        "dislike": dislike, "comment_id": cid, "comment": text, "hash": digest, "source_url": URL,
+    }
+
+
+# hash'ler SeenStore'daki dedup anahtarları: değişirse eski taramalar her yorumu yeniden yazar
+EXPECTED = [
+    _row(1, "Mar 03, 2025 14:21", "Trader Joe", "12", "3", "48213377",
+         "Earnings beat again.\nHolding long.\nTarget 400", "4dee9e291b57c2ca4273eee116acd820f84c9bc4"),
+    _row(2, "Mar 03, 2025 13:05", "Ayşe K.", "7", "0", "",
+         "Satış gelir mi? 🤔", "1d7db76db63c259cebb486767660323fd7b8d88c"),
+    _row(3, "Mar 02, 2025", "bull", "4", "1", "48213001",
+         "Short squeeze\nincoming", "154112b0ce28965500005797a41a3b6b5f0bffa4"),
+    # 4. kartın metni boş: atlanır, index_in_page yine ilerler
+    _row(5, "Mar 01, 2025", "yatırımcı", "5", "2", "48212000",
+         "Birinci paragraf.\nİkinci paragraf.", "c0d595847ca2d192192ee404c14e40ff8bc7ce15"),
+]
+
+
+def test_extracts_exact_rows(page_html):
+    rows = extract_comments_from_html(page_html, 3, URL)
+    assert rows == EXPECTED
+    assert all(list(r) == CSV_FIELDS for r in rows)
+
+
+def test_member_id_fallback_only_fills_missing_ids(page_html):
+    rows = extract_comments_from_html(page_html, 3, URL, member_id_fallback=True)
+    assert [r["comment_id"] for r in rows] == ["48213377", "209876543", "48213001", "48212000"]
+    assert [{k: v for k, v in r.items() if k != "comment_id"} for r in rows] == [
+        {k: v for k, v in r.items() if k != "comment_id"} for r in EXPECTED
+    ]
+
+
+def test_hash_is_sha1_of_stripped_text():
+    assert comment_hash("  Short squeeze\nincoming \n") == hashlib.sha1(b"Short squeeze\nincoming").hexdigest()
+    assert all(r["hash"] == comment_hash(r["comment"]) for r in EXPECTED)
+
+
+def test_pages_without_comments_give_no_rows(page_html):
+    assert extract_comments_from_html("", 1, URL) == []
+    assert extract_comments_from_html("<html><body><p>404</p></body></html>", 1, URL) == []
+    assert extract_comments_from_html(page_html.replace('id="comments_new"', 'id="other"'), 1, URL) == []
+
+
+def _el(fragment):
+    return parse_html(f"<div id='root'>{fragment}</div>")
+
+
+@pytest.mark.parametrize(
+    "fragment, text",
+    [
+        ("a&nbsp;&nbsp;b\t c", "a b c"),
+        ("one<br>two<br/><br/>three", "one\ntwo\nthree"),
+        ("<p>x</p><p> y </p>tail", "x\ny\ntail"),
+        ("in<span>line</span> <b>bold</b>", "inline bold"),
+        ("keep<script>drop()</script> after<style>.x{}</style>", "keep after"),
+        ("<ul><li>a</li><li>b</li></ul>", "a\nb"),
+    ],
+)
+def test_visible_text(fragment, text):
+    assert visible_text(_el(fragment)) == text
+
+
+def test_find_card_stops_at_first_ancestor_with_member_and_date():
+    root = _el(
+        "<div id='card'><a href='/members/1'>u</a><span data-test='comment-date'>d</span>"
+        "<div><div><div id='c' class='break-words leading-5'>t</div></div></div></div>"
+    )
+    comment = root.get_element_by_id("c")
+    assert find_card(comment).get("id") == "card"
+
+
+def test_find_card_gives_up_after_max_depth():
+    nested = "<div>" * 9 + "<div id='c'>t</div>" + "</div>" * 9
+    root = _el(f"<a href='/members/1'>u</a><span data-test='comment-date'>d</span>{nested}")
+    card = find_card(root.get_element_by_id("c"))
+    assert card.get("id") != "root"  # 7 seviyede durur, kullanıcı/tarih bulunamaz
+
+
+@pytest.mark.parametrize(
+    "fragment, expected",
+    [
+        # aria-label önce
+        ("<button aria-label='Like 12'>99</button><button aria-label='Dislike 3'>98</button>", ("12", "3")),
+        ("<button aria-label='Beğen 5'></button><button aria-label='Beğenme 2'></button>", ("5", "2")),
+        # sonra buton metinleri
+        ("<button><span>7</span></button><button>0 votes</button>", ("7", "0")),
+        # en son tek başına sayı olan span'ler
+        ("<span>Mar 02, 2025</span><span>4</span><span>1</span>", ("4", "1")),
+        ("<button aria-label='Like 1'></button>", ("1", "")),
+        ("<span>no counts</span>", ("", "")),
+    ],
+)
+def test_extract_like_dislike(fragment, expected):
+    assert extract_like_dislike(_el(fragment)) == expected
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+import crawl_async
+from conftest import LAST_PAGE, PAGE_RE, page_html
+from crawl_async import TokenBucket, crawl_pages, fetch_html, host_bucket
+
+
+def _page_no(job, html):
+    return [int(PAGE_RE.search(html).group(1))]
+
+
+def _collect():
+    got = []
+    return got, lambda job, res, err: got.append((job, res, err))
+
+
+@pytest.mark.parametrize(
+    "path, ok, can_fallback, outcome",
+    [
+        (1, True, False, "ok"),
+        ("/blocked", False, True, "blocked"),
+        ("/challenge", False, True, "blocked"),
+        ("/bare", False, True, "no_comments"),
+        ("/broken", False, True, "error"),
+        ("/gone", False, False, None),
+        ("/removed", False, False, None),
+    ],
+)
+def test_fetch_html_classifies(site, path, ok, can_fallback, outcome):
+    async def go():
+        async with aiohttp.ClientSession() as session:
+            return await fetch_html(session, site.url(path), None)
+
+    html, reason, fallback, got = asyncio.run(go())
+    assert (html is not None, fallback, got) == (ok, can_fallback, outcome)
+    assert bool(reason) != ok
+
+
+def test_crawl_pages_emits_in_job_order(site):
+    got, on_result = _collect()
+    jobs = list(range(1, LAST_PAGE + 1))
+    stats = crawl_pages(jobs, site.url, _page_no, on_result, rate=0, max_in_flight=LAST_PAGE)
+
+    assert got == [(p, [p], None) for p in jobs]
+    # küçük sayfalar daha geç yanıtlanır: istekler aynı anda uçuştaydı
+    assert len(site.hits) == LAST_PAGE
+    assert stats["http_ok"] == LAST_PAGE and stats["error"] == 0 and stats["pages"] == LAST_PAGE
+
+
+def test_crawl_pages_stops_at_gone_page(site):
+    got, on_result = _collect()
+    jobs = list(range(1, LAST_PAGE + 5))
+    stats = crawl_pages(
+        jobs, site.url, _page_no, on_result, rate=0, max_in_flight=4, stop_fn=lambda job, res: not res
+    )
+
+    assert got == [(p, [p], None) for p in range(1, LAST_PAGE + 1)] + [(LAST_PAGE + 1, [], None)]
+    assert stats["error"] == 0 and stats["gone"] >= 1
+
+
+def test_crawl_pages_falls_back_for_unusable_pages(site):
+    paths = {1: 1, 2: "/blocked", 3: "/bare", 4: "/broken", 5: "/gone"}
+    browser = []
+
+    def fallback_fn(job, url):
+        browser.append(job)
+        return page_html(100 + job)
+
+    got, on_result = _collect()
+    stats = crawl_pages(
+        sorted(paths), lambda job: site.url(paths[job]), _page_no, on_result,
+        rate=0, fallback_fn=fallback_fn, fallback_workers=2,
+    )
+
+    assert sorted(browser) == [2, 3, 4]
+    assert got == [(1, [1], None), (2, [102], None), (3, [103], None), (4, [104], None), (5, [], None)]
+    assert (stats["http_ok"], stats["fallback"], stats["gone"], stats["error"]) == (1, 3, 1, 0)
+
+
+def test_crawl_pages_without_fallback_reports_error(site):
+    paths = {1: "/blocked", 2: 2}
+    got, on_result = _collect()
+    crawl_pages(sorted(paths), lambda job: site.url(paths[job]), _page_no, on_result, rate=0)
+
+    (job1, res1, err1), (job2, res2, err2) = got
+    assert (job1, res1) == (1, None) and isinstance(err1, RuntimeError)
+    assert (job2, res2, err2) == (2, [2], None)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_reserve_schedule(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(crawl_async.time, "monotonic", clock)
+    bucket = TokenBucket(rate=10, burst=3)
+
+    # burst kadar beklemesiz, sonra 1/rate aralıklarla sıraya girer
+    assert [round(bucket.reserve(), 6) for _ in range(5)] == [0.0, 0.0, 0.0, 0.1, 0.2]
+
+    # boşta geçen süre birikir ama burst'ü aşmaz
+    clock.now += 10
+    assert [round(bucket.reserve(), 6) for _ in range(4)] == [0.0, 0.0, 0.0, 0.1]
+
+    clock.now += 0.05
+    assert round(bucket.reserve(), 6) == 0.15
+
+
+def test_token_bucket_zero_rate_never_waits():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.reserve() == 0.0 for _ in range(100))
+
+
+def test_host_bucket_is_per_host():
+    buckets = {}
+    a = host_bucket(buckets, "http://127.0.0.1:1/page/1", 5, 2)
+    assert host_bucket(buckets, "http://127.0.0.1:1/page/2", 5, 2) is a
+    assert host_bucket(buckets, "http://localhost:1/page/1", 5, 2) is not a
+
+
+def test_crawl_pages_respects_rate_limit(site, monkeypatch):
+    rate, burst = 20.0, 2
+    sent = []
+    real_fetch = crawl_async.fetch_html
+
+    async def timed_fetch(*args, **kwargs):
+        # token alındığı an (istemci tarafı; sunucudaki bağlantı kurulum gecikmesi karışmasın)
+        sent.append(time.monotonic())
+        return await real_fetch(*args, **kwargs)
+
+    monkeypatch.setattr(crawl_async, "fetch_html", timed_fetch)
+    got, on_result = _collect()
+    jobs = list(range(1, LAST_PAGE + 1))
+    crawl_pages(jobs, site.url, _page_no, on_result, rate=rate, burst=burst, max_in_flight=LAST_PAGE)
+
+    starts = sorted(sent)
+    assert len(starts) == len(site.hits) == LAST_PAGE
+    # ilk `burst` istek hemen, kalanlar 1/rate aralıklarla
+    assert starts[-1] - starts[0] >= (LAST_PAGE - burst) / rate * 0.9
+    for k in range(burst, LAST_PAGE):
+        assert starts[k] - starts[0] >= (k - burst + 1) / rate * 0.9
+    assert [job for job, _, _ in got] == jobs
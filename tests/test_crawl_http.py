@@ -0,0 +1,74 @@
+import pytest
+
+import yorumCekme
+from crawl_http import PageFetcher
+
+
+@pytest.mark.parametrize(
+    "path, ok, gone, outcome",
+    [
+        (1, True, False, "ok"),
+        ("/blocked", False, False, "blocked"),
+        ("/challenge", False, False, "blocked"),
+        ("/bare", False, False, "no_comments"),
+        ("/broken", False, False, "error"),
+        ("/gone", False, True, None),
+        ("/removed", False, True, None),
+    ],
+)
+def test_fetch_http_classifies(site, path, ok, gone, outcome):
+    fetcher = PageFetcher(timeout=5)
+    res = fetcher.fetch_http(site.url(path))
+    assert (res.ok, res.gone, res.outcome) == (ok, gone, outcome)
+    assert bool(res.html and "page-1" in res.html) == ok
+    fetcher.close()
+
+
+def test_fetch_http_connection_error_falls_back(site):
+    fetcher = PageFetcher(timeout=5)
+    url = site.url(1)
+    site.server.shutdown()
+    site.server.server_close()
+    res = fetcher.fetch_http(url)
+    assert not res.ok and not res.gone
+    assert res.outcome == "error"
+    assert fetcher.stats["http_fallback"] == 1
+
+
+def test_fetch_http_without_comment_requirement(site):
+    res = PageFetcher(timeout=5, require_comments=False).fetch_http(site.url("/bare"))
+    assert res.ok and res.outcome == "ok"
+
+
+@pytest.fixture
+def scraper(site, monkeypatch):
+    """scrape_one_page: sayfa no -> test sitesindeki yol; tarayıcı yolu kayıt tutan sahte."""
+    paths = {1: 1, 2: "/blocked", 3: "/bare", 4: "/gone", 5: "/broken"}
+    browser = []
+    monkeypatch.setattr(yorumCekme, "first_page_url", lambda cfg, page: site.url(paths[page]))
+    monkeypatch.setattr(yorumCekme, "parse_page_html", lambda cfg, page, html, url=None: ["http", page])
+
+    def paced_load(driver, url, cfg, pacer=None):
+        browser.append(url)
+        return True, ""
+
+    monkeypatch.setattr(yorumCekme, "paced_load", paced_load)
+    monkeypatch.setattr(yorumCekme, "extract_loaded_page", lambda driver, cfg, page: ["browser", page])
+    monkeypatch.setattr(yorumCekme.PageFetcher, "adopt_browser_cookies", lambda self, driver: None)
+    cfg = yorumCekme.ScrapeConfig(base_url=site.base)
+    return cfg, browser
+
+
+def test_scrape_one_page_falls_back_only_when_http_is_unusable(scraper):
+    cfg, browser = scraper
+    fetcher = PageFetcher(timeout=5)
+    got = {page: yorumCekme.scrape_one_page(None, cfg, page, fetcher) for page in (1, 2, 3, 4, 5)}
+    assert got == {
+        1: ["http", 1],
+        2: ["browser", 2],
+        3: ["browser", 3],
+        4: [],  # 404: liste sonu, tarayıcı açılmaz
+        5: ["browser", 5],
+    }
+    assert [u.rsplit("/", 1)[-1] for u in browser] == ["blocked", "bare", "broken"]
+    assert fetcher.stats == {"http_ok": 1, "http_fallback": 3, "blocked": 1, "gone": 1, "error": 0}
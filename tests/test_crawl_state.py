@@ -0,0 +1,72 @@
+import pytest
+
+from crawl_state import Frontier, SeenStore
+
+MAX_PAGES = 20
+
+
+@pytest.fixture
+def reopen(tmp_path):
+    """Aynı SQLite üzerinde yeni SeenStore + Frontier açar (yeniden başlatma); öncekini kapatır."""
+    path = str(tmp_path / "crawl.seen.sqlite")
+    opened = []
+
+    def open_frontier(done_through=0):
+        if opened:
+            opened[-1].close()
+        store = SeenStore(path, capacity=1000)
+        opened.append(store)
+        frontier = Frontier(store)
+        frontier.seed(MAX_PAGES, done_through=done_through)
+        return frontier
+
+    yield open_frontier
+    opened[-1].close()
+
+
+def _crawl(frontier, pages, empty_from):
+    for page in pages:
+        frontier.begin(page)
+        if page >= empty_from:
+            frontier.truncate(page)
+            return
+        frontier.done(page)
+
+
+def test_restart_does_not_reseed_pages_after_the_end(reopen):
+    frontier = reopen()
+    _crawl(frontier, frontier.pending(), empty_from=8)
+    assert frontier.pending() == [8]
+
+    frontier = reopen(done_through=frontier.done_through())
+    assert frontier.pending() == [8]
+    assert frontier.counts() == {"done": 7, "pending": 1}
+
+
+def test_late_truncate_keeps_the_earlier_end(reopen):
+    frontier = reopen()
+    frontier.truncate(6)
+    frontier.truncate(9)  # sırasız biten worker: 9 zaten atılmıştı
+
+    frontier = reopen()
+    assert frontier.pending() == [1, 2, 3, 4, 5, 6]
+
+
+def test_end_moves_with_shift(reopen):
+    frontier = reopen()
+    _crawl(frontier, frontier.pending(), empty_from=8)
+    frontier.shift(3, after=2)  # başa 3 sayfa yeni yorum geldi
+
+    frontier = reopen(done_through=frontier.done_through())
+    assert frontier.pending() == [11]
+
+
+def test_content_past_the_end_lifts_the_cap(reopen):
+    frontier = reopen()
+    _crawl(frontier, frontier.pending(), empty_from=8)
+
+    frontier = reopen(done_through=frontier.done_through())
+    _crawl(frontier, frontier.pending(), empty_from=MAX_PAGES + 1)  # 8 artık dolu
+
+    frontier = reopen(done_through=frontier.done_through())
+    assert frontier.pending() == list(range(9, MAX_PAGES + 1))
@@ -0,0 +1,434 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import derin
+
+# ----- sahte fiyat kaynağı -----
+# İş günü barları; fetch_fn(ticker, start, end, interval) yfinance gibi [start, end) döndürür.
+MARKET_START = "2020-01-01"
+
+
+def make_bars(seed: int, n: int = 700, start: str = MARKET_START, freq: str = "B") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    spread = close * rng.uniform(0.002, 0.02, n)
+    return pd.DataFrame({
+        "datetime": pd.date_range(start, periods=n, freq=freq),
+        "open": close * (1 + rng.normal(0, 0.003, n)),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000_000, 9_000_000, n).astype("float64"),
+    }).assign(
+        high=lambda d: d[["open", "high", "close"]].max(axis=1),
+        low=lambda d: d[["open", "low", "close"]].min(axis=1),
+    )
+
+
+class StubSource:
+    """fetch_fn yerine: ticker -> ham barlar; çağrılar (ticker, start, end) olarak kaydedilir."""
+
+    def __init__(self, bars: dict):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, ticker, start, end, interval):
+        self.calls.append((ticker, start, end))
+        df = self.bars[ticker]
+        m = df["datetime"] >= pd.Timestamp(start)
+        if end is not None:
+            m &= df["datetime"] < pd.Timestamp(end)
+        return df[m].reset_index(drop=True)
+
+
+@pytest.fixture
+def derin_env(tmp_path, monkeypatch):
+    """derin ayarlarını tmp_path'e çeker; derin_env(**kv) ile modül sabitleri değiştirilir (test sonunda geri alınır)."""
+    def configure(**kv):
+        for k, v in kv.items():
+            monkeypatch.setattr(derin, k, v)
+
+    configure(
+        TICKERS={"AAA": "Aaa Corp", "BBB": "Bbb Inc"},
+        START_DATE=MARKET_START,
+        END_DATE=None,
+        OUT_FORMAT="csv",
+        OUT_PATH=str(tmp_path / "out" / "prices.csv"),
+        DATASET_DIR=str(tmp_path / "out" / "prices"),
+        QUALITY_REPORT_PATH=str(tmp_path / "out" / "quality.csv"),
+        CACHE_ENABLED=False,
+        EXTRA_FEATURES=[],
+    )
+    configure.root = tmp_path
+    return configure
+
+
+def _build_then_update(source, first_end, end):
+    derin.END_DATE = first_end
+    derin.build_pipeline(fetch_fn=source, workers=1)
+    derin.END_DATE = end
+    derin.update_pipeline(fetch_fn=source, workers=1)
+    return derin.load_prices()
+
+
+def _full_rebuild(source, end, root):
+    derin.END_DATE = end
+    derin.OUT_PATH = str(root / "full" / "prices.csv")
+    derin.DATASET_DIR = str(root / "full" / "prices")
+    derin.build_pipeline(fetch_fn=source, workers=1)
+    return derin.load_prices()
+
+
+def test_delta_refresh_with_cumulative_extras_matches_full_rebuild(derin_env):
+    derin_env(EXTRA_FEATURES=["atr_14", "obv"])
+    source = StubSource({"AAA": make_bars(1), "BBB": make_bars(2, n=650)})
+
+    delta = _build_then_update(source, "2022-01-03", "2022-09-01")
+    full = _full_rebuild(source, "2022-09-01", derin_env.root)
+
+    assert len(delta) == len(full) and (delta["datetime"] > pd.Timestamp("2022-01-03")).any()
+    # OBV ilk bardan birikir: tüm geçmiş yeniden hesaplanmalı (warm-up kuyruğu yetmez)
+    np.testing.assert_array_equal(delta["obv"].to_numpy(), full["obv"].to_numpy())
+    pd.testing.assert_frame_equal(delta, full, check_exact=False, rtol=1e-6)
+
+
+def test_chunked_intraday_writes_extra_features(derin_env, monkeypatch):
+    derin_env(INTERVAL="1h", END_DATE="2020-02-15", EXTRA_FEATURES=["atr_14", "obv"])
+    monkeypatch.setitem(derin.INTRADAY_CHUNK_DAYS, "1h", 5)
+    source = StubSource({"AAA": make_bars(1, n=900, freq="h"), "BBB": make_bars(2, n=600, freq="h")})
+
+    derin.build_pipeline_chunked(fetch_fn=source)
+    chunked = derin.load_prices()
+    assert len({start for _, start, _ in source.calls}) > 1  # gerçekten parça parça çekildi
+
+    whole = _full_rebuild(source, "2020-02-15", derin_env.root)
+    assert {"atr_14", "obv"} <= set(chunked.columns)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_chunked_rejects_extras_it_cannot_stream(derin_env):
+    derin_env(INTERVAL="1h", END_DATE="2020-02-15", EXTRA_FEATURES=["obv", "not_streamable"])
+    source = StubSource({"AAA": make_bars(1, freq="h"), "BBB": make_bars(2, freq="h")})
+
+    with pytest.raises(ValueError, match="not_streamable"):
+        derin.build_pipeline_chunked(fetch_fn=source)
+    assert source.calls == []
+
+
+
+def _quality_rows(check):
+    report = pd.read_csv(derin.QUALITY_REPORT_PATH, sep=derin.CSV_SEP)
+    rows = report[report["check"] == check]
+    return list(zip(rows["ticker"], rows["datetime"], rows["value"]))
+
+
+def test_chunked_reports_gaps_against_all_tickers(derin_env, monkeypatch):
+    derin_env(INTERVAL="1h", END_DATE="2020-01-14")
+    monkeypatch.setitem(derin.INTRADAY_CHUNK_DAYS, "1h", 5)  # parça sınırı: 2020-01-06 00:00
+    bbb = make_bars(2, n=300, freq="h")
+    missing = pd.to_datetime(["2020-01-03 10:00", "2020-01-06 00:00", "2020-01-06 01:00"])
+    source = StubSource({"AAA": make_bars(1, n=300, freq="h"), "BBB": bbb[~bbb["datetime"].isin(missing)]})
+
+    derin.build_pipeline_chunked(fetch_fn=source)
+
+    # tek ticker'ın kendi takvimiyle boşluk görünmez; sınırdaki boşluk önceki parçanın son barına damgalı
+    assert _quality_rows("calendar_gap") == [
+        ("BBB", "2020-01-03 09:00:00", 1.0),
+        ("BBB", "2020-01-05 23:00:00", 2.0),
+    ]
+
+
+def test_since_drops_context_findings_but_keeps_boundary_gap(derin_env):
+    bars = make_bars(1, n=10)
+    bars.loc[2, ["open", "high", "low", "close"]] *= 1.8  # bağlam barlarında sıçrama
+    bars.loc[8, ["open", "high", "low", "close"]] *= 1.8  # yeni barlarda sıçrama
+    calendar = bars["datetime"]
+    since = bars["datetime"].iloc[4]
+
+    report = derin.check_prices({"AAA": bars.drop(index=5)}, calendar=calendar, since=since)
+
+    assert list(zip(report["check"], report["datetime"])) == [
+        ("calendar_gap", since),
+        ("price_jump", bars["datetime"].iloc[8]),
+    ]
+    assert _quality_rows("calendar_gap") == [("AAA", "2020-01-07", 1.0)]
+
+# ----- artımlı güncelleme (update_pipeline) -----
+PRICES = ["open", "high", "low", "close"]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_delta_refresh_matches_full_rebuild(derin_env, fmt):
+    derin_env(OUT_FORMAT=fmt)
+    source = StubSource({"AAA": make_bars(1), "BBB": make_bars(2, n=650)})
+
+    delta = _build_then_update(source, "2022-01-03", "2022-09-01")
+    # delta çekimi son kayıtlı barın bir öncesinden başlar (örtüşme ile ölçek kontrolü)
+    assert sorted(c[:2] for c in source.calls[2:]) == [("AAA", "2021-12-30"), ("BBB", "2021-12-30")]
+
+    full = _full_rebuild(source, "2022-09-01", derin_env.root)
+    assert delta["datetime"].max() == full["datetime"].max() == pd.Timestamp("2022-08-31")
+    pd.testing.assert_frame_equal(delta, full, check_exact=False, rtol=1e-6)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_rescaled_history_is_refetched_from_start(derin_env, fmt):
+    derin_env(OUT_FORMAT=fmt)
+    adjusted = make_bars(1)
+    # ilk çekimde AAA split öncesi ölçekte; sonra sağlayıcı tüm geçmişi yarıya ölçekler
+    source = StubSource({"AAA": adjusted.assign(**{c: adjusted[c] * 2 for c in PRICES}), "BBB": make_bars(2)})
+    derin.END_DATE = "2022-01-03"
+    derin.build_pipeline(fetch_fn=source, workers=1)
+
+    source.bars["AAA"] = adjusted
+    source.calls.clear()
+    derin.END_DATE = "2022-09-01"
+    derin.update_pipeline(fetch_fn=source, workers=1)
+    updated = derin.load_prices()
+
+    starts = [(t, s) for t, s, _ in source.calls]
+    assert ("AAA", MARKET_START) in starts  # baştan çekildi
+    assert ("BBB", MARKET_START) not in starts  # BBB sadece delta
+    full = _full_rebuild(source, "2022-09-01", derin_env.root)
+    pd.testing.assert_frame_equal(updated, full, check_exact=False, rtol=1e-6)
+
+
+def test_rescale_check_ignores_the_partial_last_bar():
+    stored = make_bars(1, n=10)
+    fresh = stored.tail(2).copy()
+    fresh.loc[fresh.index[-1], "close"] *= 1.05  # gün içinde çekilmiş son bar kapanışta değişir
+    assert not derin.history_rescaled(stored, fresh)
+    fresh.loc[fresh.index[0], "close"] *= 1.001
+    assert derin.history_rescaled(stored, fresh)
+
+
+def test_same_day_last_bar_is_rewritten(derin_env):
+    derin_env()
+    final = make_bars(1)
+    last = final["datetime"].searchsorted(pd.Timestamp("2022-01-03")) - 1  # ilk çekimdeki son bar
+    partial = final.copy()
+    # ilk çekim gün içinde: son bar eksik (farklı close/high, yarım hacim)
+    partial.loc[last, ["close", "high", "volume"]] = [
+        final.loc[last, "close"] * 0.99, final.loc[last, "high"] * 0.995, final.loc[last, "volume"] / 2
+    ]
+    source = StubSource({"AAA": partial, "BBB": make_bars(2)})
+    derin.END_DATE = "2022-01-03"
+    derin.build_pipeline(fetch_fn=source, workers=1)
+    stored = derin.load_prices(tickers="AAA")
+    assert stored["close"].iloc[-1] == partial.loc[last, "close"]
+
+    source.bars["AAA"] = final
+    derin.END_DATE = "2022-09-01"
+    derin.update_pipeline(fetch_fn=source, workers=1)
+    updated = derin.load_prices()
+
+    row = updated[(updated["ticker"] == "AAA") & (updated["datetime"] == final.loc[last, "datetime"])]
+    assert len(row) == 1
+    assert row[["close", "high", "volume"]].iloc[0].tolist() == final.loc[last, ["close", "high", "volume"]].tolist()
+    full = _full_rebuild(source, "2022-09-01", derin_env.root)
+    pd.testing.assert_frame_equal(updated, full, check_exact=False, rtol=1e-6)
+
+
+# ----- eşzamanlı çekim: retry / backoff / batch -----
+class FlakyFetch:
+    """İlk `fail` çağrıda (ticker başına) hata fırlatır, sonra ticker'ı işaretleyen küçük df döner."""
+
+    def __init__(self, fail: int = 0, fail_tickers=None):
+        self.fail = fail
+        self.fail_tickers = fail_tickers
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, start, end, interval):
+        with self._lock:
+            self.calls.append((ticker, start))
+            n = sum(1 for t, _ in self.calls if t == ticker)
+        if (self.fail_tickers is None or ticker in self.fail_tickers) and n <= self.fail:
+            raise ConnectionError(f"{ticker}: geçici hata {n}")
+        return pd.DataFrame({"datetime": [pd.Timestamp(start)], "close": [float(len(ticker))], "tag": [ticker]})
+
+
+def _fetch_all(jobs, **kw):
+    kw = {"workers": 2, "backoff": 0.0, **kw}
+    return list(derin.iter_fetch_concurrent(jobs, "2022-01-01", "1d", **kw))
+
+
+def test_transient_failures_are_retried():
+    fetch = FlakyFetch(fail=2)
+    got = dict(_fetch_all([("AAA", "2020-01-01"), ("BB", "2021-01-01")], fetch_fn=fetch, retries=3))
+    assert {t: df["tag"].tolist() for t, df in got.items()} == {"AAA": ["AAA"], "BB": ["BB"]}
+    assert sorted(fetch.calls) == [("AAA", "2020-01-01")] * 3 + [("BB", "2021-01-01")] * 3
+
+
+def test_backoff_grows_between_attempts(monkeypatch):
+    waits = []
+    monkeypatch.setattr(derin.time, "sleep", waits.append)
+    monkeypatch.setattr(derin.random, "uniform", lambda a, b: 0.0)
+    fetch = FlakyFetch(fail=3)
+    derin.fetch_with_retry(fetch, "AAA", "2020-01-01", None, "1d", retries=4, backoff=0.5)
+    assert waits == [0.5, 1.0, 2.0]
+
+
+def test_exhausted_retries_yield_empty_frame():
+    fetch = FlakyFetch(fail=99, fail_tickers={"BAD"})
+    got = dict(_fetch_all([("BAD", "2020-01-01"), ("OK", "2020-01-01")], fetch_fn=fetch, retries=3))
+    assert got["BAD"].empty
+    assert got["OK"]["tag"].tolist() == ["OK"]
+    assert [t for t, _ in fetch.calls].count("BAD") == 3
+
+
+def test_failed_batch_falls_back_to_single_fetches():
+    batch_calls = []
+
+    def broken_batch(tickers, start, end, interval):
+        batch_calls.append(tuple(tickers))
+        raise ConnectionError("batch reddedildi")
+
+    fetch = FlakyFetch(fail=1, fail_tickers={"C"})
+    jobs = [("A", "2020-01-01"), ("B", "2020-01-01"), ("C", "2020-01-01"), ("D", "2021-01-01")]
+    got = dict(_fetch_all(jobs, fetch_fn=fetch, fetch_batch_fn=broken_batch, batch_size=3, retries=2))
+
+    # aynı start'lılar birlikte, batch_size'a bölünerek; her batch retries kadar denenir
+    assert sorted(batch_calls) == [("A", "B", "C")] * 2 + [("D",)] * 2
+    assert {t: df["tag"].tolist() for t, df in got.items()} == {t: [t] for t in "ABCD"}
+    assert sorted(fetch.calls) == [("A", "2020-01-01"), ("B", "2020-01-01"), ("C", "2020-01-01"),
+                                   ("C", "2020-01-01"), ("D", "2021-01-01")]
+
+
+def test_batch_result_missing_a_ticker_gives_empty_frame():
+    def batch(tickers, start, end, interval):
+        return {t: FlakyFetch()(t, start, end, interval) for t in tickers if t != "B"}
+
+    got = dict(_fetch_all([("A", "2020-01-01"), ("B", "2020-01-01")], fetch_batch_fn=batch, batch_size=2))
+    assert got["A"]["tag"].tolist() == ["A"] and got["B"].empty
+
+
+def test_results_arrive_in_completion_order():
+    # C hemen, B C bitince, A B bitince döner -> tamamlanma sırası C, B, A
+    done = {t: threading.Event() for t in "ABC"}
+    after = {"A": "B", "B": "C"}
+
+    def fetch(ticker, start, end, interval):
+        if ticker in after:
+            assert done[after[ticker]].wait(5)
+            time.sleep(0.05)
+        done[ticker].set()
+        return pd.DataFrame({"tag": [ticker]})
+
+    got = _fetch_all([("A", "2020-01-01"), ("B", "2020-01-01"), ("C", "2020-01-01")], fetch_fn=fetch, workers=3)
+    assert [t for t, _ in got] == ["C", "B", "A"]
+    assert all(df["tag"].tolist() == [t] for t, df in got)
+
+
+def test_single_worker_keeps_job_order():
+    jobs = [(t, "2020-01-01") for t in ["M", "A", "Z", "B"]]
+    got = _fetch_all(jobs, fetch_fn=FlakyFetch(), workers=1)
+    assert [t for t, _ in got] == ["M", "A", "Z", "B"]
+
+
+# ----- ham indirme cache'i -----
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    root = tmp_path / "cache"
+    monkeypatch.setattr(derin, "CACHE_DIR", str(root))
+    monkeypatch.setattr(derin, "CACHE_ENABLED", True)
+    monkeypatch.setattr(derin, "CACHE_OFFLINE", False)
+    monkeypatch.setattr(derin, "_cache_bytes", None)  # sayaç dizinle birlikte sıfırdan
+    return root
+
+
+def _today() -> str:
+    return pd.Timestamp.now("UTC").strftime("%Y-%m-%d")
+
+
+def _cached_files(root) -> dict:
+    return {p.name: p.stat().st_size for p in root.rglob("*.parquet")}
+
+
+def _age(ticker, start, end, seconds, interval="1d"):
+    path = derin._cache_path(derin._cache_key(ticker, start, end, interval, True))
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+    return path
+
+
+def test_cache_hit_and_miss(cache_dir):
+    df = make_bars(1, n=30)
+    assert derin.cache_get("AAA", "2020-01-01", "2020-03-01", "1d") is None
+
+    derin.cache_put("AAA", "2020-01-01", "2020-03-01", "1d", df)
+    pd.testing.assert_frame_equal(derin.cache_get("AAA", "2020-01-01", "2020-03-01", "1d"), df)
+    # anahtar: ticker, start, end, interval, auto_adjust
+    assert derin.cache_get("AAA", "2020-01-01", "2020-03-02", "1d") is None
+    assert derin.cache_get("AAA", "2020-01-01", "2020-03-01", "1h") is None
+    assert derin.cache_get("BBB", "2020-01-01", "2020-03-01", "1d") is None
+    assert derin.cache_get("AAA", "2020-01-01", "2020-03-01", "1d", auto_adjust=False) is None
+
+    derin.cache_put("CCC", "2020-01-01", "2020-03-01", "1d", pd.DataFrame())  # boş sonuç cache'lenmez
+    assert derin.cache_get("CCC", "2020-01-01", "2020-03-01", "1d") is None
+
+
+def test_ttl_applies_only_to_open_ranges(cache_dir):
+    df = make_bars(1, n=30)
+    today = _today()
+    derin.cache_put("OPEN", "2020-01-01", today, "1d", df)
+    derin.cache_put("CLOSED", "2020-01-01", "2020-03-01", "1d", df)
+
+    _age("OPEN", "2020-01-01", today, derin.CACHE_TTL_SEC - 60)
+    assert derin.cache_get("OPEN", "2020-01-01", today, "1d") is not None
+    _age("OPEN", "2020-01-01", today, derin.CACHE_TTL_SEC + 60)
+    assert derin.cache_get("OPEN", "2020-01-01", today, "1d") is None
+
+    _age("CLOSED", "2020-01-01", "2020-03-01", 365 * 86400)  # geçmişte biten aralık eskimez
+    assert derin.cache_get("CLOSED", "2020-01-01", "2020-03-01", "1d") is not None
+
+
+def test_lru_eviction_at_size_cap(cache_dir, monkeypatch):
+    df = make_bars(1, n=200)
+    for i, t in enumerate("ABC"):
+        derin.cache_put(t, "2020-01-01", "2020-12-31", "1d", df)
+        _age(t, "2020-01-01", "2020-12-31", 1000 - i * 100)  # A en eski, C en yeni
+    size = next(iter(_cached_files(cache_dir).values()))
+    assert set(_cached_files(cache_dir).values()) == {size}  # aynı içerik, aynı boyut
+    assert derin._cache_bytes == 3 * size
+
+    derin.cache_get("A", "2020-01-01", "2020-12-31", "1d")  # okunan A artık en yeni
+    # 4 girdi sınırı aşar; 3 girdi CACHE_EVICT_TO altında kalır -> tek (en eski okunan) girdi silinir
+    monkeypatch.setattr(derin, "CACHE_MAX_BYTES", int(3 * size / derin.CACHE_EVICT_TO) + 1)
+    derin.cache_put("D", "2020-01-01", "2020-12-31", "1d", df)
+
+    left = {t for t in "ABCD" if derin.cache_get(t, "2020-01-01", "2020-12-31", "1d") is not None}
+    assert left == {"A", "C", "D"}
+    assert derin._cache_bytes == sum(_cached_files(cache_dir).values()) == 3 * size
+
+
+def test_size_counter_tracks_overwrites(cache_dir):
+    small, big = make_bars(1, n=20), make_bars(1, n=400)
+    derin.cache_put("A", "2020-01-01", "2020-12-31", "1d", small)
+    derin.cache_put("B", "2020-01-01", "2020-12-31", "1d", small)
+    derin.cache_put("A", "2020-01-01", "2020-12-31", "1d", big)  # üzerine yazma: fark kadar
+    assert derin._cache_bytes == sum(_cached_files(cache_dir).values())
+
+
+def test_offline_mode_never_downloads(cache_dir, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("offline modda ağa çıkıldı")
+
+    monkeypatch.setattr(derin.yf, "download", no_network)
+    df = make_bars(1, n=30)
+    today = _today()
+    derin.cache_put("AAA", "2020-01-01", today, "1d", df)
+    _age("AAA", "2020-01-01", today, derin.CACHE_TTL_SEC * 10)
+    monkeypatch.setattr(derin, "CACHE_OFFLINE", True)
+
+    # eskimiş açık aralık offline'da yine kullanılır; cache'te olmayan boş döner
+    pd.testing.assert_frame_equal(derin.fetch_one_ticker("AAA", "2020-01-01", today, "1d"), df)
+    assert derin.fetch_one_ticker("ZZZ", "2020-01-01", today, "1d").empty
+    got = derin.fetch_many_tickers(["AAA", "ZZZ"], "2020-01-01", today, "1d")
+    pd.testing.assert_frame_equal(got["AAA"], df)
+    assert got["ZZZ"].empty
@@ -0,0 +1,162 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from derin import add_technical_indicators
+from indicators import (
+    INDICATOR_COLS,
+    StreamingIndicators,
+    add_technical_indicators_panel,
+    compute_panel_features,
+    compute_panel_indicators,
+    needs_full_history,
+)
+
+# Panel ve canlı motor add_technical_indicators ile BİREBİR (bit düzeyinde) aynı olmalı:
+# karşılaştırmalar check_exact ile.
+EXTRAS = ["atr_14", "obv"]
+
+
+def _bars(seed: int, n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = close * rng.uniform(0.001, 0.03, n)
+    return pd.DataFrame({
+        "datetime": pd.date_range("2021-01-04", periods=n, freq="B"),
+        "open": close * (1 + rng.normal(0, 0.004, n)),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(10_000, 900_000, n).astype("float64"),
+    })
+
+
+def edge_frames() -> dict:
+    """NaN'lı, sabit, sıfır/negatif fiyatlı, karışık sıralı ve farklı uzunlukta ticker'lar."""
+    gaps = _bars(1, 300)
+    gaps.loc[[5, 40, 41, 120], "close"] = np.nan
+    gaps.loc[60, "volume"] = np.nan
+    gaps.loc[90, "high"] = np.nan
+
+    flat = _bars(3, 120)
+    flat[["open", "high", "low", "close"]] = 50.0
+
+    broken = _bars(4, 80)
+    broken.loc[30, "close"] = 0.0
+    broken.loc[31, "close"] = -1.0
+
+    return {
+        "GAPS": gaps,
+        "SHORT": _bars(2, 35),  # sma_50 hiç dolmaz
+        "FLAT": flat.sample(frac=1, random_state=0),  # girdi sırası karışık
+        "BROKEN": broken,
+        "TINY": _bars(5, 5),
+    }
+
+
+def _reference(frames, names, extras):
+    return {t: add_technical_indicators(df, t, names.get(t, t), extra_features=extras) for t, df in frames.items()}
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("extras", [[], EXTRAS])
+def test_panel_matches_per_ticker_indicators(extras):
+    frames = edge_frames()
+    names = {"GAPS": "Gaps Inc", "FLAT": "Flat Co"}
+    panel = add_technical_indicators_panel(frames, names, features=INDICATOR_COLS + extras)
+
+    assert panel["ticker"].tolist() == [t for t in frames for _ in range(len(frames[t]))]
+    for ticker, ref in _reference(frames, names, extras).items():
+        got = panel[panel["ticker"] == ticker].reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, ref, check_exact=True)
+
+
+def test_panel_skips_empty_frames():
+    frames = {"A": _bars(1, 60), "EMPTY": _bars(2, 0)}
+    panel = add_technical_indicators_panel(frames)
+    assert set(panel["ticker"]) == {"A"}
+    assert add_technical_indicators_panel({"EMPTY": _bars(2, 0)}).empty
+
+
+def test_compute_panel_indicators_is_default_feature_set():
+    frames = {"A": _bars(1, 100), "B": _bars(2, 70)}
+    panel = add_technical_indicators_panel(frames)
+    close = np.full((2, 100), np.nan)
+    close[0] = frames["A"]["close"]
+    close[1, 30:] = frames["B"]["close"]  # sağa yaslı
+
+    res = compute_panel_indicators(close)
+    assert list(res) == INDICATOR_COLS
+    for col in INDICATOR_COLS:
+        np.testing.assert_array_equal(res[col][0], panel.loc[panel["ticker"] == "A", col].to_numpy())
+        np.testing.assert_array_equal(res[col][1, 30:], panel.loc[panel["ticker"] == "B", col].to_numpy())
+
+
+def test_only_requested_raw_fields_are_read():
+    close = _bars(1, 40)["close"].to_numpy()[None, :]
+    read = []
+
+    def raw(field):
+        read.append(field)
+        return close
+
+    compute_panel_features(raw, ["rsi_14", "macd"])
+    assert read == ["close"]
+
+
+def test_full_history_follows_dependencies():
+    assert needs_full_history(["obv"])
+    assert not needs_full_history(INDICATOR_COLS + ["atr_14"])
+    assert not needs_full_history(["close", "unknown"])
+
+
+# ===== canlı motor =====
+def _stream(df, ticker, extras, cut=None, tmp_path=None):
+    """df'yi cut noktasında snapshot alıp (json + dosya) kaldığı yerden devam ederek iter."""
+    df = df.sort_values("datetime").reset_index(drop=True)
+    st = StreamingIndicators(ticker, ticker, extras)
+    if cut is None:
+        return st.update_frame(df)
+    head = st.update_frame(df.iloc[:cut])
+    st = StreamingIndicators.from_dict(json.loads(json.dumps(st.to_dict())))
+    path = os.path.join(str(tmp_path), "state", f"{ticker}.json")
+    st.save(path)
+    st = StreamingIndicators.load(path)
+    return pd.concat([head, st.update_frame(df.iloc[cut:])], ignore_index=True)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("extras", [[], EXTRAS])
+def test_streaming_matches_batch_indicators(extras, tmp_path):
+    for ticker, df in edge_frames().items():
+        ref = add_technical_indicators(df, ticker, ticker, extra_features=extras)
+        cuts = [None] + [c for c in (1, 14, 20, 50, len(df) // 2, len(df) - 1) if 0 < c < len(df)]
+        for cut in cuts:
+            got = _stream(df, ticker, extras, cut, tmp_path)[list(ref.columns)]
+            pd.testing.assert_frame_equal(got, ref, check_exact=True, obj=f"{ticker} cut={cut}")
+
+
+def test_streaming_rejects_out_of_order_bars():
+    df = _bars(1, 10)
+    st = StreamingIndicators.from_history(df, "A")
+    for dt in (df["datetime"].iloc[-1], df["datetime"].iloc[3]):
+        with pytest.raises(ValueError, match="bar sırası"):
+            st.update(df.iloc[-1].to_dict() | {"datetime": dt})
+
+
+def test_streaming_rejects_unsupported_extras():
+    with pytest.raises(ValueError, match="stoch"):
+        StreamingIndicators("A", extra_features=["atr_14", "stoch_k"])
+
+
+def test_old_snapshots_restore_without_extra_fields():
+    df = _bars(1, 60)
+    st = StreamingIndicators.from_history(df.iloc[:40], "A")
+    old = {k: v for k, v in st.to_dict().items() if k not in ("extra_features", "prev_raw_close", "obv_total", "atr_14")}
+    restored = StreamingIndicators.from_dict(old)
+    pd.testing.assert_frame_equal(
+        restored.update_frame(df.iloc[40:]), st.update_frame(df.iloc[40:]), check_exact=True
+    )
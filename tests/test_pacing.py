@@ -0,0 +1,69 @@
+import random
+
+from pacing import Pacer
+
+
+def _slow_decisions(p: Pacer) -> list:
+    return [d for d in p.decisions if d["outcome"] == "slow"]
+
+
+def test_sustained_slowdown_backs_off():
+    p = Pacer(delay=0.2, max_concurrency=4, window=10)
+    for _ in range(40):
+        p.observe("ok", 0.5)
+    before = p.delay
+    assert not _slow_decisions(p)
+
+    for _ in range(40):
+        p.observe("ok", 3.0)
+    assert _slow_decisions(p)
+    assert p.delay > before
+
+
+def test_noisy_steady_latency_is_not_slow():
+    rng = random.Random(0)
+    p = Pacer(delay=0.5, max_concurrency=4, window=10)
+    for _ in range(300):
+        p.observe("ok", rng.lognormvariate(-0.7, 0.5))
+    assert not _slow_decisions(p)
+    assert p.delay < 0.5
+
+
+def test_slowdown_fades_once_it_fills_the_window():
+    p = Pacer(delay=0.2, max_concurrency=4, window=10)
+    for _ in range(50):
+        p.observe("ok", 0.5)
+    for _ in range(200):
+        p.observe("ok", 3.0)
+    n = len(_slow_decisions(p))
+    for _ in range(50):
+        p.observe("ok", 3.0)
+    assert len(_slow_decisions(p)) == n
+
+
+def test_failed_pages_do_not_move_the_baseline():
+    p = Pacer(delay=0.2, max_concurrency=4, window=10)
+    for _ in range(20):
+        p.observe("ok", 0.5)
+    p.observe("error", 30.0)
+    assert p.latency_base == 0.5
+
+
+def test_blocked_halves_concurrency_once_per_burst():
+    p = Pacer(delay=1.0, max_concurrency=8, window=10)
+    p.observe("blocked")
+    assert (p.delay, p.concurrency) == (4.0, 4)
+    # o an uçuşta olan isteklerin aynı sıkıntısı tekrar sayılmaz
+    for _ in range(7):
+        p.observe("blocked")
+    assert (p.delay, p.concurrency) == (4.0, 4)
+
+
+def test_single_outlier_is_not_slow():
+    p = Pacer(delay=0.2, max_concurrency=4, window=10)
+    for _ in range(30):
+        p.observe("ok", 0.5)
+    p.observe("ok", 10.0)
+    for _ in range(10):
+        p.observe("ok", 0.5)
+    assert not _slow_decisions(p)
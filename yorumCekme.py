@@ -1,5 +1,3 @@
-import csv
-import json
 import os
 import random
 import time
@@ -20,6 +18,16 @@ from selenium.common.exceptions import (
     SessionNotCreatedException,
 )
 
+from browser import DriverPool, LazyDriver, install_popup_guard, run_sharded
+from comment_extract import CSV_FIELDS, extract_comments_from_html, extract_comments_structured
+from crawl_async import crawl_pages, rate_from_config
+from crawl_http import PageFetcher
+from comment_sink import CommentSink
+from crawl_state import Frontier, SeenStore, load_checkpoint, open_seen_store, save_checkpoint
+from network_capture import NetworkCapture, enable_performance_log
+from page_archive import close_archive, open_archive
+from pacing import Pacer, pacer_from_config
+
 # ========= SABİTLEME (SENİN MAKİNE) =========
 CHROMEDRIVER_PATH = r"C:\drivers\chromedriver.exe"
 CHROME_EXE_PATH   = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
@@ -34,7 +42,14 @@ CHROME_PROFILE_NAME = "Default"
 class ScrapeConfig:
     base_url: str
     out_csv: str = "yorumlar.csv"
+    out_format: str = "csv"  # "csv" | "csv.zst" | "parquet" (segmentler: <out_csv>_parts/)
+    flush_rows: int = 2000   # tampon bu kadar satıra ya da flush_sec saniyeye ulaşınca diske yazılır
+    flush_sec: float = 30.0
     progress_file: str = "progress.json"
+    seen_db: str = ""  # dedup SQLite; boşsa <progress_file>.seen.sqlite
+    max_attempts: int = 3     # başarısız sayfa en fazla kaç kez denenir
+    retry_failed: bool = True  # ana geçişten sonra başarısız sayfalar bir geçiş daha
+    refresh: bool = False      # önce 1. sayfadan yeni yorumlar (tamamı bilinen ilk sayfada durur), sonra backfill
     max_pages: int = 10_000
 
     wait_sec: int = 4
@@ -42,10 +57,14 @@ class ScrapeConfig:
 
     min_sleep: float = 0.15
     max_sleep: float = 0.55
+    adaptive_pacing: bool = True  # min/max_sleep başlangıç; sonrası pacing.Pacer (AIMD) ile ayarlanır
+    pace_log: str = ""            # pacer kararları için CSV (boş -> sadece ekrana)
 
     page_load_strategy: str = "eager"
 
-    restart_every_pages: int = 80
+    restart_every_pages: int = 80  # sadece RSS ölçülemezse (psutil yok) sabit yenileme aralığı
+    max_driver_rss_mb: int = 1500  # Chrome süreç ağacı bunu ya da ilk ölçümün 2.5 katını aşınca yenile (0 -> sadece kat)
+    spare_drivers: int = 1         # arka planda önceden açılan yedek driver (yenileme beklemesiz)
 
     long_break_every_pages: int = 150
     long_break_min_sec: int = 8
@@ -69,6 +88,34 @@ class ScrapeConfig:
     block_css: bool = True
     block_media: bool = True
 
+    # ✅ Popup/modal: tarayıcı başına bir kez, belge oluşurken bastırılır (sayfa başına kapatma beklemesi yok)
+    popup_guard: bool = True
+
+    # ✅ Paralel tarama: >1 ise N uzun ömürlü driver, sayfalar aralarında paylaştırılır
+    workers: int = 1
+
+    # ✅ Yorum çıkarımı: "dom" (WebDriver yolu) | "offline" (page_source bir kez alınır, lxml ile ayrıştırılır;
+    #   çok daha hızlı) | "network" (sayfanın XHR/JSON yorum yükleri + __NEXT_DATA__; yoksa offline HTML; scroll yok)
+    # ⚠️ GEÇİŞ: hash = yorum metninin sha1'i (SeenStore dedup anahtarı). offline/network metni
+    #   WebElement.text yerine comment_extract.visible_text'ten gelir; boşluk/görünürlük farkı hash'i
+    #   değiştirir ve "dom" ile başlamış bir taramada o yorumlar yeniden yazılır. Mevcut taramayı
+    #   dom'da bitirin ya da offline'a yeni out_csv (+ yeni .seen.sqlite) ile başlayın.
+    #   http_first / engine="async" sayfaları HTTP'den geldiği için her zaman offline ayrıştırılır.
+    extract_mode: str = "dom"
+
+    # ✅ Önce düz HTTP dene; #comments_new yoksa / challenge gelirse tarayıcı (offline çıkarım gerekir)
+    http_first: bool = False
+
+    # ✅ Sayfa arşivi: her sayfanın HTML'i (+ yakalanan JSON) sıkıştırılmış SQLite'a; boş -> kapalı.
+    #   Yeniden çıkarım / benchmark: python page_archive.py <archive> --out yeni.csv
+    archive: str = ""
+
+    # ✅ Async motor: sleep yerine host başına istek/sn + burst bütçesi
+    engine: str = "selenium"          # "selenium" | "async"
+    requests_per_sec: float = 0.0     # 0 -> 1 / ortalama(min_sleep, max_sleep)
+    burst: int = 4
+    max_in_flight: int = 8
+
     # ✅ Profil takılınca en sağlamı: her seferinde benzersiz temp profile
     use_temp_profile: bool = True
 
@@ -76,46 +123,53 @@ class ScrapeConfig:
     cleanup_temp_profile_on_quit: bool = True
 
 
-CSV_FIELDS = [
-    "page", "index_in_page", "datetime", "username", "like", "dislike",
-    "comment_id", "comment", "hash", "source_url"
-]
-
-
 def safe_sleep(cfg: ScrapeConfig, extra: float = 0.0):
     time.sleep(random.uniform(cfg.min_sleep, cfg.max_sleep) + extra)
 
 
+def make_pacer(cfg: ScrapeConfig, max_concurrency: int = 1, delay: float = None):
+    return pacer_from_config(cfg, max_concurrency, delay) if cfg.adaptive_pacing else None
+
+
+def pace(cfg: ScrapeConfig, pacer: Pacer = None, extra: float = 0.0):
+    if pacer is None:
+        safe_sleep(cfg, extra)
+    else:
+        pacer.wait(extra)
+
+
 def comment_hash(text: str) -> str:
     return hashlib.sha1(text.strip().encode("utf-8")).hexdigest()
 
 
 def load_progress(cfg: ScrapeConfig):
-    if os.path.exists(cfg.progress_file):
-        with open(cfg.progress_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"last_page": 0, "seen_hashes": []}
+    return load_checkpoint(cfg.progress_file, {"last_page": 0})
 
 
-def save_progress(cfg: ScrapeConfig, last_page: int, seen_hashes: set):
-    data = {"last_page": last_page, "seen_hashes": list(seen_hashes)}
-    with open(cfg.progress_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def open_seen(cfg: ScrapeConfig) -> SeenStore:
+    # eski progress.json'daki seen_hashes listesi varsa burada SQLite'a taşınır
+    return open_seen_store(cfg.progress_file, cfg.seen_db)
 
 
-def ensure_csv_header(cfg: ScrapeConfig):
-    if not os.path.exists(cfg.out_csv):
-        with open(cfg.out_csv, "w", newline="", encoding="utf-8-sig") as f:
-            w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-            w.writeheader()
+def save_progress(cfg: ScrapeConfig, seen_hashes: SeenStore, sink: CommentSink, frontier: Frontier):
+    """
+    1) tampondaki satırlar diske (fsync)
+    2) hash'ler + sayfa durumları + checkpoint (sink konumu) TEK SQLite commit'i
+    3) progress_file'a okunabilir kopya
+    2'den önce çökerse yeniden açılışta sink checkpoint sonrası yarım veriyi atar.
+    """
+    sink_state = sink.flush()
+    checkpoint = {"last_page": frontier.done_through(), "sink": sink_state}
+    seen_hashes.set_meta("checkpoint", checkpoint)
+    seen_hashes.commit()
+    save_checkpoint(cfg.progress_file, checkpoint)
+    if cfg.archive:
+        open_archive(cfg.archive).commit()
 
 
-def append_rows(cfg: ScrapeConfig, rows):
-    if not rows:
-        return
-    with open(cfg.out_csv, "a", newline="", encoding="utf-8-sig") as f:
-        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        w.writerows(rows)
+def open_sink(cfg: ScrapeConfig, state: dict | None = None) -> CommentSink:
+    return CommentSink(cfg.out_csv, CSV_FIELDS, fmt=cfg.out_format, flush_rows=cfg.flush_rows,
+                       flush_sec=cfg.flush_sec, state=state)
 
 
 def ensure_profile_dir(path: str):
@@ -129,7 +183,11 @@ def kill_leftover_driver_processes_only():
     """
     ✅ Sadece chromedriver öldür!
     ❌ chrome.exe öldürmek DevToolsActivePort/crash sebebi olabiliyor.
+    Havuz açılmadan önce bir kez çağrılır (open_driver içinde değil: arka planda yedek açılırken
+    çalışan driver'ı öldürürdü). Linux'ta yok; kapanan driver'ın süreçleri browser.quit_driver ile temizlenir.
     """
+    if os.name != "nt":
+        return
     try:
         os.system("taskkill /F /IM chromedriver.exe >nul 2>&1")
     except Exception:
@@ -164,6 +222,8 @@ def apply_speed_prefs(options: uc.ChromeOptions, cfg: ScrapeConfig):
         "profile.managed_default_content_settings.media_stream": 2,
     }
     options.add_experimental_option("prefs", prefs)
+    if cfg.extract_mode == "network":
+        enable_performance_log(options)
 
 
 def apply_speed_cdp(driver, cfg: ScrapeConfig):
@@ -188,6 +248,11 @@ def apply_speed_cdp(driver, cfg: ScrapeConfig):
     except Exception:
         pass
 
+    if cfg.popup_guard:
+        driver.popup_guarded = install_popup_guard(driver)
+    if cfg.extract_mode == "network":
+        driver.net_capture = NetworkCapture(driver)
+
 
 def open_driver(cfg: ScrapeConfig):
     """
@@ -204,8 +269,6 @@ def open_driver(cfg: ScrapeConfig):
     for attempt in range(1, cfg.driver_open_retries + 1):
         temp_ud = None
         try:
-            kill_leftover_driver_processes_only()
-
             # ✅ kilit temizle (kalıcı profiller)
             cleanup_profile_locks(CHROME_PROFILE_DIR)
             cleanup_profile_locks(cfg.fallback_profile_dir)
@@ -247,7 +310,8 @@ def open_driver(cfg: ScrapeConfig):
                 options=options,
                 # driver_executable_path=CHROMEDRIVER_PATH,  # ❌ kapalı kalsın
                 # version_main=CHROME_MAJOR,                 # ❌ kapalı kalsın
-                use_subprocess=True
+                # Linux: tarayıcı kendi süreç grubunda (setsid) açılır -> kapanışta grupça temizlenir
+                use_subprocess=os.name != "posix",
             )
             driver.set_page_load_timeout(cfg.page_load_timeout)
 
@@ -365,6 +429,16 @@ def build_page_url(cfg: ScrapeConfig, page: int, mode: str = None) -> str:
     return build_page_url_path(cfg.base_url, page)
 
 
+def first_page_url(cfg: ScrapeConfig, page: int) -> str:
+    # "auto": önce path biçimi; load_page_with_retry gerekirse query biçimini dener
+    return build_page_url(cfg, page, mode="path" if cfg.url_mode == "auto" else cfg.url_mode)
+
+
+def popups_guarded(driver) -> bool:
+    """install_popup_guard kuruluysa popup'lar belge başında zaten bastırılıyor."""
+    return getattr(driver, "popup_guarded", False) is True
+
+
 def human_scroll_for_comments(driver, cfg: ScrapeConfig):
     for _ in range(max(1, cfg.scroll_rounds)):
         try:
@@ -372,7 +446,8 @@ def human_scroll_for_comments(driver, cfg: ScrapeConfig):
         except Exception:
             pass
         time.sleep(random.uniform(cfg.scroll_pause_min, cfg.scroll_pause_max))
-        close_signup_modal_if_any(driver)
+        if not popups_guarded(driver):
+            close_signup_modal_if_any(driver)
 
 
 def wait_comments_container(driver, wait_sec: int) -> bool:
@@ -441,7 +516,16 @@ def _extract_like_dislike_from_card(card):
     return like, dislike
 
 
-def extract_comments_from_page(driver, page: int, source_url: str):
+def extract_comments_from_page(driver, page: int, source_url: str, mode: str = "dom"):
+    if mode == "network":
+        # yakalanan yorum JSON'ları (+ __NEXT_DATA__); hiç yorum yoksa HTML kartları
+        cap = getattr(driver, "net_capture", None)
+        payloads = cap.poll() if cap is not None else []
+        return extract_comments_structured(driver.page_source, payloads, page, source_url)
+    if mode == "offline":
+        # tek IPC: HTML bir kez alınır, kartlar lxml ile ayrıştırılır (aynı CSV_FIELDS)
+        return extract_comments_from_html(driver.page_source, page, source_url)
+
     rows = []
 
     container = WebDriverWait(driver, 3).until(
@@ -513,19 +597,26 @@ def load_page_with_retry(driver, url: str, cfg: ScrapeConfig):
     last_err = None
 
     def _load_once(target_url: str):
+        cap = getattr(driver, "net_capture", None)
+        if cap is not None:
+            cap.reset()
         driver.get(target_url)
-        close_cookie_popup_if_any(driver)
-        close_signup_modal_if_any(driver)
+        guarded = popups_guarded(driver)
+        if not guarded:
+            close_cookie_popup_if_any(driver)
+            close_signup_modal_if_any(driver)
 
         ok = wait_comments_container(driver, cfg.wait_sec)
         if not ok:
             human_scroll_for_comments(driver, cfg)
             ok = wait_comments_container(driver, 2)
 
-        if ok:
+        if ok and not (cap is not None and cap.poll()):
+            # network modunda yorum yükü geldiyse lazy-load için scroll gerekmez
             human_scroll_for_comments(driver, cfg)
 
-        close_signup_modal_if_any(driver)
+        if not guarded:
+            close_signup_modal_if_any(driver)
         return ok
 
     for attempt in range(1, 3):
@@ -559,71 +650,347 @@ def load_page_with_retry(driver, url: str, cfg: ScrapeConfig):
     return False, last_err
 
 
-def scrape_investing_comments_auto(cfg: ScrapeConfig):
-    ensure_csv_header(cfg)
+def paced_load(driver, url: str, cfg: ScrapeConfig, pacer: Pacer = None):
+    """load_page_with_retry + pacer geri beslemesi (yükleme süresi, #comments_new yok, hata)."""
+    t0 = time.perf_counter()
+    ok, err = load_page_with_retry(driver, url, cfg)
+    if pacer is not None:
+        if ok:
+            pacer.observe("ok", time.perf_counter() - t0)
+        else:
+            pacer.observe("no_comments" if isinstance(err, TimeoutException) else "error")
+    return ok, err
+
+
+def scrape_one_page(driver, cfg: ScrapeConfig, page: int, fetcher: PageFetcher = None, pacer: Pacer = None):
+    url = first_page_url(cfg, page)
+
+    if fetcher is not None:
+        res = fetcher.fetch_http(url)
+        if pacer is not None and res.outcome is not None:
+            pacer.observe(res.outcome, res.elapsed if res.ok else None)
+        if res.ok:
+            return parse_page_html(cfg, page, res.html, res.url)
+        if res.gone:
+            # 404/410: liste burada bitiyor; tarayıcı da aynısını görür -> boş sayfa (son)
+            print(f"ℹ️ Sayfa {page}: {res.reason}, sayfa yok.")
+            return []
+        print(f"↪️ Sayfa {page}: HTTP yetmedi ({res.reason}), tarayıcı ile açılıyor...")
+
+    ok, err = paced_load(driver, url, cfg, pacer)
+    if not ok:
+        try:
+            driver.save_screenshot(f"error_page_{page}.png")
+        except Exception:
+            pass
+        raise RuntimeError(f"{url} yüklenemedi: {err}")
+    if fetcher is not None:
+        fetcher.adopt_browser_cookies(driver)
+    return extract_loaded_page(driver, cfg, page)
+
+
+def parse_page_html(cfg: ScrapeConfig, page: int, html: str, source_url: str = None, payloads=()):
+    """
+    Sayfa HTML'i (+ network modunda yakalanan JSON) -> satırlar (offline çıkarım; network modunda
+    önce yükler / __NEXT_DATA__). cfg.archive açıksa girdi olduğu gibi arşive yazılır.
+    """
+    source_url = source_url or first_page_url(cfg, page)
+    if cfg.archive:
+        open_archive(cfg.archive).add(page, source_url, html, payloads, base_url=cfg.base_url)
+    if cfg.extract_mode == "network":
+        return extract_comments_structured(html, payloads, page, source_url)
+    return extract_comments_from_html(html, page, source_url)
+
+
+def extract_loaded_page(driver, cfg: ScrapeConfig, page: int):
+    """Tarayıcıda yüklü sayfa -> satırlar. offline/network: page_source tek sefer alınır (arşiv de ondan)."""
+    source_url = driver.current_url
+    if cfg.extract_mode == "dom":
+        rows = extract_comments_from_page(driver, page, source_url=source_url, mode="dom")
+        if cfg.archive:
+            open_archive(cfg.archive).add(page, source_url, driver.page_source, base_url=cfg.base_url)
+        return rows
+    cap = getattr(driver, "net_capture", None)
+    payloads = cap.poll() if cap is not None and cfg.extract_mode == "network" else ()
+    return parse_page_html(cfg, page, driver.page_source, source_url, payloads)
+
+
+def fetch_with_browser(pool: DriverPool, cfg: ScrapeConfig, url: str) -> str:
+    """HTTP'nin yetmediği sayfayı havuzdaki bir tarayıcıda açıp HTML'ini döndürür."""
+    driver = pool.acquire()
+    try:
+        ok, err = load_page_with_retry(driver, url, cfg)
+        if not ok:
+            raise RuntimeError(f"{url} yüklenemedi: {err}")
+        return driver.page_source
+    finally:
+        pool.release(driver)
 
-    progress = load_progress(cfg)
+
+def take_new_rows(seen_hashes: SeenStore, rows) -> list:
+    new_rows = []
+    for r in rows:
+        if r["hash"] in seen_hashes:
+            continue
+        seen_hashes.add(r["hash"])
+        new_rows.append(r)
+    return new_rows
+
+
+def make_page_handler(cfg: ScrapeConfig, seen_hashes: SeenStore, sink: CommentSink, frontier: Frontier):
+    """
+    Sayfa sonucu -> dedup + sink + sayfa günlüğü + progress (tüm yollar ortak kullanır).
+    """
+    def on_result(page, rows, err):
+        if err is not None:
+            print(f"🚫 Sayfa {page} atlandı (sonra tekrar denenecek). Hata: {err}")
+            frontier.fail(page, err)
+            return
+        if not rows:
+            print(f"ℹ️ Sayfa {page}: yorum yok. Büyük ihtimalle bitti.")
+            frontier.truncate(page)
+            return
+
+        new_rows = take_new_rows(seen_hashes, rows)
+        sink.add(new_rows, page)
+        frontier.done(page)
+        if sink.due():
+            save_progress(cfg, seen_hashes, sink, frontier)
+        print(f"✅ Sayfa {page} | Bulunan: {len(rows)} | Yeni: {len(new_rows)} | Toplam unique: {len(seen_hashes)}")
+
+    return on_result
+
+
+def open_crawl_state(cfg: ScrapeConfig):
+    seen_hashes = open_seen(cfg)
+    # asıl checkpoint SQLite'ta (hash'lerle aynı commit); yoksa eski JSON
+    progress = seen_hashes.get_meta("checkpoint") or load_progress(cfg)
     last_page_done = int(progress.get("last_page", 0))
-    seen_hashes = set(progress.get("seen_hashes", []))
+    sink = open_sink(cfg, progress.get("sink"))
+
+    frontier = Frontier(seen_hashes)
+    frontier.seed(cfg.max_pages, done_through=last_page_done)  # eski checkpoint: 1..last_page done
+
+    print(f"▶️ Kaldığın yer: {last_page_done} | Sayfalar: {frontier.counts()} | Bilinen yorum: {len(seen_hashes)}")
+    return seen_hashes, sink, frontier
+
+
+def close_crawl_state(cfg: ScrapeConfig, seen_hashes: SeenStore, sink: CommentSink, frontier: Frontier):
+    save_progress(cfg, seen_hashes, sink, frontier)
+    print(f"📒 Sayfalar: {frontier.counts()}")
+    seen_hashes.close()
+    if cfg.archive:
+        close_archive(cfg.archive)
+
+
+def _page_passes(cfg: ScrapeConfig, frontier: Frontier):
+    """Önce bekleyen sayfalar, ardından (cfg.retry_failed) başarısızların tekrar geçişi."""
+    yield frontier.pending()
+    if cfg.retry_failed:
+        retry = frontier.retryable(cfg.max_attempts)
+        if retry:
+            print(f"🔁 {len(retry)} başarısız sayfa tekrar deneniyor: {retry[:10]}{' ...' if len(retry) > 10 else ''}")
+            yield retry
+
+
+def refresh_head(cfg: ScrapeConfig, seen_hashes: SeenStore, sink: CommentSink, frontier: Frontier, run):
+    """
+    cfg.refresh: yorumlar en yeniden eskiye sıralı. 1. sayfadan başlanır, tüm yorumları zaten
+    bilinen (hash'i SeenStore'da) ilk sayfada durulur. Gelen yeni yorum kadar backfill sayfaları
+    kaydırılır (frontier.shift) ve her şey tek save_progress ile commit edilir.
+    run(pages, on_result, stop_fn): motorun sayfa koşucusu (sıralı on_result, stop_fn ile durur).
+    """
+    head = frontier.done_through()
+    if not cfg.refresh or head == 0 or len(seen_hashes) == 0:
+        return
+    print(f"🔄 Refresh: 1. sayfadan ilk tamamen bilinen sayfaya kadar (en fazla {head} sayfa)")
+    st = {"new": 0, "per_page": 0, "stop": None}
+
+    def on_result(page, rows, err):
+        if err is not None:
+            # aradaki yeni yorumlar bilinenlerden önce kalır; bir sonraki refresh onları da geçer
+            print(f"🚫 Refresh sayfa {page} atlandı. Hata: {err}")
+            return
+        if not rows:
+            st["stop"] = page
+            return
+        new_rows = take_new_rows(seen_hashes, rows)
+        sink.add(new_rows, page)
+        st["new"] += len(new_rows)
+        st["per_page"] = max(st["per_page"], len(rows))
+        if not new_rows:
+            st["stop"] = page
+        print(f"🔄 Sayfa {page} | Bulunan: {len(rows)} | Yeni: {len(new_rows)}")
+
+    run(list(range(1, head + 1)), on_result, lambda page, rows: st["stop"] == page)
+
+    shift = 0
+    if st["stop"] is None:
+        print("⚠️ Refresh bilinen bir sayfaya ulaşmadı; backfill sayfaları kaydırılmadı.")
+    elif st["per_page"]:
+        shift = st["new"] // st["per_page"]
+        frontier.shift(shift, after=head)
+    save_progress(cfg, seen_hashes, sink, frontier)
+    print(f"🔄 Refresh bitti: {st['new']} yeni yorum | backfill {shift} sayfa kaydırıldı")
+
+
+def _driver_pool(cfg: ScrapeConfig, lazy: bool = False) -> DriverPool:
+    kill_leftover_driver_processes_only()
+    quit_fn = lambda d: safe_quit_driver(d, cfg)
+    if lazy:
+        # HTTP-önce: tarayıcı sadece ilk HTTP başarısızlığında açılır (önceden açılacak yedek yok)
+        return DriverPool(lambda: LazyDriver(lambda: open_driver(cfg), quit_fn), quit_fn, size=cfg.workers,
+                          max_rss_mb=cfg.max_driver_rss_mb)
+    # sabit profilde iki Chrome aynı anda açılamaz -> yedek sadece temp profille
+    spares = cfg.spare_drivers if cfg.use_temp_profile else 0
+    return DriverPool(lambda: open_driver(cfg), quit_fn, size=cfg.workers, spares=spares,
+                      max_rss_mb=cfg.max_driver_rss_mb)
+
+
+def scrape_investing_comments_parallel(cfg: ScrapeConfig):
+    """
+    cfg.workers adet driver ile paralel tarama.
+    Sayfalar havuzdaki driver'lara dağıtılır, sonuçlar SAYFA SIRASIYLA CSV'ye yazılır
+    (çıktı ve progress seri taramayla aynı formatta).
+    cfg.http_first=True ise her sayfa önce düz HTTP ile denenir.
+    """
+    seen_hashes, sink, frontier = open_crawl_state(cfg)
+    fetcher = PageFetcher() if cfg.http_first else None
+    pacer = make_pacer(cfg, max_concurrency=cfg.workers)
+
+    def process(driver, page):
+        if pacer is None:
+            return scrape_one_page(driver, cfg, frontier.begin(page), fetcher)
+        with pacer.slot():  # aynı anda en fazla pacer.concurrency worker çalışır
+            return scrape_one_page(driver, cfg, frontier.begin(page), fetcher, pacer)
+
+    def after_page(worker_id, n_done):
+        if cfg.long_break_every_pages > 0 and n_done % cfg.long_break_every_pages == 0:
+            dur = random.uniform(cfg.long_break_min_sec, cfg.long_break_max_sec)
+            print(f"⏸️ Worker {worker_id} uzun mola (anti-ban): {dur:.1f}s")
+            time.sleep(dur)
+        pace(cfg, pacer)
+
+    on_result = make_page_handler(cfg, seen_hashes, sink, frontier)
+    try:
+        with _driver_pool(cfg, lazy=fetcher is not None) as pool:
+            def run(pages, on_page, stop_fn):
+                run_sharded(
+                    pages,
+                    process,
+                    pool,
+                    on_page,
+                    stop_fn=stop_fn,
+                    restart_every=cfg.restart_every_pages,
+                    after_job_fn=after_page,
+                )
+
+            refresh_head(cfg, seen_hashes, sink, frontier, run)
+            for pages in _page_passes(cfg, frontier):
+                run(pages, on_result, lambda page, rows: not rows)
+    finally:
+        close_crawl_state(cfg, seen_hashes, sink, frontier)
+        if fetcher is not None:
+            print(f"📊 HTTP: {fetcher.stats}")
+            fetcher.close()
 
-    start_page = max(1, last_page_done + 1)
-    print(f"▶️ Kaldığın yer: {last_page_done}. Devam sayfası: {start_page}")
 
-    driver = None
+def scrape_investing_comments_async(cfg: ScrapeConfig):
+    """
+    asyncio motoru: sayfalar düz HTTP ile, host başına token-bucket
+    (requests_per_sec + burst) ve max_in_flight eşzamanlı istekle çekilir; sabit sleep yok.
+    HTTP'nin yetmediği sayfalar cfg.workers adet (tembel açılan) tarayıcıda açılır.
+    """
+    seen_hashes, sink, frontier = open_crawl_state(cfg)
+    rate, burst = rate_from_config(cfg)
+    pacer = make_pacer(cfg, max_concurrency=cfg.max_in_flight, delay=1 / rate if rate > 0 else None)
+    print(f"⚡ Async: {rate:.2f} istek/sn, burst={burst}, max_in_flight={cfg.max_in_flight}"
+          f"{' (uyarlamalı)' if pacer is not None else ''}")
 
     try:
-        for page in range(start_page, cfg.max_pages + 1):
-            url = build_page_url(cfg, page, mode="path" if cfg.url_mode == "auto" else cfg.url_mode)
+        with _driver_pool(cfg, lazy=True) as pool:
+            def run(pages, on_page, stop_fn):
+                stats = crawl_pages(
+                    pages,
+                    lambda page: first_page_url(cfg, frontier.begin(page)),
+                    lambda page, html: parse_page_html(cfg, page, html),
+                    on_page,
+                    rate=rate,
+                    burst=burst,
+                    max_in_flight=cfg.max_in_flight,
+                    fallback_fn=lambda page, url: fetch_with_browser(pool, cfg, url),
+                    fallback_workers=cfg.workers,
+                    stop_fn=stop_fn,
+                    pacer=pacer,
+                )
+                print(f"📊 {stats}")
+
+            refresh_head(cfg, seen_hashes, sink, frontier, run)
+            on_result = make_page_handler(cfg, seen_hashes, sink, frontier)
+            for pages in _page_passes(cfg, frontier):
+                run(pages, on_result, lambda page, rows: not rows)
+    finally:
+        close_crawl_state(cfg, seen_hashes, sink, frontier)
+
+
+def scrape_investing_comments_auto(cfg: ScrapeConfig):
+    if cfg.engine == "async":
+        return scrape_investing_comments_async(cfg)
+    if cfg.workers > 1 or cfg.http_first:
+        return scrape_investing_comments_parallel(cfg)
+
+    seen_hashes, sink, frontier = open_crawl_state(cfg)
+    on_result = make_page_handler(cfg, seen_hashes, sink, frontier)
+    pacer = make_pacer(cfg)
+
+    pool = driver = None
+
+    def run(pages, on_page, stop_fn):
+        nonlocal driver
+        for page in pages:
+            url = first_page_url(cfg, page)
             print(f"\n📄 Sayfa {page} -> {url}")
 
             if driver is None:
-                driver = open_driver(cfg)
+                # önceki yenileme driver açamadıysa bir kez daha
+                driver = pool.replace(None)
+                if driver is None:
+                    raise RuntimeError("Driver açılamadı.")
 
-            ok, err = load_page_with_retry(driver, url, cfg)
+            frontier.begin(page)
+            ok, err = paced_load(driver, url, cfg, pacer)
             if not ok:
                 try:
                     driver.save_screenshot(f"error_page_{page}.png")
                 except Exception:
                     pass
-                print(f"🚫 Yüklenemedi, atlıyorum. Hata: {err}")
-                save_progress(cfg, page - 1, seen_hashes)
-                safe_sleep(cfg, extra=0.5)
+                on_page(page, None, err)
+                pace(cfg, pacer, extra=0.5)
                 continue
 
-            source_url = driver.current_url
-
-            rows = extract_comments_from_page(driver, page, source_url=source_url)
-            if not rows:
-                print("ℹ️ Bu sayfada yorum yok. Büyük ihtimalle bitti.")
-                save_progress(cfg, page - 1, seen_hashes)
+            rows = extract_loaded_page(driver, cfg, page)
+            on_page(page, rows, None)
+            if stop_fn(page, rows):
                 break
 
-            new_rows = []
-            for r in rows:
-                if r["hash"] in seen_hashes:
-                    continue
-                seen_hashes.add(r["hash"])
-                new_rows.append(r)
-
-            append_rows(cfg, new_rows)
-            save_progress(cfg, page, seen_hashes)
-
-            print(f"✅ Bulunan: {len(rows)} | Yeni yazılan: {len(new_rows)} | Toplam unique: {len(seen_hashes)}")
-
-            if cfg.restart_every_pages > 0 and page % cfg.restart_every_pages == 0:
-                safe_quit_driver(driver, cfg)
-                driver = None
-                safe_sleep(cfg, extra=0.35)
+            driver = pool.recycle(driver, cfg.restart_every_pages)
 
             if cfg.long_break_every_pages > 0 and page % cfg.long_break_every_pages == 0:
                 dur = random.uniform(cfg.long_break_min_sec, cfg.long_break_max_sec)
                 print(f"⏸️ Uzun mola (anti-ban): {dur:.1f}s")
                 time.sleep(dur)
 
-            safe_sleep(cfg)
+            pace(cfg, pacer)
+
+    try:
+        with _driver_pool(cfg) as pool:
+            driver = pool.acquire()
+            refresh_head(cfg, seen_hashes, sink, frontier, run)
+            for pages in _page_passes(cfg, frontier):
+                run(pages, on_result, lambda page, rows: not rows)
 
     finally:
-        safe_quit_driver(driver, cfg)
+        close_crawl_state(cfg, seen_hashes, sink, frontier)
 
 
 if __name__ == "__main__":